@@ -8,6 +8,13 @@ class Settings(BaseSettings):
     database_url: str = "sqlite:///./data/trading.db"
     redis_url: str = "redis://localhost:6379/0"
     env: str = "development"
+    backtest_cache_mb: int = 256
+    backtest_workers: int = 2
+    backtest_queue_size: int = 8
+    signal_scheduler_enabled: bool = True
+    signal_refresh_spacing: float = 5.0
+    finnhub_calls_per_minute: int = 60
+    news_ingester_enabled: bool = True
 
     class Config:
         env_file = ".env"
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean
+from sqlalchemy import create_engine, inspect, text, Column, Index, Integer, Float, String, DateTime, Boolean, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -51,10 +51,105 @@ class CachedSignal(Base):
     take_profit  = Column(Float, nullable=True)
     reasoning_he = Column(String)
     generated_at = Column(DateTime, default=datetime.utcnow)
+    payload      = Column(LargeBinary, nullable=True)   # zlib(JSON) of the full signal
+    payload_version = Column(Integer, nullable=True)
+    expires_at   = Column(DateTime, nullable=True)       # None → generated_at + SIGNAL_TTL
+
+
+class NewsArticle(Base):
+    """Finnhub article with its cached lexicon score."""
+    __tablename__ = "news_articles"
+    id             = Column(Integer, primary_key=True)          # Finnhub article id
+    published      = Column(Integer, index=True)                # unix seconds ("datetime")
+    headline       = Column(String)
+    summary        = Column(String)
+    source         = Column(String)
+    url            = Column(String)
+    image          = Column(String)
+    category       = Column(String)
+    score          = Column(Float)
+    label          = Column(String)
+    confidence     = Column(Float)
+    scorer_version = Column(Integer)
+    fetched_at     = Column(DateTime, default=datetime.utcnow)
+
+
+class NewsSymbol(Base):
+    """Which feeds an article appeared in — a symbol's company news or "market:<category>"."""
+    __tablename__ = "news_symbols"
+    __table_args__ = (Index("ix_news_symbols_feed_published", "symbol", "published"),)
+    symbol     = Column(String, primary_key=True)
+    article_id = Column(Integer, primary_key=True)
+    published  = Column(Integer, index=True)
+
+
+class NewsCursor(Base):
+    """Incremental polling position per feed."""
+    __tablename__ = "news_cursors"
+    symbol         = Column(String, primary_key=True)
+    last_id        = Column(Integer, default=0)
+    last_published = Column(Integer, default=0)
+    polled_at      = Column(DateTime)
+
+
+# Columns added after the first release: (table, column, SQL type)
+_ADDED_COLUMNS = [
+    ("cached_signals", "payload",         "BLOB"),
+    ("cached_signals", "payload_version", "INTEGER"),
+    ("cached_signals", "expires_at",      "DATETIME"),
+]
+
+
+def _fts5_available() -> bool:
+    """Does this SQLite build have FTS5? (probed on a scratch in-memory database)"""
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        conn = engine.dialect.dbapi.connect(":memory:")
+    except Exception:
+        return False
+    try:
+        conn.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(x)")
+        return True
+    except Exception:
+        return False
+    finally:
+        conn.close()
+
+
+# Full-text index over article headline/summary (external content, kept in sync by
+# triggers); without FTS5, news search falls back to LIKE
+FTS_ENABLED = _fts5_available()
+_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5("
+    "headline, summary, content='news_articles', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_ai AFTER INSERT ON news_articles BEGIN "
+    "INSERT INTO news_fts(rowid, headline, summary) VALUES (new.id, new.headline, new.summary); END",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_ad AFTER DELETE ON news_articles BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, headline, summary) VALUES ('delete', old.id, old.headline, old.summary); END",
+    "CREATE TRIGGER IF NOT EXISTS news_fts_au AFTER UPDATE OF headline, summary ON news_articles BEGIN "
+    "INSERT INTO news_fts(news_fts, rowid, headline, summary) VALUES ('delete', old.id, old.headline, old.summary); "
+    "INSERT INTO news_fts(rowid, headline, summary) VALUES (new.id, new.headline, new.summary); END",
+]
 
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all never alters existing tables — add new columns / indexes in place
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, sql_type in _ADDED_COLUMNS:
+            if column not in {c["name"] for c in insp.get_columns(table)}:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {sql_type}"))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+        if FTS_ENABLED:
+            backfill = "news_fts" not in insp.get_table_names()
+            for ddl in _FTS_DDL:
+                conn.execute(text(ddl))
+            if backfill:
+                conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
 
 
 def get_db():
@@ -3,17 +3,41 @@
 Backtesting Engine using vectorbt (or pandas fallback).
 Walk-Forward Optimization to prevent overfitting.
 """
+import hashlib
 import numpy as np
 import pandas as pd
 import warnings
 warnings.filterwarnings('ignore')
 
-from .feature_engineering import feature_engineer
+from .feature_engineering import feature_engineer, FEATURE_SET_VERSION
+from .strategies import STRATEGIES, resolve_params, strategy_signals
+from .walk_forward import run_walk_forward
+from .downsample import downsample
+from ..services.metrics import span
 
 
-def _pandas_backtest(df: pd.DataFrame, signals: pd.Series,
-                     initial_capital: float = 10_000.0) -> dict:
-    """Pandas-based backtest (fallback if vectorbt unavailable)."""
+# Bump when engine semantics change (invalidates cached results)
+ENGINE_VERSION = 1
+# A cached run keeps downloading from its own first bar (so new bars append
+# and the run is extended) for this long; then the period is fetched afresh.
+ANCHOR_MAX_DAYS = 30
+
+
+class BacktestCancelled(Exception):
+    """Raised at a checkpoint once the caller's `cancelled()` returns True."""
+
+
+def _checkpoint(cancelled):
+    if cancelled is not None and cancelled():
+        raise BacktestCancelled()
+
+
+def _reference_backtest(df: pd.DataFrame, signals: pd.Series,
+                        initial_capital: float = 10_000.0) -> dict:
+    """
+    Original bar-by-bar engine. Kept as the reference implementation for
+    parity checks and benchmarks — use _pandas_backtest in engine code.
+    """
     capital  = initial_capital
     position = 0
     entry_p  = 0.0
@@ -54,6 +78,76 @@ def _pandas_backtest(df: pd.DataFrame, signals: pd.Series,
             "pnl_pct": round((price - entry_p) / entry_p * 100, 2),
         })
 
+    return _summarize(np.asarray(equity, dtype=np.float64), trades, initial_capital)
+
+
+def _trade(entry_p: float, exit_p: float, shares: int) -> dict:
+    return {
+        "entry": entry_p, "exit": exit_p,
+        "pnl": round((exit_p - entry_p) * shares, 2),
+        "pnl_pct": round((exit_p - entry_p) / entry_p * 100, 2),
+    }
+
+
+def _simulate(close: np.ndarray, signals: np.ndarray,
+              initial_capital: float = 10_000.0):
+    """
+    Vectorized all-in long-only simulation (same rules as _reference_backtest).
+
+    The signal on bar i-1 acts on bar i: +1 enters when flat, -1 exits when
+    long. Position state is found by jumping between candidate entry/exit bars
+    with searchsorted, so the Python loop runs once per trade, not per bar;
+    cash/shares are then forward-filled across bars and equity is one array op.
+    Returns (equity, trades, open_trade) where open_trade is the position still
+    held on the last bar (or None).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    sig   = np.asarray(signals).astype(np.int64)
+    n     = len(close)
+
+    entries = np.flatnonzero(sig[:n - 1] == 1) + 1
+    exits   = np.flatnonzero(sig[:n - 1] == -1) + 1
+
+    capital    = initial_capital
+    trades     = []
+    open_trade = None
+    # Change points: bar → (cash, shares) held from that bar on
+    bars, cash_vals, pos_vals = [0], [capital], [0]
+
+    k = 0
+    while k < len(entries):
+        e     = int(entries[k])
+        price = float(close[e])
+        shares = int(capital * 0.95 / price)
+        if shares == 0:           # can't afford one unit — stay flat, retry later
+            k += 1
+            continue
+        cash_in = capital - shares * price
+        bars.append(e); cash_vals.append(cash_in); pos_vals.append(shares)
+
+        j = int(np.searchsorted(exits, e, side="right"))
+        if j == len(exits):
+            open_trade = {"entry_bar": e, "entry": price, "shares": shares, "cash": cash_in}
+            break
+        x      = int(exits[j])
+        exit_p = float(close[x])
+        capital = cash_in + shares * exit_p
+        trades.append(_trade(price, exit_p, shares))
+        bars.append(x); cash_vals.append(capital); pos_vals.append(0)
+        k = int(np.searchsorted(entries, x, side="right"))
+
+    seg    = np.searchsorted(np.asarray(bars), np.arange(n), side="right") - 1
+    cash   = np.asarray(cash_vals, dtype=np.float64)[seg]
+    shares = np.asarray(pos_vals, dtype=np.float64)[seg]
+    equity = cash + shares * close
+    if n:
+        equity[0] = initial_capital
+    return equity, trades, open_trade
+
+
+def _summarize(equity: np.ndarray, trades: list, initial_capital: float,
+               curve: bool = True) -> dict:
+    """Performance metrics from an equity curve and closed trades."""
     equity_series = pd.Series(equity)
     returns       = equity_series.pct_change().dropna()
     peak          = equity_series.cummax()
@@ -68,7 +162,7 @@ def _pandas_backtest(df: pd.DataFrame, signals: pd.Series,
     if len(returns) > 0 and returns.std() > 0:
         sharpe = float((returns.mean() / returns.std()) * np.sqrt(252))
 
-    return {
+    result = {
         "total_return_pct":  round(total_return, 2),
         "max_drawdown_pct":  round(max_dd, 2),
         "sharpe_ratio":      round(sharpe, 3),
@@ -76,15 +170,29 @@ def _pandas_backtest(df: pd.DataFrame, signals: pd.Series,
         "win_rate_pct":      round(win_rate, 2),
         "final_capital":     round(float(equity_series.iloc[-1]), 2),
         "initial_capital":   initial_capital,
-        "trades":            trades[:50],
-        "equity_curve":      [round(v, 2) for v in equity_series.tolist()],
     }
+    if curve:
+        result["trades"]       = trades[:50]
+        result["equity_curve"] = [round(v, 2) for v in equity_series.tolist()]
+    return result
+
+
+def _pandas_backtest(df: pd.DataFrame, signals: pd.Series,
+                     initial_capital: float = 10_000.0) -> dict:
+    """Vectorized backtest — results identical to _reference_backtest."""
+    equity, trades, open_trade = _simulate(
+        df['close'].to_numpy(dtype=np.float64), np.asarray(signals), initial_capital
+    )
+    # Close remaining
+    if open_trade:
+        trades.append(_trade(open_trade["entry"], float(df['close'].iloc[-1]),
+                             open_trade["shares"]))
+    return _summarize(equity, trades, initial_capital)
 
 
 def _generate_ml_signals(df: pd.DataFrame) -> pd.Series:
     """Generate signals from the ML ensemble on the feature matrix."""
     from .ml_ensemble import MLEnsemble, FEATURE_COLS
-    import numpy as np
 
     model = MLEnsemble()
     available = [c for c in FEATURE_COLS if c in df.columns]
@@ -92,14 +200,88 @@ def _generate_ml_signals(df: pd.DataFrame) -> pd.Series:
     if not available:
         return pd.Series(0, index=df.index)
 
-    signals = []
-    for i in range(len(df)):
-        row = df.iloc[i]
-        features = {c: float(row[c]) for c in available if not np.isnan(row[c])}
-        result   = model._rule_based_fallback(features)
-        signals.append(result['decision'])
+    return pd.Series(model.predict_batch(df), index=df.index)
+
+
+def _strategy_signals(df: pd.DataFrame, strategy: str, params: dict | None) -> pd.Series:
+    if strategy in STRATEGIES:
+        return strategy_signals(df, strategy, params)
+    try:
+        return _generate_ml_signals(df)
+    except Exception:
+        signals = pd.Series(0, index=df.index)
+        signals[df['rsi_14'] < 32] = 1
+        signals[df['rsi_14'] > 68] = -1
+        return signals
+
+
+def _engine_state(equity: np.ndarray, open_trade: dict | None) -> dict:
+    """Simulation state after the last bar, before the forced final close."""
+    if open_trade:
+        return {"capital": open_trade["cash"], "position": open_trade["shares"],
+                "entry_p": open_trade["entry"]}
+    return {"capital": float(equity[-1]), "position": 0, "entry_p": 0.0}
+
+
+def _extend_engine(close: np.ndarray, signals: np.ndarray, state: dict,
+                   start: int, equity: list, trades: list) -> dict:
+    """Advance a saved simulation over bars [start, n) — same rules as _simulate."""
+    capital, position, entry_p = state["capital"], state["position"], state["entry_p"]
+    for i in range(start, len(close)):
+        price, signal = float(close[i]), int(signals[i - 1])
+        if signal == 1 and position == 0:
+            position = int(capital * 0.95 / price)
+            entry_p  = price
+            capital -= position * price
+        elif signal == -1 and position > 0:
+            capital += position * price
+            trades.append(_trade(entry_p, price, position))
+            position = 0
+        equity.append(capital + position * price)
+    return {"capital": capital, "position": position, "entry_p": entry_p}
+
+
+def _finish(equity: np.ndarray, closed: list, state: dict, last_close: float,
+            initial_capital: float) -> dict:
+    trades = list(closed)
+    if state["position"] > 0:   # Close remaining
+        trades.append(_trade(state["entry_p"], last_close, state["position"]))
+    return _summarize(equity, trades, initial_capital)
 
-    return pd.Series(signals, index=df.index)
+
+def _close_digest(close: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(close, dtype=np.float64).tobytes()).hexdigest()[:32]
+
+
+def _try_extend(prev: dict, raw: pd.DataFrame, strategy: str, params: dict | None,
+                initial_capital: float) -> tuple | None:
+    """
+    Reuse a cached run when `raw` is the cached bar set plus newly appended bars
+    (same first bar, same closes on the overlap). Only the new bars are simulated.
+
+    Rolling windows (period="2y" fetched again a day later) also drop bars at
+    the front, so the first bar differs and the run is recomputed: a fresh run
+    starts its capital on the new first bar and warms its indicators up on
+    different bars, so no part of the cached run equals it. That is why
+    _run_backtest downloads from the cached first bar while the lineage is
+    younger than ANCHOR_MAX_DAYS: the window then grows instead of rolling.
+    benchmarks/bench_backtest_cache checks both cases.
+    """
+    n_old, n_new = prev["bars"], len(raw)
+    close = raw['close'].to_numpy(dtype=np.float64)
+    if (n_new <= n_old or str(raw.index[0]) != prev["first_ts"]
+            or str(raw.index[n_old - 1]) != prev["last_ts"]
+            or _close_digest(close[:n_old]) != prev["close_digest"]):
+        return None
+
+    df      = feature_engineer.compute_all_features(raw)
+    signals = np.asarray(_strategy_signals(df, strategy, params))
+    equity  = prev["equity"].tolist()
+    closed  = list(prev["closed_trades"])
+    state   = _extend_engine(close, signals, prev["state"], n_old, equity, closed)
+    equity  = np.asarray(equity, dtype=np.float64)
+    result  = {**prev["result"], **_finish(equity, closed, state, float(close[-1]), initial_capital)}
+    return result, equity, closed, state, n_new - n_old
 
 
 def run_backtest(
@@ -107,83 +289,172 @@ def run_backtest(
     period:          str = "2y",
     initial_capital: float = 10_000.0,
     strategy:        str  = "ml",   # "ml" | "rsi" | "macd" | "sma"
+    params:          dict | None = None,
+    wf_mode:         str  = "anchored",   # "anchored" | "rolling"
+    on_fold=None,
+    use_cache:       bool = True,
+    points:          int | None = None,
+    curve_method:    str  = "lttb",      # "lttb" | "minmax"
+    cancelled=None,
 ) -> dict:
     """
     Run a full backtest for a symbol.
     Strategies: ml (ML ensemble), rsi, macd, sma_cross
+    `params` overrides the rule-based strategy defaults (see strategies.STRATEGIES).
+    `on_fold(fold_result)` is called as each walk-forward fold completes.
+    Results are cached by inputs + price fingerprint (services.backtest_cache);
+    when only new bars were appended the cached run is extended.
+    `points` caps the returned equity curves (downsampled with `curve_method`);
+    the full-resolution curve stays available under `result_id`.
+    `cancelled()` is polled between stages and after every fold; once it
+    returns True the run stops with BacktestCancelled.
     """
+    with span("backtest.total") as sp:
+        result = _run_backtest(symbol, period, initial_capital, strategy, params, wf_mode,
+                               on_fold, use_cache, points, curve_method, cancelled)
+        sp.ok        = "error" not in result
+        sp.cache_hit = result.get("cache", {}).get("hit")
+    return result
+
+
+def _run_backtest(symbol, period, initial_capital, strategy, params, wf_mode,
+                  on_fold, use_cache, points, curve_method, cancelled=None) -> dict:
+    from ..services.backtest_cache import backtest_cache
+
+    def fold_done(fold: dict):
+        if on_fold:
+            on_fold(fold)
+        _checkpoint(cancelled)
+
     try:
-        df = feature_engineer.get_feature_matrix(symbol, period=period)
-        if df.empty or len(df) < 60:
+        if strategy in STRATEGIES:
+            params = resolve_params(strategy, params)
+        inputs = {
+            "symbol": symbol, "period": period, "strategy": strategy, "params": params,
+            "initial_capital": float(initial_capital), "wf_mode": wf_mode,
+            "engine": ENGINE_VERSION, "features": FEATURE_SET_VERSION,
+        }
+        lineage = backtest_cache.lineage_key(inputs)
+        prev    = backtest_cache.latest(lineage) if use_cache else None
+        now     = pd.Timestamp.utcnow()
+        anchor  = prev.get("anchored_since") if prev else None
+        if anchor and now - pd.Timestamp(anchor) < pd.Timedelta(days=ANCHOR_MAX_DAYS):
+            raw = feature_engineer.get_raw_data(symbol, period=period,
+                                                start=pd.Timestamp(prev["first_ts"]))
+        else:
+            raw, anchor = feature_engineer.get_raw_data(symbol, period=period), str(now)
+        _checkpoint(cancelled)
+        if raw.empty or len(raw) < 60:
             return {"error": f"לא מספיק נתונים עבור {symbol}"}
 
+        fingerprint = {"bars": len(raw), "last_ts": str(raw.index[-1]),
+                       "close_digest": _close_digest(raw['close'].to_numpy(dtype=np.float64))}
+        key = backtest_cache.key(inputs, fingerprint)
+
+        if use_cache:
+            hit = backtest_cache.get(key)
+            if hit:
+                return _respond(hit["result"], hit["equity"], key, points, curve_method, hit=True)
+            extended = prev and _try_extend(prev, raw, strategy, params, initial_capital)
+            if extended:
+                result, equity, closed, state, n_added = extended
+                _store(backtest_cache, key, lineage, raw, result, equity, closed, state, anchor)
+                return _respond(result, equity, key, points, curve_method,
+                                hit=True, extended_bars=n_added)
+
+        df = feature_engineer.compute_all_features(raw)
+        _checkpoint(cancelled)
+
         # ── Generate signals based on strategy ────────────────
-        if strategy == "rsi":
-            signals = pd.Series(0, index=df.index)
-            signals[df['rsi_14'] < 30] = 1
-            signals[df['rsi_14'] > 70] = -1
-
-        elif strategy == "macd":
-            signals = pd.Series(0, index=df.index)
-            if 'macd' in df.columns and 'macd_signal' in df.columns:
-                signals[(df['macd'] > df['macd_signal']) &
-                        (df['macd'].shift(1) <= df['macd_signal'].shift(1))] = 1
-                signals[(df['macd'] < df['macd_signal']) &
-                        (df['macd'].shift(1) >= df['macd_signal'].shift(1))] = -1
-
-        elif strategy == "sma":
-            signals = pd.Series(0, index=df.index)
-            if 'sma_20' in df.columns and 'sma_50' in df.columns:
-                signals[(df['sma_20'] > df['sma_50']) &
-                        (df['sma_20'].shift(1) <= df['sma_50'].shift(1))] = 1
-                signals[(df['sma_20'] < df['sma_50']) &
-                        (df['sma_20'].shift(1) >= df['sma_50'].shift(1))] = -1
-
-        else:  # ml
-            try:
-                from .ml_ensemble import ml_ensemble, FEATURE_COLS
-                available = [c for c in FEATURE_COLS if c in df.columns]
-                valid     = df[available].notna().all(axis=1)
-                df_valid  = df[valid]
-                if len(df_valid) > 100:
-                    ml_ensemble.train(df_valid)
-                signals = _generate_ml_signals(df)
-            except:
-                signals = pd.Series(0, index=df.index)
-                signals[df['rsi_14'] < 32] = 1
-                signals[df['rsi_14'] > 68] = -1
-
-        result = _pandas_backtest(df, signals, initial_capital)
+        # ml: an untrained ensemble (rule-based) — out-of-sample fits are per fold in walk-forward
+        with span("backtest.signals"):
+            signals = _strategy_signals(df, strategy, params)
+
+        close = df['close'].to_numpy(dtype=np.float64)
+        with span("backtest.simulate"):
+            equity, closed, open_trade = _simulate(close, np.asarray(signals), initial_capital)
+        _checkpoint(cancelled)
+        state  = _engine_state(equity, open_trade)
+        result = _finish(equity, closed, state, float(close[-1]), initial_capital)
         result['symbol']   = symbol
         result['strategy'] = strategy
         result['period']   = period
+        if strategy in STRATEGIES:
+            result['params'] = params
 
-        # Walk-Forward summary
-        n = len(df)
-        wf_results = []
-        fold_size  = n // 5
-        for fold in range(4):
-            start  = fold * fold_size
-            mid    = start + fold_size
-            end    = mid   + fold_size
-            if end > n: break
-            df_fold = df.iloc[start:end]
-            sg_fold = signals.iloc[start:end]
-            r = _pandas_backtest(df_fold, sg_fold, initial_capital)
-            wf_results.append({
-                "fold": fold + 1,
-                "return": r['total_return_pct'],
-                "sharpe": r['sharpe_ratio'],
-                "win_rate": r['win_rate_pct'],
-                "max_dd":  r['max_drawdown_pct'],
-            })
-
-        result['walk_forward'] = wf_results
-        result['wf_avg_return'] = round(
-            sum(w['return'] for w in wf_results) / len(wf_results), 2
-        ) if wf_results else 0
+        # Walk-Forward: per-fold fit on the train window, out-of-sample test window
+        with span("backtest.walk_forward"):
+            wf = run_walk_forward(df, strategy, mode=wf_mode, n_folds=4,
+                                  initial_capital=initial_capital, on_fold=fold_done)
+        result['walk_forward']  = wf['folds']
+        result['wf_mode']       = wf['mode']
+        result['wf_avg_return'] = wf.get('avg_return', 0)
+        result['wf_as_of']      = str(df.index[-1])
+        if 'oos' in wf:
+            result['wf_oos'] = wf['oos']
 
-        return result
+        if use_cache:
+            _store(backtest_cache, key, lineage, raw, result, equity, closed, state, anchor)
+        return _respond(result, equity, key if use_cache else None, points, curve_method,
+                        hit=False)
 
+    except BacktestCancelled:
+        raise
     except Exception as e:
         return {"error": str(e), "symbol": symbol}
+
+
+def _store(cache, key, lineage, raw, result, equity, closed, state, anchored_since):
+    close = raw['close'].to_numpy(dtype=np.float64)
+    record = {
+        "result":        {k: v for k, v in result.items() if k != "equity_curve"},
+        "closed_trades": closed,
+        "state":         state,
+        "bars":          len(raw),
+        "first_ts":      str(raw.index[0]),
+        "last_ts":       str(raw.index[-1]),
+        "close_digest":  _close_digest(close),
+        "anchored_since": anchored_since,
+    }
+    try:
+        cache.put(key, lineage, record, equity)
+    except OSError as e:
+        print(f"⚠️ Backtest cache write failed: {e}")
+
+
+def load_result(result_id: str) -> dict | None:
+    """Cached backtest by result_id → {result, equity (full), trades (all)}."""
+    from ..services.backtest_cache import backtest_cache
+    record = backtest_cache.get(result_id)
+    if record is None:
+        return None
+    equity, state = record["equity"], record["state"]
+    trades = list(record["closed_trades"])
+    if state["position"] > 0:
+        # Equity on the last bar = cash + shares × last close
+        last_close = (float(equity[-1]) - state["capital"]) / state["position"]
+        trades.append(_trade(state["entry_p"], last_close, state["position"]))
+    return {"result": record["result"], "equity": equity, "trades": trades}
+
+
+def _curve(values, points: int | None, method: str) -> dict:
+    values = np.asarray(values, dtype=np.float64)
+    if not points or len(values) <= points:
+        return {"equity_curve": [round(v, 2) for v in values.tolist()]}
+    idx, vals = downsample(values, points, method)
+    return {
+        "equity_curve":       [round(v, 2) for v in vals.tolist()],
+        "equity_curve_index": idx.tolist(),
+        "equity_curve_total": len(values),
+    }
+
+
+def _respond(result: dict, equity: np.ndarray, key: str | None, points: int | None,
+             curve_method: str, hit: bool, extended_bars: int = 0) -> dict:
+    out = dict(result)
+    out.update(_curve(equity, points, curve_method))
+    if points and "wf_oos" in out:
+        out["wf_oos"] = {**out["wf_oos"], **_curve(out["wf_oos"]["equity_curve"], points, curve_method)}
+    out["result_id"] = key
+    out["cache"] = {"hit": hit, "extended_bars": extended_bars}
+    return out
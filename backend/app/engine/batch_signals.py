@@ -0,0 +1,229 @@
+# backend/app/engine/batch_signals.py
+"""
+Batch signal generation — many symbols, shared fetches, vectorized scoring.
+
+  prices        one multi-ticker yfinance download for the whole batch
+  fundamentals  ┐ per-symbol calls on one shared, bounded I/O pool
+  sentiment     ┘ (the limit holds across every batch in flight)
+  TA / fusion   cross_section over all symbols at once
+
+Results are yielded as soon as a symbol's fundamentals and news are in —
+symbols without price data first, then in completion order. After
+BATCH_IO_TIMEOUT the remaining symbols are scored with the same fallbacks
+generate_signal uses and reported in `degraded_stages`.
+"""
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import feature_engineer, FEATURE_SET_VERSION
+from .ml_ensemble         import model_for
+from .sentiment           import sentiment_engine, NEUTRAL_SENTIMENT
+from .signal_fusion       import (STAGES, FEATURE_PERIOD, Components, project, _empty_result, _finalize,
+                                  _news_rows)
+from .cross_section       import (ta_scores, ta_signals, fundamentals_frame, fundamental_scores,
+                                  fuse, decisions, score_matrix, rank, RANK_COLUMNS)
+from ..services.yfinance_service import yf_service
+from ..services.news_store import news_store
+from ..services.metrics import span, in_context
+
+MAX_BATCH        = 300
+IO_WORKERS       = 8
+BATCH_IO_TIMEOUT = 30.0
+
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="signal-batch")
+
+
+def normalize_symbols(symbols: list) -> list:
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    if not syms:
+        raise ValueError("לא נבחרו סימבולים")
+    if len(syms) > MAX_BATCH:
+        raise ValueError(f"ניתן לבקש עד {MAX_BATCH} סימבולים בבקשה אחת")
+    return syms
+
+
+def _stage_value(name: str, fut, symbol: str) -> tuple:
+    """(value, degraded entry | None) of a finished or abandoned I/O future."""
+    fallback = STAGES[name]["fallback"]
+    if not fut.done():
+        fut.cancel()
+        return fallback(symbol), {"stage": name, "reason": "timeout"}
+    try:
+        value = fut.result()
+        if isinstance(value, dict) and value.get("error"):
+            raise RuntimeError(value["error"])
+        return _news_rows(value) if name == "sentiment" else (value, None)
+    except Exception as e:
+        return fallback(symbol), {"stage": name, "reason": "error", "detail": str(e)}
+
+
+def _error_result(symbol: str, error: str) -> dict:
+    result = _empty_result(symbol)
+    result['error']        = error
+    result['reasoning_he'] = f"שגיאה בחישוב האות: {error}"
+    return result
+
+
+class _Batch:
+    """Shared inputs of a batch: I/O futures, features and ML per symbol."""
+
+    def __init__(self, symbols: list):
+        self.syms     = normalize_symbols(symbols)
+        self.deadline = time.monotonic() + BATCH_IO_TIMEOUT
+        self.memos    = {s: Components(s) for s in self.syms}
+
+        # ── Step 1: Per-symbol I/O on the shared pool ─────────
+        def _submit(name, fn, sym):
+            def run():
+                with span(f"signal.{name}"):
+                    return fn(sym)
+            return _io_pool.submit(in_context(run))   # one context per call
+        self.fund_f = {s: _submit("fundamentals", yf_service.get_fundamentals, s) for s in self.syms}
+        self.news_f = {s: _submit("sentiment", lambda sym: news_store.recent_status(sym, days=7), s)
+                       for s in self.syms}
+
+        # ── Step 2: Prices (one download) → features per symbol
+        self.features, self.errors = {}, {}
+        with span("signal.features"):
+            try:
+                raw = feature_engineer.get_raw_data_bulk(self.syms, period=FEATURE_PERIOD)
+            except Exception as e:
+                print(f"Batch download error: {e}")
+                raw = {}
+            for sym in self.syms:
+                df = raw.get(sym)
+                try:
+                    if df is None or df.empty:
+                        raise ValueError(f"אין נתונים עבור {sym}")
+                    self.features[sym] = self.memos[sym].get(
+                        "features", (df, FEATURE_SET_VERSION),
+                        lambda: feature_engineer.latest_features(feature_engineer.compute_all_features(df)))
+                except Exception as e:
+                    self.fund_f.pop(sym).cancel()
+                    self.news_f.pop(sym).cancel()
+                    self.errors[sym] = str(e)
+        self.ok = [s for s in self.syms if s in self.features]
+
+        # ── Step 3: ML per symbol ─────────────────────────────
+        with span("signal.ml"):
+            self.ml = {s: self.memos[s].get("ml", (self.features[s], model_for(s).version),
+                                            lambda: model_for(s).predict(self.features[s]))
+                       for s in self.ok}
+
+    def ready(self, pending: set) -> list:
+        """Block until some pending symbols have all their I/O (or the deadline passed)."""
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            return [s for s in self.ok if s in pending]
+        waiting = [f for s in pending for f in (self.fund_f[s], self.news_f[s]) if not f.done()]
+        if waiting:
+            wait(waiting, timeout=remaining, return_when=FIRST_COMPLETED)
+        return [s for s in self.ok if s in pending and self.fund_f[s].done() and self.news_f[s].done()]
+
+    def io_values(self, syms: list) -> tuple:
+        """(fundamentals rows, sentiment rows, degraded stages per symbol)."""
+        fund_rows, sent_rows, degraded = [], [], []
+        for sym in syms:
+            fund, d1 = _stage_value("fundamentals", self.fund_f[sym], sym)
+            news, d2 = _stage_value("sentiment", self.news_f[sym], sym)
+            sent = dict(NEUTRAL_SENTIMENT) if news is None else \
+                   self.memos[sym].get("sentiment", (news,), lambda: sentiment_engine.aggregate(news))
+            fund_rows.append(fund)
+            sent_rows.append(sent)
+            degraded.append([d for d in (d1, d2) if d])
+        return fund_rows, sent_rows, degraded
+
+
+def generate_signals_batch(symbols: list, fields: frozenset | None = None) -> Iterator[dict]:
+    """Yield one generate_signal-shaped result (projected to `fields`) per deduplicated symbol."""
+    batch = _Batch(symbols)
+    for sym, error in batch.errors.items():
+        yield project(_error_result(sym, error), fields)
+    if not batch.ok:
+        return
+
+    # ── Step 4: TA (vectorized) once, then score + stream each group ─
+    ok       = batch.ok
+    row      = {s: i for i, s in enumerate(ok)}
+    ta, hits = ta_scores(pd.DataFrame([batch.features[s] for s in ok]))
+    pending  = set(ok)
+    while pending:
+        ready = batch.ready(pending)
+        if not ready:
+            continue
+        fund_rows, sent_rows, degraded = batch.io_values(ready)
+        idx = np.array([row[s] for s in ready])
+        fused, confidence = fuse(
+            [batch.ml[s]['decision'] for s in ready],
+            [batch.ml[s]['confidence'] for s in ready],
+            [s.get('aggregate_score', 0.0) for s in sent_rows],
+            ta[idx],
+            fundamental_scores(fundamentals_frame(fund_rows)),
+        )
+        for i, (sym, decision) in enumerate(zip(ready, decisions(fused, confidence))):
+            result = _empty_result(sym)
+            result["degraded_stages"] = degraded[i]
+            try:
+                _finalize(result, batch.features[sym], fund_rows[i], sent_rows[i], batch.ml[sym],
+                          ta_signals(hits[idx[i]]), float(fused[i]), float(confidence[i]), decision,
+                          batch.memos[sym], fields)
+            except Exception as e:
+                result = _error_result(sym, str(e))
+                print(f"Signal error for {sym}: {traceback.format_exc()}")
+            yield project(result, fields)
+        pending.difference_update(ready)
+
+
+def leaderboard(symbols: list, sort_by: str = "fused_score") -> dict:
+    """
+    Rank a universe by the fusion model: every input is gathered first (same
+    deadline/fallbacks as the batch), then the whole symbol × feature matrix
+    is scored in one cross_section.score_matrix call. An empty universe
+    ranks nothing (count 0).
+    """
+    if sort_by not in RANK_COLUMNS:
+        raise ValueError(f"sort_by חייב להיות אחד מ-{RANK_COLUMNS}")
+    if not symbols:
+        return {"count": 0, "sort_by": sort_by, "leaderboard": [], "errors": []}
+    batch = _Batch(symbols)
+    rows  = []
+    if batch.ok:
+        ok = batch.ok
+        pending = set(ok)
+        while pending:
+            pending.difference_update(batch.ready(pending))
+        fund_rows, sent_rows, degraded = batch.io_values(ok)
+        with span("signal.leaderboard"):
+            scores = rank(score_matrix(
+                pd.DataFrame([batch.features[s] for s in ok], index=ok),
+                fund_rows,
+                [batch.ml[s] for s in ok],
+                [s.get('aggregate_score', 0.0) for s in sent_rows],
+            ), by=sort_by)
+        degraded = dict(zip(ok, degraded))
+        for sym, r in scores.iterrows():
+            rows.append({
+                "rank":              int(r["rank"]),
+                "symbol":            sym,
+                "decision":          r["decision"],
+                "fused_score":       round(float(r["fused_score"]), 4),
+                "confidence":        round(float(r["confidence"]), 4),
+                "ml_score":          round(float(r["ml_score"]), 4),
+                "sentiment_score":   round(float(r["sentiment_score"]), 4),
+                "ta_score":          round(float(r["ta_score"]), 4),
+                "fundamental_score": round(float(r["fundamental_score"]), 4),
+                "ta_signals":        int(r["ta_signals"]),
+                "price":             round(float(batch.features[sym]["price"]), 4),
+                "degraded_stages":   [d["stage"] for d in degraded[sym]],
+            })
+    return {
+        "count":       len(rows),
+        "sort_by":     sort_by,
+        "leaderboard": rows,
+        "errors":      [{"symbol": s, "error": e} for s, e in batch.errors.items()],
+    }
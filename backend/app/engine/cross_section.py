@@ -0,0 +1,162 @@
+# backend/app/engine/cross_section.py
+"""
+Array versions of the fusion model in signal_fusion — one row per symbol.
+
+TA checks, fundamental rules, weighted fusion, confidence and the decision
+thresholds are evaluated over whole columns at once. Each function adds
+terms in the same order as its scalar counterpart, so per-symbol results
+are identical to _ta_score / _fundamental_score / _fuse / generate_signal
+(benchmarks/bench_cross_section checks this on random inputs).
+
+score_matrix scores a whole (symbol × feature) matrix in one call and
+rank turns it into a leaderboard.
+"""
+import numpy as np
+import pandas as pd
+
+from .signal_fusion import WEIGHTS, DECISION_SCORE, DECISION_CONFIDENCE, DECISION_STYLES
+
+# (label, weight, direction, condition over column getter `c`) — mirrors _ta_score
+TA_CHECKS = [
+    ("RSI oversold",           0.15, +1, lambda c: c('rsi_os', 0) == 1),
+    ("RSI overbought",         0.15, -1, lambda c: c('rsi_ob', 0) == 1),
+    ("MACD bullish cross",     0.20, +1, lambda c: c('macd_cross', 0) == 1),
+    ("SMA20 > SMA50",          0.15, +1, lambda c: c('sma_cross_20_50', 0) == 1),
+    ("Bullish divergence",     0.15, +1, lambda c: c('bullish_divergence', 0) != 0),
+    ("Bearish divergence",     0.15, -1, lambda c: c('bearish_divergence', 0) != 0),
+    ("Volume surge + uptrend", 0.10, +1, lambda c: (c('volume_surge', 0) == 1) & (c('price_vs_sma20', 0) > 0)),
+    ("Near support level",     0.10, +1, lambda c: c('near_support', 0) == 1),
+    ("Near resistance level",  0.10, -1, lambda c: c('near_resistance', 0) == 1),
+    ("BB lower band touch",    0.10, +1, lambda c: c('bb_pct', 0.5) < 0.10),
+    ("BB upper band touch",    0.10, -1, lambda c: c('bb_pct', 0.5) > 0.90),
+    ("Hammer candle",          0.05, +1, lambda c: c('hammer', 0) == 1),
+    ("Price above VWAP",       0.05, +1, lambda c: c('price_vs_vwap', 0) > 0.01),
+    ("Price below VWAP",       0.05, -1, lambda c: c('price_vs_vwap', 0) < -0.01),
+]
+
+_TA_WEIGHT_SUM = 0.0
+for _, _w, _, _ in TA_CHECKS:
+    _TA_WEIGHT_SUM += _w
+
+RANK_COLUMNS = ("fused_score", "confidence", "ml_score", "sentiment_score",
+                "ta_score", "fundamental_score")
+
+FUNDAMENTAL_FIELDS = ("pe_ratio", "forward_pe", "return_on_equity", "profit_margin",
+                      "revenue_growth", "debt_to_equity", "beta")
+
+
+def _getter(frame: pd.DataFrame):
+    n = len(frame)
+    def c(name, default):
+        if name in frame.columns:
+            return frame[name].to_numpy(dtype=np.float64)
+        return np.full(n, float(default))
+    return c
+
+
+def ta_scores(features: pd.DataFrame) -> tuple:
+    """(normalized score per row, hit matrix rows × TA_CHECKS)."""
+    c     = _getter(features)
+    hits  = np.column_stack([np.asarray(cond(c), dtype=bool) for _, _, _, cond in TA_CHECKS]) \
+            if len(features) else np.zeros((0, len(TA_CHECKS)), dtype=bool)
+    score = np.zeros(len(features))
+    for k, (_, weight, direction, _) in enumerate(TA_CHECKS):
+        score = score + np.where(hits[:, k], weight * direction, 0.0)
+    return score / (_TA_WEIGHT_SUM + 1e-9), hits
+
+
+def ta_signals(hits_row: np.ndarray) -> list:
+    """The triggered-checks list _ta_score returns, for one row of the hit matrix."""
+    return [{"signal": label, "direction": direction, "weight": weight}
+            for (label, weight, direction, _), hit in zip(TA_CHECKS, hits_row) if hit]
+
+
+def fundamentals_frame(rows: list) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=list(FUNDAMENTAL_FIELDS)) if rows \
+            else pd.DataFrame(columns=list(FUNDAMENTAL_FIELDS))
+    frame = frame.apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    # Falsy (None / 0) fields are skipped by the scalar rules
+    return frame.where(frame != 0)
+
+
+def fundamental_scores(fund: pd.DataFrame) -> np.ndarray:
+    """Vectorized _fundamental_score over a fundamentals_frame."""
+    pe, fpe, roe = fund['pe_ratio'].to_numpy(), fund['forward_pe'].to_numpy(), fund['return_on_equity'].to_numpy()
+    mg, rg, de   = fund['profit_margin'].to_numpy(), fund['revenue_growth'].to_numpy(), fund['debt_to_equity'].to_numpy()
+    z = 0.0
+    score = np.zeros(len(fund))
+    score = score + np.select([(pe > 0) & (pe < 15), pe > 40, (pe >= 15) & (pe < 25)], [0.3, -0.2, 0.1], z)
+    score = score + np.where(fpe < pe, 0.2, z)
+    score = score + np.select([roe > 0.15, roe < 0], [0.2, -0.3], z)
+    score = score + np.select([mg > 0.20, mg < 0], [0.15, -0.2], z)
+    score = score + np.select([rg > 0.15, rg < 0], [0.15, -0.15], z)
+    score = score + np.select([de > 200, de < 50], [-0.2, 0.1], z)
+    return np.clip(score, -1.0, 1.0)
+
+
+def fuse(ml_decision, ml_conf, sent_score, ta_score, fund_score) -> tuple:
+    """(fused score, combined confidence) — the Step 6–7 formulas of generate_signal."""
+    ml_conf    = np.asarray(ml_conf, dtype=np.float64)
+    sent_score = np.asarray(sent_score, dtype=np.float64)
+    ta_score   = np.asarray(ta_score, dtype=np.float64)
+    ml_score   = np.asarray(ml_decision) * ml_conf
+    fused = (
+        WEIGHTS['ml']          * ml_score    +
+        WEIGHTS['sentiment']   * sent_score  +
+        WEIGHTS['technical']   * ta_score    +
+        WEIGHTS['fundamental'] * np.asarray(fund_score, dtype=np.float64)
+    )
+    confidence = (
+        ml_conf * 0.5 +
+        np.minimum(np.abs(sent_score) + 0.3, 1.0) * 0.3 +
+        np.minimum(np.abs(ta_score) + 0.3, 1.0) * 0.2
+    )
+    return fused, confidence
+
+
+def decision_labels(fused: np.ndarray, confidence: np.ndarray) -> np.ndarray:
+    """The _to_hebrew_decision label per row."""
+    sure = np.asarray(confidence) > DECISION_CONFIDENCE
+    buy  = (fused > DECISION_SCORE) & sure
+    sell = (fused < -DECISION_SCORE) & sure
+    return np.select([buy, sell], ["קנייה", "מכירה"], "החזק")
+
+
+def decisions(fused: np.ndarray, confidence: np.ndarray) -> list:
+    """_to_hebrew_decision per row."""
+    out = []
+    for label, f in zip(decision_labels(fused, confidence), fused):
+        color, emoji = DECISION_STYLES[str(label)]
+        out.append({"label": str(label), "color": color, "emoji": emoji, "score": round(float(f), 4)})
+    return out
+
+
+def score_matrix(features: pd.DataFrame, fundamentals: list, ml: list, sentiment) -> pd.DataFrame:
+    """
+    Fusion model over a (symbol × feature) matrix. `fundamentals` / `ml`
+    (predict() dicts) / `sentiment` (aggregate scores) are aligned with the
+    rows of `features`; the result keeps its index.
+    """
+    ta, hits   = ta_scores(features)
+    fund       = fundamental_scores(fundamentals_frame(fundamentals))
+    ml_dec     = np.array([m['decision'] for m in ml], dtype=np.float64)
+    ml_conf    = np.array([m['confidence'] for m in ml], dtype=np.float64)
+    sentiment  = np.asarray(sentiment, dtype=np.float64)
+    fused, confidence = fuse(ml_dec, ml_conf, sentiment, ta, fund)
+    return pd.DataFrame({
+        "decision":          decision_labels(fused, confidence),
+        "fused_score":       fused,
+        "confidence":        confidence,
+        "ml_score":          ml_dec * ml_conf,
+        "sentiment_score":   sentiment,
+        "ta_score":          ta,
+        "fundamental_score": fund,
+        "ta_signals":        hits.sum(axis=1),
+    }, index=features.index)
+
+
+def rank(scores: pd.DataFrame, by: str = "fused_score") -> pd.DataFrame:
+    """Sort descending by `by` (stable — ties keep input order) and add a 1-based rank."""
+    out = scores.sort_values(by, ascending=False, kind="mergesort")
+    out.insert(0, "rank", np.arange(1, len(out) + 1))
+    return out
@@ -0,0 +1,77 @@
+# backend/app/engine/downsample.py
+"""
+Shape-preserving downsampling of long series (equity curves) for charts.
+
+  lttb:   Largest-Triangle-Three-Buckets — keeps the visually significant
+          points (peaks, troughs, drawdown bottoms); one pass, O(n).
+  minmax: per bucket keeps both the min and the max, in time order —
+          exact envelope, never hides a drawdown.
+
+Both keep the first and last points and return (indices, values).
+"""
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+
+def _bucket_bounds(n: int, n_buckets: int) -> np.ndarray:
+    """Edges splitting the interior points [1, n-1) into n_buckets buckets."""
+    return np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+
+
+def lttb(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of the LTTB-selected points (x = bar index)."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = _bucket_bounds(n, n_out - 2)
+    # Average point of each bucket — used as the third triangle vertex
+    csum  = np.concatenate([[0.0], np.cumsum(y)])
+    cnt   = np.maximum(edges[1:] - edges[:-1], 1)
+    avg_y = (csum[edges[1:]] - csum[edges[:-1]]) / cnt
+    avg_x = (edges[1:] + edges[:-1] - 1) / 2.0
+    avg_y = np.append(avg_y[1:], y[-1])
+    avg_x = np.append(avg_x[1:], n - 1)
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x[b]) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y[b] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def minmax(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices of each bucket's min and max (≈ n_out points)."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    n_buckets = (n_out - 2) // 2
+    edges = _bucket_bounds(n, n_buckets)
+    size  = int((edges[1:] - edges[:-1]).max())
+    # Pad buckets to equal width, then one reduction per row
+    idx   = edges[:-1, None] + np.arange(size)[None, :]
+    valid = idx < edges[1:, None]
+    idx   = np.minimum(idx, n - 2)
+    vals  = y[idx]
+    lo = idx[np.arange(n_buckets), np.where(valid, vals, np.inf).argmin(axis=1)]
+    hi = idx[np.arange(n_buckets), np.where(valid, vals, -np.inf).argmax(axis=1)]
+    keep = np.concatenate([[0], np.minimum(lo, hi), np.maximum(lo, hi), [n - 1]])
+    return np.unique(keep)
+
+
+def downsample(y, points: int, method: str = "lttb") -> tuple:
+    """(indices, values) — the input unchanged when it already fits."""
+    if method not in METHODS:
+        raise ValueError(f"method חייב להיות אחד מ-{METHODS}")
+    y   = np.asarray(y, dtype=np.float64)
+    idx = lttb(y, points) if method == "lttb" else minmax(y, points)
+    return idx, y[idx]
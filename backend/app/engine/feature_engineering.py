@@ -2,18 +2,95 @@ import numpy as np
 import pandas as pd
 import pandas_ta as ta
 import yfinance as yf
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from ..services.metrics import span
+
+# Bump when compute_all_features output changes (invalidates cached backtests)
+FEATURE_SET_VERSION = 1
+RAW_TTL_SECONDS     = 60
+RAW_CACHE_MAX       = 256
+# One frame shape for both download paths (Ticker.history and yf.download):
+# split/dividend-adjusted OHLCV, lower-case columns, exchange-local index
+RAW_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df.columns = [c.lower() for c in df.columns]
+    return df[[c for c in RAW_COLUMNS if c in df.columns]].dropna()
+
+
 class FeatureEngineer:
-    def get_raw_data(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
+    def __init__(self):
+        self._raw_cache = {}   # (symbol, period or start, interval) → (expires, df)
+
+    def get_raw_data(self, symbol: str, period: str = "1y", interval: str = "1d",
+                     start=None) -> pd.DataFrame:
+        """OHLCV bars for `period`, or from `start` (inclusive) up to now when given."""
+        key   = (symbol, period if start is None else f"start={start}", interval)
+        entry = self._raw_cache.get(key)
+        with span("yf.history") as sp:
+            sp.cache_hit = bool(entry and entry[0] > time.time())
+            if sp.cache_hit:
+                return entry[1]
+            ticker = yf.Ticker(symbol)
+            if start is None:
+                df = ticker.history(period=period, interval=interval, auto_adjust=True)
+            else:
+                df = ticker.history(start=start, interval=interval, auto_adjust=True)
         if df.empty: raise ValueError(f"No data for {symbol}")
-        df.columns = [c.lower() for c in df.columns]
-        return df.dropna()
+        df = _normalize(df)
+        self._cache_raw(key, df)
+        return df
+
+    def _cache_raw(self, key: tuple, df: pd.DataFrame):
+        """Store a frame; past RAW_CACHE_MAX expired entries go first, then the oldest."""
+        if len(self._raw_cache) >= RAW_CACHE_MAX:
+            now  = time.time()
+            live = [(k, v) for k, v in self._raw_cache.items() if v[0] > now and k != key]
+            self._raw_cache = dict(live[-(RAW_CACHE_MAX - 1):])   # insertion order = expiry order
+        self._raw_cache[key] = (time.time() + RAW_TTL_SECONDS, df)
+
+    def get_raw_data_bulk(self, symbols: list, period: str = "1y", interval: str = "1d") -> dict:
+        """
+        One multi-ticker download → {symbol: OHLCV frame} (same shape as
+        get_raw_data). Fresh cache entries are reused; symbols without data are
+        left out. Downloaded frames also warm the per-symbol cache.
+        """
+        now, out, missing = time.time(), {}, []
+        for sym in symbols:
+            entry = self._raw_cache.get((sym, period, interval))
+            if entry and entry[0] > now:
+                out[sym] = entry[1]
+            else:
+                missing.append(sym)
+        if not missing:
+            return out
+        with span("yf.download"):
+            raw = yf.download(missing, period=period, interval=interval, auto_adjust=True,
+                              ignore_tz=False, group_by="ticker", threads=True, progress=False)
+        if raw is None or raw.empty:
+            return out
+        for sym in missing:
+            try:
+                df = raw[sym] if isinstance(raw.columns, pd.MultiIndex) else raw
+            except KeyError:
+                continue
+            df = _normalize(df)
+            if df.empty:
+                continue
+            self._cache_raw((sym, period, interval), df)
+            out[sym] = df
+        return out
 
     def compute_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        with span("features.compute"):
+            return self._compute_all_features(df)
+
+    def _compute_all_features(self, df: pd.DataFrame) -> pd.DataFrame:
         df = df.copy()
         df['returns'] = df['close'].pct_change()
         
@@ -45,7 +122,10 @@ class FeatureEngineer:
         return self.compute_all_features(self.get_raw_data(symbol, period))
 
     def get_latest_features(self, symbol: str) -> dict:
-        df = self.get_feature_matrix(symbol, period="6mo")
+        return self.latest_features(self.get_feature_matrix(symbol, period="6mo"))
+
+    def latest_features(self, df: pd.DataFrame) -> dict:
+        """Signal-time feature dict from the last row of a feature matrix."""
         row = df.iloc[-1]
 
         price     = float(row.get('close', 0))
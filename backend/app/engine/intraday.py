@@ -0,0 +1,201 @@
+# backend/app/engine/intraday.py
+"""
+Intraday order-driven backtester (long only, one position at a time).
+
+A strategy entry signal on bar t-1 places an order for bar t: MARKET fills
+at the open, LIMIT rests at close[t-1] × (1 - offset) for `ttl_bars` bars
+(an exit signal cancels it). Filled positions carry a stop loss and take
+profit matched against each bar's high/low by order_matching — the same
+rules the paper-trading loop applies to live prices — and an exit signal
+closes at the next bar's open.
+
+Bars are plain float64 arrays. The loop runs once per order/trade; each
+"when does the next event happen" question is answered with vectorized
+comparisons over growing chunks of bars, so millions of bars replay in
+seconds.
+"""
+import numpy as np
+import pandas as pd
+
+from .order_matching import BUY, EXIT_REASONS, limit_fill, exit_fill
+from .strategies import STRATEGIES, strategy_signals
+
+ORDER_TYPES   = ("market", "limit")
+# yfinance history limits per interval
+INTERVALS     = {"1m": "7d", "5m": "60d", "15m": "60d", "30m": "60d", "1h": "730d"}
+FIRST_CHUNK   = 256
+MAX_CHUNK     = 65_536
+
+
+def _scan(start: int, end: int, hit) -> int:
+    """First bar in [start, end) where hit(a, b) — a bool array over bars a:b — is True, else -1."""
+    size, a = FIRST_CHUNK, start
+    while a < end:
+        b = min(a + size, end)
+        m = hit(a, b)
+        if m.any():
+            return a + int(m.argmax())
+        a, size = b, min(size * 2, MAX_CHUNK)
+    return -1
+
+
+def simulate_orders(
+    open_, high, low, close, signals,
+    initial_capital:  float = 10_000.0,
+    order_type:       str   = "limit",
+    limit_offset:     float = 0.001,
+    stop_loss:        float = 0.01,
+    take_profit:      float = 0.02,
+    ttl_bars:         int   = 12,
+) -> tuple:
+    """
+    Replay orders over OHLC arrays. Offsets/levels are fractions of price
+    (0 disables the stop / target). Returns (equity, trades, open_trade)
+    like backtester._simulate; trades carry entry/exit bars and exit reason.
+    """
+    from .backtester import _trade
+    o, h, l, c = (np.asarray(x, dtype=np.float64) for x in (open_, high, low, close))
+    sig = np.asarray(signals)
+    n   = len(c)
+    exit_sig = sig == -1
+    entries  = np.flatnonzero(sig[:n - 1] == 1) + 1   # bar the order is working on
+
+    capital, trades, open_trade = initial_capital, [], None
+    bars, cash_vals, pos_vals = [0], [capital], [0]
+
+    t = 1
+    while True:
+        k = int(np.searchsorted(entries, t))
+        if k == len(entries):
+            break
+        s = int(entries[k])
+
+        # ── Entry ────────────────────────────────────────────────────────────
+        if order_type == "market":
+            f, fill = s, float(o[s])
+        else:
+            limit = float(c[s - 1]) * (1 - limit_offset)
+            end   = min(s + ttl_bars, n)
+            f  = _scan(s, end, lambda a, b: l[a:b] <= limit)
+            cx = _scan(s, end if f == -1 else f + 1, lambda a, b: exit_sig[a - 1:b - 1])
+            if cx != -1:                 # exit signal cancels the working order
+                t = cx + 1
+                continue
+            if f == -1:                  # expired unfilled
+                t = end
+                continue
+            fill = float(limit_fill(BUY, limit, o[f], h[f], l[f]))
+
+        shares = int(capital * 0.95 / fill)
+        if shares == 0:
+            t = f + 1
+            continue
+        cash_in = capital - shares * fill
+        sl = fill * (1 - stop_loss)   if stop_loss   else np.nan
+        tp = fill * (1 + take_profit) if take_profit else np.nan
+        bars.append(f); cash_vals.append(cash_in); pos_vals.append(shares)
+
+        # ── Exit: SL/TP from the fill bar on, exit signal from the next bar ──
+        def _exit_hit(a, b):
+            m = (l[a:b] <= sl) | (h[a:b] >= tp)
+            if b > f + 1:
+                lo = max(a, f + 1)
+                m[lo - a:] |= exit_sig[lo - 1:b - 1]
+            return m
+        j = _scan(f, n, _exit_hit)
+        if j == -1:
+            open_trade = {"entry_bar": f, "entry": fill, "shares": shares, "cash": cash_in}
+            break
+
+        if j > f and exit_sig[j - 1]:
+            # Market exit at the open comes before anything intrabar
+            exit_p, reason = float(o[j]), "signal"
+        else:
+            px, code = exit_fill(BUY, sl, tp, h[j], l[j])
+            exit_p, reason = float(px), EXIT_REASONS[int(code)]
+        capital = cash_in + shares * exit_p
+        trades.append({**_trade(fill, exit_p, shares),
+                       "entry_bar": f, "exit_bar": j, "reason": reason})
+        bars.append(j); cash_vals.append(capital); pos_vals.append(0)
+        t = j + 1
+
+    seg    = np.searchsorted(np.asarray(bars), np.arange(n), side="right") - 1
+    equity = np.asarray(cash_vals)[seg] + np.asarray(pos_vals, dtype=np.float64)[seg] * c
+    if n:
+        equity[0] = initial_capital
+    return equity, trades, open_trade
+
+
+def _bars_per_year(index) -> float:
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return 252.0
+    per_day = pd.Series(1, index=index).groupby(index.date).size().median()
+    return 252.0 * float(per_day)
+
+
+def run_intraday_backtest(
+    symbol:           str,
+    interval:         str   = "5m",
+    period:           str | None = None,
+    strategy:         str   = "rsi",
+    params:           dict | None = None,
+    order_type:       str   = "limit",
+    limit_offset_pct: float = 0.1,
+    stop_loss_pct:    float = 1.0,
+    take_profit_pct:  float = 2.0,
+    ttl_bars:         int   = 12,
+    initial_capital:  float = 10_000.0,
+    points:           int | None = 2000,
+    bars:             pd.DataFrame | None = None,
+) -> dict:
+    """
+    Intraday backtest of a rule-based strategy with limit/SL/TP orders.
+    `bars` (open/high/low/close columns) skips the download.
+    """
+    from .backtester import _summarize, _trade, _curve
+    from .feature_engineering import feature_engineer
+    if strategy not in STRATEGIES:
+        raise ValueError(f"אסטרטגיה לא נתמכת בבקטסט תוך-יומי: {strategy}")
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"order_type חייב להיות אחד מ-{ORDER_TYPES}")
+    if bars is None:
+        if interval not in INTERVALS:
+            raise ValueError(f"interval חייב להיות אחד מ-{list(INTERVALS)}")
+        bars = feature_engineer.get_raw_data(symbol, period=period or INTERVALS[interval],
+                                             interval=interval)
+    if len(bars) < 60:
+        raise ValueError(f"לא מספיק נתונים עבור {symbol}")
+
+    signals = strategy_signals(bars, strategy, params).to_numpy()
+    equity, trades, open_trade = simulate_orders(
+        bars['open'], bars['high'], bars['low'], bars['close'], signals,
+        initial_capital = initial_capital,
+        order_type      = order_type,
+        limit_offset    = limit_offset_pct / 100,
+        stop_loss       = stop_loss_pct / 100,
+        take_profit     = take_profit_pct / 100,
+        ttl_bars        = ttl_bars,
+    )
+    if open_trade:   # Close remaining
+        trades.append({**_trade(open_trade["entry"], float(bars['close'].iloc[-1]), open_trade["shares"]),
+                       "entry_bar": open_trade["entry_bar"], "exit_bar": len(bars) - 1, "reason": "end"})
+
+    result = _summarize(equity, trades, initial_capital, curve=False)
+    # _summarize annualizes as daily bars — recompute for this bar frequency
+    rets = np.diff(equity) / equity[:-1]
+    sd   = rets.std(ddof=1) if len(rets) > 1 else 0.0
+    result["sharpe_ratio"] = round(float(rets.mean() / sd * np.sqrt(_bars_per_year(bars.index)))
+                                   if sd > 0 else 0.0, 3)
+
+    reasons = pd.Series([t["reason"] for t in trades], dtype=object).value_counts()
+    return {
+        **result,
+        "symbol":       symbol,
+        "strategy":     strategy,
+        "interval":     interval,
+        "bars":         len(bars),
+        "order_type":   order_type,
+        "exit_reasons": {k: int(v) for k, v in reasons.items()},
+        "trades":       trades[:50],
+        **_curve(equity, points, "minmax"),
+    }
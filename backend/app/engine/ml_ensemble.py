@@ -1,22 +1,215 @@
 import numpy as np
 import pandas as pd
 import os, pickle, warnings
+import itertools
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import Pipeline
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import ParameterGrid
 import xgboost as xgb
+from .parallel import SharedArrays, attach, run_tasks
 warnings.filterwarnings('ignore')
 
 MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'models_store')
 
+# Columns present both in the feature matrix and in get_latest_features()
+FEATURE_COLS = [
+    'rsi_14', 'rsi_os', 'rsi_ob', 'macd_cross',
+    'sma_cross_20_50', 'bb_pct', 'volume_surge',
+]
+
+# ── Labelling / validation ────────────────────────────────────────────────────
+LABEL_HORIZON   = 5       # bars ahead used to label each sample
+LABEL_THRESHOLD = 0.02    # ±2% forward return → BUY / SELL, else HOLD
+CV_SPLITS       = 5
+CV_EMBARGO      = 5       # bars dropped after each test fold
+
+PARAM_GRID = {
+    "rf_max_depth":      [4, 8],
+    "xgb_max_depth":     [3, 5],
+    "xgb_learning_rate": [0.05, 0.1],
+}
+DEFAULT_PARAMS = {"rf_max_depth": 6, "xgb_max_depth": 3, "xgb_learning_rate": 0.1}
+
+_fit_ids = itertools.count(1)   # versions are unique across instances, not just per model
+
+
+def build_dataset(df: pd.DataFrame, horizon: int = LABEL_HORIZON,
+                  threshold: float = LABEL_THRESHOLD):
+    """Feature matrix X and forward-return labels y (-1/0/1), NaN rows dropped."""
+    fwd = df['close'].shift(-horizon) / df['close'] - 1
+    y   = np.where(fwd > threshold, 1, np.where(fwd < -threshold, -1, 0))
+    feats = df.reindex(columns=FEATURE_COLS)
+    valid = feats.notna().all(axis=1) & fwd.notna()
+    X = feats[valid].to_numpy(dtype=np.float64)
+    return X, y[valid.to_numpy()].astype(np.int8)
+
+
+def purged_kfold_splits(n: int, n_splits: int = CV_SPLITS,
+                        horizon: int = LABEL_HORIZON,
+                        embargo: int = CV_EMBARGO) -> list:
+    """
+    Contiguous time-series folds. For test fold [a, b) the training set drops
+    the `horizon` samples before `a` (their labels look into the test fold)
+    and the `embargo` samples after `b`.
+    Returns a list of (a, b, purge_start, embargo_end).
+    """
+    bounds = np.linspace(0, n, n_splits + 1).astype(int)
+    return [
+        (int(a), int(b), max(0, int(a) - horizon), min(n, int(b) + embargo))
+        for a, b in zip(bounds[:-1], bounds[1:]) if b > a
+    ]
+
+
+def _make_model(params: dict) -> VotingClassifier:
+    rf = RandomForestClassifier(
+        n_estimators=100, max_depth=params["rf_max_depth"],
+        class_weight="balanced", random_state=42, n_jobs=1,
+    )
+    xg = xgb.XGBClassifier(
+        n_estimators=150, max_depth=params["xgb_max_depth"],
+        learning_rate=params["xgb_learning_rate"], subsample=0.8,
+        eval_metric="mlogloss", random_state=42, n_jobs=1,
+    )
+    return VotingClassifier([("rf", rf), ("xgb", xg)], voting="soft")
+
+
+def _cv_fold(X: np.ndarray, y: np.ndarray, params: dict, fold: tuple) -> dict:
+    a, b, purge_start, embargo_end = fold
+    n     = len(y)
+    train = np.r_[0:purge_start, embargo_end:n]
+    if len(train) < 50 or len(np.unique(y[train])) < 2:
+        return {"skipped": True, "test_start": a, "test_end": b}
+
+    scaler = StandardScaler()
+    model  = _make_model(params)
+    model.fit(scaler.fit_transform(X[train]), y[train])
+    pred   = model.predict(scaler.transform(X[a:b]))
+    return {
+        "test_start": a,
+        "test_end":   b,
+        "n_train":    int(len(train)),
+        "n_test":     int(b - a),
+        "accuracy":   round(float(accuracy_score(y[a:b], pred)), 4),
+        "f1_macro":   round(float(f1_score(y[a:b], pred, average="macro")), 4),
+    }
+
+
+def _cv_fold_task(specs: dict, params: dict, fold: tuple) -> dict:
+    """Worker: fit on the purged training set of one fold, score its test set."""
+    with attach(specs) as arr:
+        return _cv_fold(arr["X"], arr["y"], params, fold)   # no view outlives the block
+
+
 class MLEnsemble:
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
         self.trained = False
+        self.params = dict(DEFAULT_PARAMS)
+        self.cv_metrics = None
+        self.version = 0        # bumped per fit — part of memoized predictions' fingerprint
+
+    def train(self, df: pd.DataFrame, search: bool = True,
+              n_splits: int = CV_SPLITS, embargo: int = CV_EMBARGO,
+              parallel: bool = True) -> dict:
+        """
+        Purged/embargoed time-series CV with a small hyperparameter search,
+        then refit the best params on all samples.
+        Folds × param sets run in the process pool; X/y live in shared memory.
+        """
+        X, y = build_dataset(df)
+        if len(X) < 100:
+            raise ValueError(f"לא מספיק נתונים לאימון המודל ({len(X)} דגימות)")
+
+        grid   = list(ParameterGrid(PARAM_GRID)) if search else [dict(self.params)]
+        splits = purged_kfold_splits(len(X), n_splits, LABEL_HORIZON, embargo)
+
+        with SharedArrays({"X": X, "y": y}) as shared:
+            tasks   = [(shared.specs, p, f) for p in grid for f in splits]
+            results = run_tasks(_cv_fold_task, tasks, parallel=parallel)
+
+        search_table = []
+        for gi, params in enumerate(grid):
+            folds  = results[gi * len(splits):(gi + 1) * len(splits)]
+            scored = [f for f in folds if not f.get("skipped")]
+            f1s    = [f["f1_macro"] for f in scored]
+            search_table.append({
+                "params":     params,
+                "mean_f1":    round(float(np.mean(f1s)), 4) if f1s else 0.0,
+                "std_f1":     round(float(np.std(f1s)), 4)  if f1s else 0.0,
+                "mean_acc":   round(float(np.mean([f["accuracy"] for f in scored])), 4) if scored else 0.0,
+                "folds":      folds,
+            })
+        search_table.sort(key=lambda r: r["mean_f1"], reverse=True)
+        best = search_table[0]
+
+        # Swap in one assignment so concurrent predict() never sees a half-fit model
+        model = Pipeline([("scaler", StandardScaler()), ("ensemble", _make_model(best["params"]))])
+        model.fit(X, y)
+        self.params  = dict(best["params"])
+        self.model   = model
+        self.scaler  = model.named_steps["scaler"]
+        self.trained = True
+        self.version = next(_fit_ids)
+
+        classes, counts = np.unique(y, return_counts=True)
+        self.cv_metrics = {
+            "samples":       int(len(X)),
+            "label_horizon": LABEL_HORIZON,
+            "n_splits":      len(splits),
+            "embargo":       embargo,
+            "best_params":   self.params,
+            "cv_f1_macro":   best["mean_f1"],
+            "cv_accuracy":   best["mean_acc"],
+            "folds":         best["folds"],
+            "search":        [{k: v for k, v in r.items() if k != "folds"} for r in search_table],
+            "class_balance": {str(int(c)): int(n) for c, n in zip(classes, counts)},
+        }
+        return self.cv_metrics
 
     def predict(self, features: dict) -> dict:
         # Fallback to Rule-Based if model not explicitly trained yet
-        return self._rule_based_fallback(features)
+        if not self.trained or any(c not in features for c in FEATURE_COLS):
+            return self._rule_based_fallback(features)
+
+        model = self.model
+        x     = np.array([[float(features[c]) for c in FEATURE_COLS]])
+        proba = model.predict_proba(x)[0]
+        probs = {int(c): float(p) for c, p in zip(model.classes_, proba)}
+        decision = max(probs, key=probs.get)
+        return {
+            "decision": decision,
+            "confidence": round(probs[decision], 4),
+            "probabilities": {"buy": round(probs.get(1, 0.0), 4),
+                              "hold": round(probs.get(0, 0.0), 4),
+                              "sell": round(probs.get(-1, 0.0), 4)}
+        }
+
+    def predict_batch(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Decisions (-1/0/1) for every row of a feature matrix.
+        Uses the trained model when available (rows with missing features → 0),
+        otherwise a vectorized _rule_based_fallback.
+        """
+        if self.trained:
+            out   = np.zeros(len(df), dtype=np.int8)
+            valid = df[FEATURE_COLS].notna().all(axis=1).to_numpy()
+            if valid.any():
+                out[valid] = self.model.predict(df.loc[valid, FEATURE_COLS].to_numpy(dtype=np.float64))
+            return out
+
+        def col(name, default):
+            return df[name].fillna(default).to_numpy(dtype=np.float64) \
+                   if name in df.columns else np.full(len(df), float(default))
+
+        rsi   = col('rsi_14', 50)
+        score = (np.where(rsi < 35, 2, 0) - np.where(rsi > 65, 2, 0)
+                 + np.where(col('macd_cross', 0) == 1, 2, 0)
+                 + np.where(col('sma_cross_20_50', 0) != 0, 1, 0)
+                 + np.where(col('volume_surge', 0) != 0, 1, 0))
+        return np.where(score >= 3, 1, np.where(score <= -3, -1, 0)).astype(np.int8)
 
     def _rule_based_fallback(self, features: dict) -> dict:
         score = 0
@@ -44,3 +237,19 @@ class MLEnsemble:
         }
 
 ml_ensemble = MLEnsemble()
+
+# ── Per-symbol models ─────────────────────────────────────────────────────────
+# /train/{symbol} fits a fresh ensemble for that symbol only; the shared
+# ml_ensemble (rule-based until trained elsewhere) keeps serving the rest.
+_symbol_models: dict = {}
+
+
+def train_symbol(symbol: str, df: pd.DataFrame, search: bool = True) -> dict:
+    model   = MLEnsemble()
+    metrics = model.train(df, search=search)
+    _symbol_models[symbol] = model      # published only after a successful fit
+    return metrics
+
+
+def model_for(symbol: str) -> MLEnsemble:
+    return _symbol_models.get(symbol, ml_ensemble)
@@ -0,0 +1,133 @@
+# backend/app/engine/monte_carlo.py
+"""
+Monte Carlo robustness analysis of a backtest.
+
+  trades:    resample the closed trades' returns with replacement (order and
+             mix of wins/losses change, the edge per trade does not;
+             drawdown is measured at trade closes, so it understates
+             intra-trade dips)
+  bootstrap: moving-block bootstrap of the daily equity returns (keeps
+             short-range autocorrelation / volatility clustering)
+
+All simulations are one batched NumPy computation — an (n_sims × length)
+matrix of sampled returns, compounded with cumprod — processed in chunks
+to bound memory. Reports percentile bands for return, drawdown and Sharpe.
+"""
+import numpy as np
+
+METHODS       = ("trades", "bootstrap")
+MAX_SIMS      = 100_000
+CHUNK_CELLS   = 4_000_000    # sims × length per chunk (~32 MB float64)
+PERCENTILES   = (5, 25, 50, 75, 95)
+POSITION_SIZE = 0.95         # share of equity the engine puts into each trade
+
+
+def _path_stats(rets: np.ndarray, periods_per_year: int | None) -> dict:
+    """Per-path total return / max drawdown (and Sharpe) for a (sims × T) matrix."""
+    equity = np.cumprod(1.0 + rets, axis=1)
+    peak   = np.maximum(np.maximum.accumulate(equity, axis=1), 1.0)
+    out = {
+        "total_return_pct": (equity[:, -1] - 1.0) * 100,
+        "max_drawdown_pct": ((equity - peak) / peak).min(axis=1) * 100,
+    }
+    if periods_per_year:
+        sd = rets.std(axis=1, ddof=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(sd > 0, rets.mean(axis=1) / sd * np.sqrt(periods_per_year), 0.0)
+        out["sharpe_ratio"] = sharpe
+    return out
+
+
+def _simulate(sampler, n_sims: int, length: int, periods_per_year: int | None) -> dict:
+    chunk = max(1, CHUNK_CELLS // max(length, 1))
+    parts = [
+        _path_stats(sampler(min(chunk, n_sims - s)), periods_per_year)
+        for s in range(0, n_sims, chunk)
+    ]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def resample_trades(trade_returns, n_sims: int = 10_000, seed: int | None = 42,
+                    periods_per_year: int | None = None) -> dict:
+    """Per-trade equity returns drawn with replacement, same trade count per path."""
+    r   = np.asarray(trade_returns, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    return _simulate(lambda m: r[rng.integers(0, len(r), size=(m, len(r)))],
+                     n_sims, len(r), periods_per_year)
+
+
+def block_bootstrap(daily_returns, n_sims: int = 10_000, block: int = 20,
+                    seed: int | None = 42) -> dict:
+    """Moving-block bootstrap: paths of len(returns) built from random blocks."""
+    r     = np.asarray(daily_returns, dtype=np.float64)
+    n     = len(r)
+    block = int(max(1, min(block, n)))
+    n_blk = -(-n // block)
+    rng   = np.random.default_rng(seed)
+    offs  = np.arange(block)
+
+    def sampler(m):
+        starts = rng.integers(0, n - block + 1, size=(m, n_blk))
+        idx    = (starts[:, :, None] + offs).reshape(m, -1)[:, :n]
+        return r[idx]
+
+    return _simulate(sampler, n_sims, n, 252)
+
+
+def _bands(samples: np.ndarray, observed: float | None) -> dict:
+    q = np.percentile(samples, PERCENTILES)
+    out = {f"p{p}": round(float(v), 3) for p, v in zip(PERCENTILES, q)}
+    out["mean"] = round(float(samples.mean()), 3)
+    if observed is not None:
+        out["observed"]      = observed
+        # Share of simulated paths at or below the actual result
+        out["observed_rank"] = round(float((samples <= observed).mean() * 100), 1)
+    return out
+
+
+def run_monte_carlo(
+    equity,
+    trades:   list,
+    n_sims:   int = 10_000,
+    methods:  tuple = METHODS,
+    block:    int = 20,
+    seed:     int | None = 42,
+    observed: dict | None = None,
+) -> dict:
+    """
+    Monte Carlo on one backtest: `equity` is the full-resolution equity curve,
+    `trades` the closed trades (pnl_pct), `observed` the backtest's own metrics.
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"method חייב להיות אחד מ-{METHODS}")
+    if not 1 <= n_sims <= MAX_SIMS:
+        raise ValueError(f"n_sims חייב להיות בין 1 ל-{MAX_SIMS}")
+    observed = observed or {}
+    out = {"n_sims": n_sims, "percentiles": list(PERCENTILES)}
+
+    if "trades" in methods:
+        if len(trades) < 2:
+            out["trades"] = {"error": "נדרשות לפחות 2 עסקאות"}
+        else:
+            rets  = np.array([t["pnl_pct"] for t in trades], dtype=np.float64) / 100 * POSITION_SIZE
+            stats = resample_trades(rets, n_sims, seed)
+            out["trades"] = {
+                "n_trades": len(trades),
+                **{k: _bands(v, observed.get(k)) for k, v in stats.items()},
+                "prob_loss_pct": round(float((stats["total_return_pct"] < 0).mean() * 100), 2),
+            }
+
+    if "bootstrap" in methods:
+        eq = np.asarray(equity, dtype=np.float64)
+        if len(eq) < block + 2:
+            out["bootstrap"] = {"error": "עקומת ההון קצרה מדי"}
+        else:
+            daily = eq[1:] / eq[:-1] - 1
+            stats = block_bootstrap(daily, n_sims, block, seed)
+            out["bootstrap"] = {
+                "block": block,
+                **{k: _bands(v, observed.get(k)) for k, v in stats.items()},
+                "prob_loss_pct": round(float((stats["total_return_pct"] < 0).mean() * 100), 2),
+            }
+    return out
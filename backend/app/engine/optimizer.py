@@ -0,0 +1,175 @@
+# backend/app/engine/optimizer.py
+"""
+Parameter sweep for the rule-based strategies.
+The feature matrix and every indicator the sweep needs are computed once,
+published to shared memory, and the combinations are evaluated in the
+process pool in chunks. Returns a ranked table with robustness metrics.
+"""
+import itertools
+import random
+import numpy as np
+
+from .feature_engineering import feature_engineer
+from .strategies import (STRATEGIES, is_valid, indicator_keys,
+                         compute_indicators, signals_from_indicators)
+from .parallel import SharedArrays, attach, run_tasks, max_workers
+
+RANK_METRICS   = ("sharpe_ratio", "total_return_pct", "max_drawdown_pct", "win_rate_pct")
+ROBUST_FOLDS   = 4
+MAX_COMBOS     = 5_000
+
+
+def expand_space(strategy: str, space: dict | None = None, search: str = "grid",
+                 n_iter: int = 50, seed: int = 42) -> list:
+    """
+    Parameter sets to evaluate. `space` maps param → list of values, or
+    → {"low": int, "high": int} (inclusive range, random search only).
+    Missing params keep their default. Invalid combinations are dropped.
+    """
+    spec = STRATEGIES.get(strategy)
+    if spec is None:
+        raise ValueError(f"אסטרטגיה לא מוכרת לסריקה: {strategy}")
+    space = {**{k: [v] for k, v in spec["defaults"].items()},
+             **(space if space is not None else spec["grid"])}
+    unknown = set(space) - set(spec["defaults"])
+    if unknown:
+        raise ValueError(f"פרמטרים לא מוכרים עבור {strategy}: {sorted(unknown)}")
+
+    names = list(space)
+    if search == "random":
+        rng, seen, combos = random.Random(seed), set(), []
+        for _ in range(n_iter * 20):
+            if len(combos) >= n_iter:
+                break
+            p = {}
+            for k in names:
+                v = space[k]
+                p[k] = rng.randint(int(v["low"]), int(v["high"])) if isinstance(v, dict) \
+                       else int(rng.choice(v))
+            key = tuple(p[k] for k in names)
+            if key not in seen and is_valid(strategy, p):
+                seen.add(key)
+                combos.append(p)
+    else:
+        if any(isinstance(v, dict) for v in space.values()):
+            raise ValueError("טווחים ({low, high}) נתמכים רק בחיפוש אקראי")
+        combos = [dict(zip(names, map(int, vals)))
+                  for vals in itertools.product(*(space[k] for k in names))]
+        combos = [p for p in combos if is_valid(strategy, p)]
+
+    if len(combos) > MAX_COMBOS:
+        raise ValueError(f"יותר מדי שילובים ({len(combos)}), מקסימום {MAX_COMBOS}")
+    return combos
+
+
+def _fold_stats(equity: np.ndarray, n_folds: int = ROBUST_FOLDS) -> dict:
+    """Return/Sharpe per contiguous segment of one equity curve."""
+    bounds = np.linspace(0, len(equity) - 1, n_folds + 1).astype(int)
+    rets, sharpes = [], []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        seg = equity[a:b + 1]
+        r   = np.diff(seg) / seg[:-1]
+        rets.append(float(seg[-1] / seg[0] - 1) * 100)
+        sd  = r.std(ddof=1) if len(r) > 1 else 0.0
+        sharpes.append(float(r.mean() / sd * np.sqrt(252)) if sd > 0 else 0.0)
+    return {
+        "fold_returns":         [round(x, 2) for x in rets],
+        "pct_profitable_folds": round(100 * sum(x > 0 for x in rets) / len(rets), 1),
+        "worst_fold_return":    round(min(rets), 2),
+        "fold_sharpe_std":      round(float(np.std(sharpes)), 3),
+    }
+
+
+def evaluate_combo(close: np.ndarray, ind: dict, strategy: str, params: dict,
+                   initial_capital: float, robustness: bool = True) -> dict:
+    from .backtester import _simulate, _summarize
+    sig = signals_from_indicators(strategy, params, ind)
+    equity, trades, open_trade = _simulate(close, sig, initial_capital)
+    m = _summarize(equity, trades, initial_capital, curve=False)
+    row = {"params": params, **m}
+    if robustness:
+        row.update(_fold_stats(equity))
+    return row
+
+
+def _sweep_chunk(specs: dict, strategy: str, combos: list, initial_capital: float) -> list:
+    """Worker: evaluate a chunk of parameter sets on the shared arrays."""
+    with attach(specs) as arr:
+        close = arr.pop("close")
+        rows  = [evaluate_combo(close, arr, strategy, p, initial_capital) for p in combos]
+        del close   # the shared mapping is closed on exit
+    return rows
+
+
+def _neighbor_sharpe(rows: list, space: dict) -> None:
+    """Mean Sharpe of grid neighbours (one param one step away) — plateau vs spike."""
+    steps = {k: sorted(set(v)) for k, v in space.items() if isinstance(v, list)}
+    by_key = {tuple(sorted(r["params"].items())): r["sharpe_ratio"] for r in rows}
+    for r in rows:
+        vals = []
+        for k, levels in steps.items():
+            if r["params"][k] not in levels:
+                continue
+            i = levels.index(r["params"][k])
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(levels):
+                    nb = tuple(sorted({**r["params"], k: levels[j]}.items()))
+                    if nb in by_key:
+                        vals.append(by_key[nb])
+        r["neighbor_sharpe"] = round(float(np.mean(vals)), 3) if vals else None
+
+
+def run_sweep(
+    symbol:          str,
+    period:          str   = "2y",
+    strategy:        str   = "rsi",
+    space:           dict | None = None,
+    search:          str   = "grid",
+    n_iter:          int   = 50,
+    initial_capital: float = 10_000.0,
+    rank_by:         str   = "sharpe_ratio",
+    top:             int   = 25,
+    parallel:        bool  = True,
+) -> dict:
+    """Evaluate every parameter set for `strategy` and rank the results."""
+    if rank_by not in RANK_METRICS:
+        raise ValueError(f"rank_by חייב להיות אחד מ-{RANK_METRICS}")
+    combos = expand_space(strategy, space, search, n_iter)
+    if not combos:
+        raise ValueError("אין שילובי פרמטרים תקינים לסריקה")
+
+    df = feature_engineer.get_feature_matrix(symbol, period=period)
+    if df.empty or len(df) < 60:
+        raise ValueError(f"לא מספיק נתונים עבור {symbol}")
+
+    keys   = sorted({k for p in combos for k in indicator_keys(strategy, p)})
+    arrays = {"close": df['close'].to_numpy(dtype=np.float64),
+              **compute_indicators(df, keys)}
+
+    n_chunks = min(len(combos), max_workers() * 4)
+    chunks   = [combos[i::n_chunks] for i in range(n_chunks)]
+    with SharedArrays(arrays) as shared:
+        parts = run_tasks(_sweep_chunk,
+                          [(shared.specs, strategy, c, initial_capital) for c in chunks],
+                          parallel=parallel)
+    rows = [r for part in parts for r in part]
+
+    if search == "grid":
+        _neighbor_sharpe(rows, space if space is not None else STRATEGIES[strategy]["grid"])
+
+    # Drawdown is negative — "best" is the one closest to zero
+    rows.sort(key=lambda r: r[rank_by], reverse=True)
+    for i, r in enumerate(rows, 1):
+        r["rank"] = i
+
+    return {
+        "symbol":          symbol,
+        "strategy":        strategy,
+        "period":          period,
+        "search":          search,
+        "bars":            len(df),
+        "combinations":    len(rows),
+        "rank_by":         rank_by,
+        "best_params":     rows[0]["params"],
+        "results":         rows[:top],
+    }
@@ -0,0 +1,68 @@
+# backend/app/engine/order_matching.py
+"""
+Order-matching rules shared by paper trading and the intraday backtester.
+
+Orders are matched against a bar's open/high/low. A live price tick is a
+degenerate bar (open = high = low = price), so the paper-trading loop and
+the backtester fill the same orders at the same prices.
+
+  LIMIT BUY   fills when low <= limit, at min(open, limit)   (gap down → open)
+  LIMIT SELL  fills when high >= limit, at max(open, limit)
+  STOP LOSS / TAKE PROFIT exit at the level price; if both are reached in
+  the same bar the stop wins (conservative — intrabar order is unknown).
+
+All functions broadcast over NumPy arrays (many orders × one bar, or one
+order × many bars); NaN levels mean "not set".
+"""
+import numpy as np
+
+BUY, SELL = 1, -1
+NO_EXIT, STOP_LOSS, TAKE_PROFIT = 0, 1, 2
+EXIT_REASONS = {STOP_LOSS: "stop_loss", TAKE_PROFIT: "take_profit"}
+
+
+def side_of(direction: str) -> int:
+    return BUY if direction.upper() == "BUY" else SELL
+
+
+def _level(x) -> float:
+    # Paper trades store unset levels as None / 0
+    return float(x) if x else np.nan
+
+
+def limit_fill(side, limit, open_, high, low) -> np.ndarray:
+    """Fill price of a resting LIMIT order on a bar, NaN where not reached."""
+    side, limit = np.asarray(side), np.asarray(limit, dtype=np.float64)
+    buy  = np.where(low <= limit, np.minimum(open_, limit), np.nan)
+    sell = np.where(high >= limit, np.maximum(open_, limit), np.nan)
+    return np.where(side == BUY, buy, sell)
+
+
+def exit_fill(side, stop_loss, take_profit, high, low) -> tuple:
+    """(exit price, reason code) of an open position's SL/TP on a bar."""
+    side = np.asarray(side)
+    sl   = np.asarray(stop_loss, dtype=np.float64)
+    tp   = np.asarray(take_profit, dtype=np.float64)
+    long = side == BUY
+    sl_hit = np.where(long, low <= sl, high >= sl)
+    tp_hit = np.where(long, high >= tp, low <= tp)
+    reason = np.where(sl_hit, STOP_LOSS, np.where(tp_hit, TAKE_PROFIT, NO_EXIT))
+    price  = np.where(sl_hit, sl, np.where(tp_hit, tp, np.nan))
+    return price, reason
+
+
+# ── Single order vs. live price (paper trading) ──────────────────────────────
+def match_limit(direction: str, limit_price, price: float) -> float | None:
+    """Fill price if a LIMIT order triggers at `price`, else None."""
+    fill = float(limit_fill(side_of(direction), _level(limit_price), price, price, price))
+    return None if np.isnan(fill) else fill
+
+
+def match_exit(direction: str, stop_loss, take_profit, price: float) -> tuple:
+    """(exit price, "stop_loss" | "take_profit") if a level is hit at `price`, else (None, None)."""
+    exit_p, reason = exit_fill(side_of(direction), _level(stop_loss), _level(take_profit),
+                               price, price)
+    reason = int(reason)
+    if reason == NO_EXIT:
+        return None, None
+    return float(exit_p), EXIT_REASONS[reason]
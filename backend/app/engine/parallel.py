@@ -0,0 +1,176 @@
+# backend/app/engine/parallel.py
+"""
+Process-pool helpers for CPU-heavy engine work (CV folds, sweeps, walk-forward).
+Large read-only arrays are published once in shared memory and attached by
+name inside the workers, so tasks only pickle a few small specs.
+"""
+import os
+import sys
+import atexit
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+import numpy as np
+
+# shm name → array, for blocks created by *this* process (sequential fallback)
+_LOCAL: dict = {}
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def max_workers() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))   # respects container CPU limits
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, 8))
+
+
+class SharedArrays:
+    """
+    Copy a dict of numpy arrays into shared memory blocks.
+    Use as a context manager — blocks are unlinked on exit.
+    `specs` is the small picklable handle passed to worker tasks.
+    """
+    def __init__(self, arrays: dict):
+        self._blocks = []
+        self.specs   = {}
+        for name, arr in arrays.items():
+            arr  = np.ascontiguousarray(arr)
+            shm  = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            view.flags.writeable = False
+            self._blocks.append(shm)
+            _LOCAL[shm.name] = view
+            self.specs[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for shm in self._blocks:
+            _LOCAL.pop(shm.name, None)
+            try:
+                shm.close()
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+
+def _open_block(name: str):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        # The creating process owns the block — stop this worker's tracker
+        # from unlinking it when the worker exits.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def _view(shm, shape, dtype) -> np.ndarray:
+    view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    view.flags.writeable = False
+    return view
+
+
+@contextmanager
+def attach(specs: dict):
+    """
+    Yield read-only numpy views for `specs` (inside a worker or in-process).
+    The views are valid inside the block only — copy anything that must
+    outlive it and drop every local bound to a view before leaving, since
+    the mappings are closed on exit.
+    """
+    arrays, handles = {}, []
+    try:
+        for key, (name, shape, dtype) in specs.items():
+            local = _LOCAL.get(name)
+            if local is not None:
+                arrays[key] = local
+                continue
+            handles.append(_open_block(name))
+            arrays[key] = _view(handles[-1], shape, dtype)
+        yield arrays
+    except BaseException:
+        arrays.clear()
+        for shm in handles:
+            try:
+                shm.close()
+            except BufferError:
+                pass   # the traceback still references views — the mapping goes with it
+        raise
+    arrays.clear()
+    for shm in handles:
+        shm.close()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared spawn-based pool (safe next to uvicorn's threads)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers(),
+                mp_context=mp.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def run_tasks(fn, tasks: list, parallel: bool = True, on_result=None) -> list:
+    """
+    Run fn(*task) for every task, in the process pool when worthwhile.
+    Results keep task order. `on_result(i, result)` is called as each task
+    completes; if it raises, tasks not yet started are cancelled.
+    Falls back to in-process execution if the pool is unavailable.
+    """
+    results = [None] * len(tasks)
+    if parallel and len(tasks) > 1 and max_workers() > 1:
+        try:
+            pool    = get_pool()
+            futures = {pool.submit(fn, *task): i for i, task in enumerate(tasks)}
+            try:
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    results[i] = fut.result()
+                    if on_result:
+                        on_result(i, results[i])
+            except BaseException:
+                # Caller aborted (e.g. job cancelled from on_result) — drop queued work
+                for fut in futures:
+                    fut.cancel()
+                raise
+            return results
+        except (BrokenProcessPool, OSError) as e:
+            print(f"⚠️ Process pool unavailable, running in-process: {e}")
+            _reset_pool()
+            results = [None] * len(tasks)
+
+    for i, task in enumerate(tasks):
+        results[i] = fn(*task)
+        if on_result:
+            on_result(i, results[i])
+    return results
+
+
+atexit.register(_reset_pool)
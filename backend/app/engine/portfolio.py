@@ -0,0 +1,178 @@
+# backend/app/engine/portfolio.py
+"""
+Multi-symbol portfolio backtest with shared capital.
+
+Prices and signals are aligned into (time × symbol) panels; holding state,
+target weights, returns, turnover and attribution are all panel array ops.
+Positions are rebalanced to target weights every bar (fractional units), so
+results are not expected to match the single-symbol integer-share engine.
+"""
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .strategies import STRATEGIES, resolve_params, indicator_keys, compute_indicators, signals_from_indicators
+
+ALLOCATIONS = {
+    "equal":        "1/N of capital per symbol, idle slots stay in cash",
+    "active_equal": "capital split equally across symbols currently in a position",
+    "inverse_vol":  "active symbols weighted by 1/σ(20d), fully invested",
+}
+MAX_SYMBOLS = 500
+
+
+def load_price_panel(symbols: list, period: str = "2y") -> tuple:
+    """One multi-ticker download → (close, volume) panels (time × symbol)."""
+    raw = yf.download(symbols, period=period, interval="1d", auto_adjust=True,
+                      group_by="column", threads=True, progress=False)
+    if raw is None or raw.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    if isinstance(raw.columns, pd.MultiIndex):
+        close, volume = raw["Close"], raw["Volume"]
+    else:
+        close  = raw[["Close"]].rename(columns={"Close": symbols[0]})
+        volume = raw[["Volume"]].rename(columns={"Volume": symbols[0]})
+    close  = close.dropna(axis=1, how="all").sort_index()
+    volume = volume.reindex(index=close.index, columns=close.columns)
+    # Mixed calendars (crypto trades weekends): carry the last close forward
+    return close.ffill(), volume.fillna(0.0)
+
+
+def _holding_state(sig: np.ndarray) -> np.ndarray:
+    """
+    1 while long. Signal on bar t-1 acts on bar t (as in the single-symbol
+    engine): +1 enters, -1 exits, 0 keeps the previous state.
+    """
+    state = np.where(sig == 1, 1.0, np.where(sig == -1, 0.0, np.nan))
+    state = pd.DataFrame(state).ffill().fillna(0.0).to_numpy()
+    held = np.zeros_like(state)
+    held[1:] = state[:-1]
+    return held
+
+
+def _panel_signals(close: pd.DataFrame, volume: pd.DataFrame,
+                   strategy: str, params: dict | None) -> np.ndarray:
+    if strategy in STRATEGIES:
+        p    = resolve_params(strategy, params)
+        keys = indicator_keys(strategy, p)
+        cols = [compute_indicators(close[[s]].rename(columns={s: "close"}).dropna(), keys)
+                for s in close.columns]
+        # Re-align each symbol's indicators to the full index (NaN before listing)
+        ind = {}
+        for k in keys:
+            panel = np.full(close.shape, np.nan)
+            for j, s in enumerate(close.columns):
+                rows = close[s].notna().to_numpy()
+                panel[rows, j] = cols[j][k]
+            ind[k] = panel
+        return signals_from_indicators(strategy, p, ind)
+
+    # ml → rule-based ensemble decisions from each symbol's feature matrix
+    from .feature_engineering import feature_engineer
+    from .ml_ensemble import MLEnsemble
+    model = MLEnsemble()
+    sig   = np.zeros(close.shape, dtype=np.int8)
+    for j, s in enumerate(close.columns):
+        rows = close[s].notna()
+        feat = feature_engineer.compute_all_features(
+            pd.DataFrame({"close": close[s][rows], "volume": volume[s][rows]})
+        )
+        sig[rows.to_numpy(), j] = model.predict_batch(feat)
+    return sig
+
+
+def _target_weights(held: np.ndarray, rets: np.ndarray, allocation: str,
+                    gross: float, max_weight: float) -> np.ndarray:
+    n_sym = held.shape[1]
+    if allocation == "equal":
+        w = held / n_sym
+    elif allocation == "active_equal":
+        active = held.sum(axis=1, keepdims=True)
+        w = np.divide(held, active, out=np.zeros_like(held), where=active > 0)
+    elif allocation == "inverse_vol":
+        vol = pd.DataFrame(rets).rolling(20, min_periods=5).std().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv = np.where(vol > 0, 1.0 / vol, 0.0) * held
+        tot = inv.sum(axis=1, keepdims=True)
+        w = np.divide(inv, tot, out=np.zeros_like(inv), where=tot > 0)
+    else:
+        raise ValueError(f"allocation חייב להיות אחד מ-{list(ALLOCATIONS)}")
+    w = np.minimum(w * gross, max_weight)
+    return w
+
+
+def run_portfolio_backtest(
+    symbols:         list,
+    period:          str   = "2y",
+    strategy:        str   = "sma",
+    params:          dict | None = None,
+    allocation:      str   = "active_equal",
+    initial_capital: float = 100_000.0,
+    gross:           float = 0.95,
+    max_weight:      float = 0.25,
+    cost_bps:        float = 5.0,
+    panels:          tuple | None = None,
+) -> dict:
+    """
+    Backtest one strategy across `symbols` sharing `initial_capital`.
+    Reports portfolio equity, per-symbol attribution, turnover and exposure.
+    """
+    from .backtester import _summarize
+    symbols = list(dict.fromkeys(s.upper() for s in symbols))[:MAX_SYMBOLS]
+    close, volume = panels if panels is not None else load_price_panel(symbols, period)
+    if close.empty or len(close) < 60:
+        return {"error": "לא מספיק נתונים לתיק"}
+
+    px   = close.to_numpy(dtype=np.float64)
+    rets = np.zeros_like(px)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rets[1:] = px[1:] / px[:-1] - 1
+    rets = np.nan_to_num(rets, nan=0.0, posinf=0.0, neginf=0.0)
+
+    sig  = _panel_signals(close, volume, strategy, params)
+    held = _holding_state(sig) * np.isfinite(px)
+    w    = _target_weights(held, rets, allocation, gross, max_weight)
+
+    # ── Accounting: weights set at close t earn bar t+1's return ─────────────
+    w_prev   = np.zeros_like(w); w_prev[1:] = w[:-1]
+    contrib  = w_prev * rets
+    gross_r  = contrib.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drifted = np.nan_to_num(w_prev * (1 + rets) / (1 + gross_r)[:, None])
+    turnover = np.abs(w - drifted).sum(axis=1)
+    net_r    = gross_r - turnover * cost_bps / 10_000
+    equity   = initial_capital * np.cumprod(1 + net_r)
+
+    m = _summarize(equity, [], initial_capital)
+    for k in ("total_trades", "win_rate_pct", "trades"):
+        m.pop(k, None)
+
+    entries  = ((held[1:] == 1) & (held[:-1] == 0)).sum(axis=0)
+    exposure = w.sum(axis=1)
+    contrib_pct = contrib.sum(axis=0) * 100
+    attribution = sorted([
+        {
+            "symbol":           sym,
+            "contribution_pct": round(float(contrib_pct[j]), 2),
+            "avg_weight_pct":   round(float(w[:, j].mean() * 100), 2),
+            "time_in_market":   round(float(held[:, j].mean() * 100), 1),
+            "entries":          int(entries[j]),
+        }
+        for j, sym in enumerate(close.columns)
+    ], key=lambda r: r["contribution_pct"], reverse=True)
+
+    return {
+        **m,
+        "symbols":             len(close.columns),
+        "missing_symbols":     sorted(set(symbols) - set(close.columns)),
+        "strategy":            strategy,
+        "params":              resolve_params(strategy, params) if strategy in STRATEGIES else None,
+        "allocation":          allocation,
+        "period":              period,
+        "cost_bps":            cost_bps,
+        "annual_turnover":     round(float(turnover.sum() / len(turnover) * 252), 2),
+        "avg_gross_exposure":  round(float(exposure.mean() * 100), 2),
+        "max_gross_exposure":  round(float(exposure.max() * 100), 2),
+        "avg_positions":       round(float(held.sum(axis=1).mean()), 2),
+        "attribution":         attribution,
+    }
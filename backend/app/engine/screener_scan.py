@@ -0,0 +1,147 @@
+# backend/app/engine/screener_scan.py
+"""
+Breakout screener over a whole universe in one pass.
+
+Bars for every symbol come from one multi-ticker download
+(feature_engineer.get_raw_data_bulk, which also reuses fresh cached
+frames). Each symbol's closes / volumes are right-aligned into a
+(symbol × bar) matrix — NaN-padded on the left, since crypto trades on
+weekends and recent listings have fewer bars — so RSI, volume ratio,
+momentum and SMA20 are column operations over the last bars, with the
+same per-symbol semantics as the old one-ticker-at-a-time loop.
+"""
+import numpy as np
+import pandas as pd
+
+from .feature_engineering import feature_engineer
+from ..services.metrics import span
+
+HISTORY_PERIOD = "1mo"
+MIN_BARS       = 10
+MIN_SCORE      = 4
+RSI_PERIOD     = 14
+
+
+def _right_aligned(frames: dict, column: str) -> np.ndarray:
+    width = max(len(df) for df in frames.values())
+    out   = np.full((len(frames), width), np.nan)
+    for i, df in enumerate(frames.values()):
+        values = df[column].to_numpy(dtype=np.float64)
+        out[i, width - len(values):] = values
+    return out
+
+
+def _last(matrix: np.ndarray, k: int) -> np.ndarray:
+    """k-th value from the end of every row (NaN where the row is shorter)."""
+    return matrix[:, -k] if matrix.shape[1] >= k else np.full(len(matrix), np.nan)
+
+
+def _rsi(close: np.ndarray, bars: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """RSI of the last bar — simple-mean gains/losses over `period` changes."""
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    # a row's first bar has no change — counted as 0 (pandas .where(delta > 0, 0))
+    delta[np.arange(len(close)), close.shape[1] - bars] = 0.0
+    gain  = np.where(np.isnan(delta), np.nan, np.where(delta > 0, delta, 0.0))
+    loss  = np.where(np.isnan(delta), np.nan, np.where(delta < 0, -delta, 0.0))
+    if close.shape[1] < period:
+        return np.full(len(close), np.nan)
+    avg_gain = gain[:, -period:].mean(axis=1)
+    avg_loss = loss[:, -period:].mean(axis=1)
+    rs = avg_gain / (avg_loss + 1e-9)
+    return 100 - (100 / (1 + rs))
+
+
+def score_frames(frames: dict) -> pd.DataFrame:
+    """
+    Breakout indicators + score for every symbol with at least MIN_BARS bars
+    (index = symbol). Frames need lower-case `close` / `volume` columns.
+    """
+    frames = {s: df for s, df in frames.items() if len(df) >= MIN_BARS}
+    cols   = ["price", "rsi", "volume_ratio", "momentum_5d", "momentum_20d", "score"]
+    if not frames:
+        return pd.DataFrame(columns=cols)
+    close  = _right_aligned(frames, "close")
+    volume = _right_aligned(frames, "volume")
+    bars   = np.array([len(df) for df in frames.values()])
+
+    price    = close[:, -1]
+    rsi      = _rsi(close, bars)
+    vol_mean = np.nanmean(volume, axis=1)
+    vol_ratio = np.where(vol_mean > 0, volume[:, -1] / np.where(vol_mean > 0, vol_mean, 1.0), 1.0)
+    mom_5d   = np.where(bars >= 5,  (price / _last(close, 5)  - 1) * 100, 0.0)
+    mom_20d  = np.where(bars >= 20, (price / _last(close, 20) - 1) * 100, 0.0)
+    sma_20   = close[:, -20:].mean(axis=1) if close.shape[1] >= 20 else np.full(len(close), np.nan)
+
+    score = (
+        np.where(rsi < 40, 2, 0) +
+        np.where(rsi > 60, 1, 0) +
+        np.where(vol_ratio > 1.5, 2, 0) +
+        np.where(mom_5d > 5, 2, 0) +
+        np.where(mom_20d > 10, 1, 0) +
+        np.where(price > sma_20 * 0.99, 2, 0)
+    )
+    return pd.DataFrame({
+        "price":        price,
+        "rsi":          rsi,
+        "volume_ratio": vol_ratio,
+        "momentum_5d":  mom_5d,
+        "momentum_20d": mom_20d,
+        "score":        score,
+    }, index=list(frames))
+
+
+def alert_he(symbol, score, rsi, vol_ratio, mom_5d, mom_20d) -> str:
+    """Generate a Hebrew alert string."""
+    parts = []
+    if rsi < 35:
+        parts.append(f"RSI ({rsi:.0f}) מצביע על מכירת יתר — הזדמנות קנייה")
+    if vol_ratio > 2:
+        parts.append(f"נפח מסחר גבוה פי {vol_ratio:.1f} מהממוצע — סימן לפריצה")
+    if mom_5d > 8:
+        parts.append(f"מומנטום של +{mom_5d:.1f}% ב-5 ימים אחרונים")
+    if mom_20d > 15:
+        parts.append(f"עלייה של +{mom_20d:.1f}% בחודש — טרנד חזק")
+
+    confidence_txt = "גבוהה מאוד" if score >= 7 else "גבוהה" if score >= 5 else "בינונית"
+
+    return (
+        f"⚡ לפי האלגוריתם, {symbol} מציג הזדמנות מסחר ברמת ביטחון {confidence_txt}. "
+        + " | ".join(parts) + "."
+    )
+
+
+def scan(symbols: list) -> dict:
+    """
+    One download + one scoring pass → {"results": candidates (score ≥
+    MIN_SCORE, best first, ties in input order), "prices": last close per
+    symbol with data, "download_ms", "score_ms"}.
+    """
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+    with span("screener.download") as dl:
+        try:
+            frames = feature_engineer.get_raw_data_bulk(syms, period=HISTORY_PERIOD) if syms else {}
+        except Exception as e:
+            print(f"Screener download error: {e}")
+            frames = {}
+    frames = {s: frames[s] for s in syms if s in frames}
+    with span("screener.score") as sc:
+        scores = score_frames(frames)
+        passed = scores[scores["score"] >= MIN_SCORE]
+        results = [{
+            "symbol":        sym,
+            "price":         round(float(r.price), 4),
+            "rsi":           round(float(r.rsi), 1) if r.rsi == r.rsi else None,   # < RSI_PERIOD bars
+            "volume_ratio":  round(float(r.volume_ratio), 2),
+            "momentum_5d":   round(float(r.momentum_5d), 2),
+            "momentum_20d":  round(float(r.momentum_20d), 2),
+            "score":         int(r.score),
+            "alert_he":      alert_he(sym, int(r.score), float(r.rsi), float(r.volume_ratio),
+                                      float(r.momentum_5d), float(r.momentum_20d)),
+        } for sym, r in zip(passed.index, passed.itertuples())]
+        results.sort(key=lambda x: x["score"], reverse=True)
+    return {
+        "results":     results,
+        "prices":      {s: float(df["close"].iloc[-1]) for s, df in frames.items()},
+        "download_ms": round(dl.ms, 1),
+        "score_ms":    round(sc.ms, 1),
+    }
@@ -1,12 +1,20 @@
 # backend/app/engine/sentiment.py
 """Sentiment Analysis Engine
 Uses keyword-based scoring of news headlines.
+
+The bullish/bearish terms (single words and multi-word phrases, optionally
+weighted) are compiled once into a Lexicon: one regex alternation, longest
+term first, matched on word boundaries. Lexicon.matrix turns a whole list
+of texts into a sparse (article × term) incidence matrix in a single pass;
+per-article scores are products with the weight vector, and per-symbol
+aggregates are products of a sparse (symbol × article) matrix with the
+per-article columns — so a whole universe is scored in one pass.
 """
 import re
 from datetime import date, timedelta
-from ..config import get_settings
-
-settings = get_settings()
+import numpy as np
+from scipy import sparse
+from ..services.finnhub_client import finnhub_client
 
 # ── Keyword dictionaries ───────────────────────────────────────────────────────
 BULLISH_WORDS = {
@@ -25,104 +33,242 @@ BEARISH_WORDS = {
     'fraud', 'penalty', 'fine', 'recession', 'default',
 }
 
+# Terms whose weight differs from ±1 — phrases outweigh the single words they contain
+TERM_WEIGHTS = {
+    'earnings beat':   1.5,
+    'guidance raised': 1.5,
+    'guidance cut':   -1.5,
+}
+
+SCORER_VERSION  = 1          # bump when the lexicon/scoring changes — stored scores are redone
+MIN_TEXT_LEN    = 5
+LISTED_ARTICLES = 15         # `scored_articles` rows returned (the aggregate uses every article)
+DOC_SEP         = "\x00"     # neither a word nor a space character — no match spans two texts
+
+
+class Lexicon:
+    """Weighted terms/phrases compiled into one alternation (longest match first)."""
+
+    def __init__(self, weights: dict):
+        self.terms   = sorted(weights, key=lambda t: (-len(t), t))
+        self.index   = {t: i for i, t in enumerate(self.terms)}
+        self.weights = np.array([float(weights[t]) for t in self.terms])
+        self.mass    = np.abs(self.weights)
+        pattern      = "|".join(r"\s+".join(map(re.escape, t.split())) for t in self.terms)
+        # The separator is matched too, so findall alone tells which text each hit is in
+        self.regex   = re.compile(rf"{DOC_SEP}|\b(?:{pattern})\b")
+
+    def match(self, texts: list) -> tuple:
+        """(doc index, term index) of every distinct term found in each (lower-cased) text."""
+        joined = DOC_SEP.join(t.replace(DOC_SEP, " ") for t in texts).lower()
+        found  = self.regex.findall(joined)
+        index  = self.index
+        # Phrases matched across irregular whitespace are normalized to their lexicon form
+        code   = np.fromiter((-1 if t == DOC_SEP else index[t] if t in index else index[" ".join(t.split())]
+                              for t in found), dtype=np.int64, count=len(found))
+        sep    = code < 0
+        doc    = np.cumsum(sep)[~sep]
+        key    = np.sort(doc * len(self.terms) + code[~sep])
+        key    = key[np.r_[True, key[1:] != key[:-1]]] if len(key) else key
+        return key // len(self.terms), key % len(self.terms)
+
+    def matrix(self, texts: list) -> sparse.csr_matrix:
+        """Binary (text × term) matrix — 1 where the term occurs in the text."""
+        doc, term = self.match(texts)
+        return sparse.csr_matrix((np.ones(len(doc)), (doc, term)), shape=(len(texts), len(self.terms)))
+
+
+LEXICON = Lexicon({**{w: 1.0 for w in BULLISH_WORDS},
+                   **{w: -1.0 for w in BEARISH_WORDS},
+                   **TERM_WEIGHTS})
+
+SENTIMENT_RANK_COLUMNS = ("aggregate_score", "total_articles", "bullish_count", "bearish_count")
+
+NEUTRAL_SENTIMENT = {
+    "aggregate_score": 0.0, "label": "ניטרלי ➡️",
+    "bullish_count": 0, "bearish_count": 0, "neutral_count": 0,
+    "total_articles": 0, "scored_articles": [],
+}
+
+def article_text(item: dict) -> str:
+    """The text an article is scored on."""
+    return f"{item.get('headline', '')}. {item.get('summary', '')}"[:400]
+
+
 class SentimentEngine:
     def score_text(self, text: str) -> dict:
         """
         Score a single text string.
         Returns: { score: float (-1 to +1), label: str, confidence: float }
         """
-        if not text or len(text.strip()) < 5:
-            return {"score": 0.0, "label": "neutral", "confidence": 0.5}
-        return self._keyword_score(text)
-
-    def _keyword_score(self, text: str) -> dict:
-        text_lower = text.lower()
-        words      = set(re.findall(r'\b\w+\b', text_lower))
-        bull_hits = len(words & BULLISH_WORDS)
-        bear_hits = len(words & BEARISH_WORDS)
-        total     = bull_hits + bear_hits
-        if total == 0:
-            return {"score": 0.0, "label": "neutral", "confidence": 0.5}
-        score = (bull_hits - bear_hits) / total
-        conf  = min(0.5 + total * 0.08, 0.90)
-        if score > 0.1:   label = "positive"
-        elif score < -0.1: label = "negative"
-        else:              label = "neutral"
-        return {"score": round(score, 4), "label": label, "confidence": round(conf, 4)}
+        return self.score_batch([text])[0]
 
-    def score_news_batch(self, news_items: list) -> dict:
+    def score_batch(self, texts: list) -> list:
         """
-        Score a batch of news articles and return aggregate sentiment.
+        Score many texts with one lexicon pass. Each distinct term counts once
+        per text: score = Σ weight / Σ |weight|, confidence grows with the
+        number of distinct terms.
         """
-        if not news_items:
-            return {
-                "aggregate_score":    0.0,
-                "label":              "neutral",
-                "bullish_count":      0,
-                "bearish_count":      0,
-                "neutral_count":      0,
-                "total_articles":     0,
-                "scored_articles":    [],
-            }
-        scored   = []
-        scores   = []
-        bull_cnt = bear_cnt = neu_cnt = 0
-        for item in news_items[:15]:   # cap at 15 for speed
-            headline = item.get('headline', '')
-            summary  = item.get('summary', '')
-            text     = f"{headline}. {summary}"[:400]
-            result = self.score_text(text)
-            scored.append({
-                "headline":   headline[:120],
+        texts = [t if t and len(t.strip()) >= MIN_TEXT_LEN else "" for t in texts]
+        n     = len(texts)
+        if n == 0:
+            return []
+        if n == 1:   # score_text: bincount over the matches — no sparse matrix to build
+            doc, term = LEXICON.match(texts)
+            net    = np.bincount(doc, LEXICON.weights[term], minlength=1)
+            mass   = np.bincount(doc, LEXICON.mass[term], minlength=1)
+            counts = np.bincount(doc, minlength=1)
+        else:
+            X      = LEXICON.matrix(texts)
+            net    = X @ LEXICON.weights
+            mass   = X @ LEXICON.mass
+            counts = X.getnnz(axis=1)
+
+        out = []
+        for k in range(n):
+            if counts[k] == 0:
+                out.append({"score": 0.0, "label": "neutral", "confidence": 0.5})
+                continue
+            score = float(net[k] / mass[k])
+            conf  = min(0.5 + int(counts[k]) * 0.08, 0.90)
+            if score > 0.1:   label = "positive"
+            elif score < -0.1: label = "negative"
+            else:              label = "neutral"
+            out.append({"score": round(score, 4), "label": label, "confidence": round(conf, 4)})
+        return out
+
+    def score_articles(self, news_items: list) -> list:
+        """Per-article scores (the `scored_articles` rows) for raw Finnhub items."""
+        results = self.score_batch([article_text(item) for item in news_items])
+        return [
+            {
+                "headline":   item.get('headline', '')[:120],
                 "url":        item.get('url', ''),
                 "source":     item.get('source', ''),
                 "datetime":   item.get('datetime', 0),
                 "sentiment":  result['label'],
                 "score":      result['score'],
                 "confidence": result['confidence'],
-            })
-            scores.append(result['score'])
-            if result['label'] == 'positive': bull_cnt += 1
-            elif result['label'] == 'negative': bear_cnt += 1
-            else: neu_cnt += 1
-        agg = float(sum(scores) / len(scores)) if scores else 0.0
-        if agg > 0.15:    agg_label = "חיובי 📈"
-        elif agg < -0.15: agg_label = "שלילי 📉"
-        else:              agg_label = "ניטרלי ➡️"
-        return {
-            "aggregate_score":  round(agg, 4),
-            "label":            agg_label,
-            "bullish_count":    bull_cnt,
-            "bearish_count":    bear_cnt,
-            "neutral_count":    neu_cnt,
-            "total_articles":   len(news_items),
-            "scored_articles":  scored,
-        }
+            }
+            for item, result in zip(news_items, results)
+        ]
+
+    def aggregate(self, scored: list, total: int | None = None) -> dict:
+        """Aggregate sentiment of already-scored articles (newest first)."""
+        result = self.aggregate_many({None: scored})[None]
+        if total is not None:
+            result["total_articles"] = total
+        return result
+
+    def aggregate_many(self, groups: dict) -> dict:
+        """
+        {key: scored articles} → {key: aggregate} in one pass: the article
+        columns (score, positive, negative) are stacked once and summed per
+        key with a sparse (key × article) incidence product (a plain column
+        sum for a single key).
+        """
+        keys   = list(groups)
+        sizes  = np.array([len(groups[k]) for k in keys], dtype=np.int64)
+        rows   = [a for k in keys for a in groups[k]]
+        cols   = np.array([[a['score'], a['sentiment'] == 'positive', a['sentiment'] == 'negative']
+                           for a in rows], dtype=np.float64).reshape(len(rows), 3)
+        if len(keys) == 1:
+            sums = cols.sum(axis=0, keepdims=True)
+        else:
+            S    = sparse.csr_matrix((np.ones(len(rows)), (np.repeat(np.arange(len(keys)), sizes),
+                                                         np.arange(len(rows)))),
+                                     shape=(len(keys), len(rows)))
+            sums = S @ cols
+        out = {}
+        for k, key in enumerate(keys):
+            scored = groups[key]
+            if not scored:
+                out[key] = {
+                    "aggregate_score":    0.0,
+                    "label":              "neutral",
+                    "bullish_count":      0,
+                    "bearish_count":      0,
+                    "neutral_count":      0,
+                    "total_articles":     0,
+                    "scored_articles":    [],
+                }
+                continue
+            agg      = float(sums[k, 0] / sizes[k])
+            bull_cnt = int(sums[k, 1])
+            bear_cnt = int(sums[k, 2])
+            if agg > 0.15:    agg_label = "חיובי 📈"
+            elif agg < -0.15: agg_label = "שלילי 📉"
+            else:              agg_label = "ניטרלי ➡️"
+            out[key] = {
+                "aggregate_score":  round(agg, 4),
+                "label":            agg_label,
+                "bullish_count":    bull_cnt,
+                "bearish_count":    bear_cnt,
+                "neutral_count":    len(scored) - bull_cnt - bear_cnt,
+                "total_articles":   len(scored),
+                "scored_articles":  scored[:LISTED_ARTICLES],
+            }
+        return out
+
+    def score_news_batch(self, news_items: list) -> dict:
+        """
+        Score a batch of news articles and return aggregate sentiment.
+        """
+        return self.aggregate(self.score_articles(news_items))
+
+    def fetch_news(self, symbol: str, days: int = 7, from_date: date | None = None) -> list:
+        """
+        Finnhub company news from `from_date` (default: `days` ago) to today,
+        through the shared rate-limited client (raises on failure).
+        """
+        today   = date.today().strftime("%Y-%m-%d")
+        from_dt = (from_date or date.today() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return finnhub_client.get_sync("/company-news", symbol=symbol.upper(), **{"from": from_dt, "to": today})
 
     def get_symbol_sentiment(self, symbol: str, days: int = 7) -> dict:
         """
-        Fetch Finnhub news for symbol and return aggregate sentiment.
-        Times out after 8 seconds to avoid blocking signal generation.
+        Aggregate sentiment of the symbol's stored articles from the last
+        `days` days, after an incremental Finnhub poll (see news_store);
+        `stale` when the poll failed and only stored articles were scored.
         """
-        _empty = {
-            "aggregate_score": 0.0, "label": "ניטרלי ➡️",
-            "bullish_count": 0, "bearish_count": 0, "neutral_count": 0,
-            "total_articles": 0, "scored_articles": [],
-        }
+        from ..services.news_store import news_store
         try:
-            import requests
-            today   = date.today().strftime("%Y-%m-%d")
-            from_dt = (date.today() - timedelta(days=days)).strftime("%Y-%m-%d")
-            resp = requests.get(
-                "https://finnhub.io/api/v1/company-news",
-                params={"symbol": symbol.upper(), "from": from_dt, "to": today,
-                        "token": settings.finnhub_api_key},
-                timeout=8,
-            )
-            news = resp.json() if resp.status_code == 200 else []
-            return self.score_news_batch(news)
+            articles, error = news_store.recent_status(symbol, days)
+            return {**self.aggregate(articles), "stale": error is not None}
         except Exception as e:
-            return {**_empty, "error": str(e)}
+            return {**NEUTRAL_SENTIMENT, "error": str(e)}
+
+    def leaderboard(self, symbols: list, days: int = 7, sort_by: str = "aggregate_score") -> dict:
+        """
+        Rank symbols by news sentiment: one incremental poll per symbol, one
+        store read for all of them, one aggregate_many pass.
+        """
+        from ..services.news_store import news_store
+        if sort_by not in SENTIMENT_RANK_COLUMNS:
+            raise ValueError(f"sort_by חייב להיות אחד מ-{SENTIMENT_RANK_COLUMNS}")
+        syms   = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        errors = news_store.poll_many(syms, days)
+        aggs   = self.aggregate_many(news_store.recent_many(syms, days))
+        order  = sorted(syms, key=lambda s: -aggs[s][sort_by])   # stable: ties keep input order
+        rows   = [{
+            "rank":            i + 1,
+            "symbol":          sym,
+            "aggregate_score": aggs[sym]["aggregate_score"],
+            "label":           aggs[sym]["label"],
+            "bullish_count":   aggs[sym]["bullish_count"],
+            "bearish_count":   aggs[sym]["bearish_count"],
+            "neutral_count":   aggs[sym]["neutral_count"],
+            "total_articles":  aggs[sym]["total_articles"],
+            "top_headline":    aggs[sym]["scored_articles"][0]["headline"] if aggs[sym]["scored_articles"] else None,
+            "stale":           sym in errors,
+        } for i, sym in enumerate(order)]
+        return {
+            "count":       len(rows),
+            "days":        days,
+            "sort_by":     sort_by,
+            "leaderboard": rows,
+            "errors":      [{"symbol": s, "error": e} for s, e in errors.items()],
+        }
 
 # Singleton
 sentiment_engine = SentimentEngine()
@@ -9,13 +9,22 @@ Combines:
   5. Risk Management (Kelly + ATR)
 → Outputs final BUY/SELL/HOLD decision in Hebrew with full reasoning
 """
+import json
+import time
+import hashlib
+import threading
 import traceback
+from collections import OrderedDict
 from typing import Optional
-from .feature_engineering import feature_engineer
-from .ml_ensemble         import ml_ensemble
-from .sentiment           import sentiment_engine
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as StageTimeout
+from .feature_engineering import feature_engineer, FEATURE_SET_VERSION
+from .ml_ensemble         import model_for
+from .sentiment           import sentiment_engine, NEUTRAL_SENTIMENT
 from .risk_manager        import risk_manager
 from ..services.yfinance_service import yf_service
+from ..services.news_store import news_store
+from ..services.metrics import span, in_context
 
 
 # ── Weights for signal fusion ─────────────────────────────────────────────────
@@ -26,6 +35,145 @@ WEIGHTS = {
     "fundamental": 0.10,   # Fundamental score
 }
 
+# ── Decision thresholds (shared with cross_section) ──────────────────────────
+DECISION_SCORE      = 0.15    # |fused score| above this → buy / sell
+DECISION_CONFIDENCE = 0.50    # ...only when combined confidence is above this
+DECISION_STYLES = {           # label → (color, emoji)
+    "קנייה": ("green",  "📈"),
+    "מכירה": ("red",    "📉"),
+    "החזק":  ("yellow", "⏸️"),
+}
+
+# ── Independent I/O stages: run concurrently, each with its own deadline ──────
+# (seconds from the start of generate_signal; fallback None = stage is required)
+# features → price history, sentiment → scored stored articles (None = unavailable → neutral)
+STAGES = {
+    "features":     {"timeout": 25.0, "fallback": None},
+    "fundamentals": {"timeout": 8.0,  "fallback": lambda sym: {"symbol": sym.upper()}},
+    "sentiment":    {"timeout": 9.0,  "fallback": lambda sym: None},
+}
+FEATURE_PERIOD = "6mo"
+
+# ── Response fields (fields= projection) ──────────────────────────────────────
+SIGNAL_FIELDS = (
+    "symbol", "decision", "emoji", "color", "fused_score", "confidence",
+    "entry_price", "stop_loss", "take_profit", "risk_reward", "recommended_shares",
+    "reasoning_he", "sources", "ml_result", "sentiment", "risk", "ta_signals",
+    "features", "degraded_stages", "reused_components", "error",
+)
+ALWAYS_FIELDS = ("symbol", "error")
+
+
+def parse_fields(fields) -> frozenset | None:
+    """fields= value (CSV string or list) → validated field set; None/empty = everything."""
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    wanted  = {f.strip() for f in fields if f and f.strip()}
+    unknown = wanted - set(SIGNAL_FIELDS)
+    if unknown:
+        raise ValueError(f"שדות לא מוכרים: {', '.join(sorted(unknown))}")
+    return frozenset(wanted) | frozenset(ALWAYS_FIELDS)
+
+
+def project(signal: dict, fields: frozenset | None) -> dict:
+    if fields is None:
+        return signal
+    return {k: v for k, v in signal.items() if k in fields}
+# Timed-out stages keep their thread until the underlying call returns
+_stage_pool = ThreadPoolExecutor(max_workers=12, thread_name_prefix="signal-stage")
+
+
+def _news_rows(status: tuple) -> tuple:
+    """news_store.recent_status → (articles, degraded entry | None): stored articles
+    served after a failed poll are still scored, but the stage is reported stale."""
+    rows, error = status
+    return rows, ({"stage": "sentiment", "reason": "stale", "detail": error} if error else None)
+
+
+def _run_stages(symbol: str) -> tuple:
+    """Run the fetch stages concurrently → (results, degraded stages)."""
+    calls = {
+        "features":     lambda: feature_engineer.get_raw_data(symbol, period=FEATURE_PERIOD),
+        "fundamentals": lambda: yf_service.get_fundamentals(symbol),
+        "sentiment":    lambda: news_store.recent_status(symbol, days=7),
+    }
+    def _timed(name, fn):
+        def run():
+            with span(f"signal.{name}"):
+                return fn()
+        return in_context(run)
+
+    start   = time.monotonic()
+    futures = {name: _stage_pool.submit(_timed(name, fn)) for name, fn in calls.items()}
+    results, degraded = {}, []
+    for name, fut in futures.items():
+        spec = STAGES[name]
+        try:
+            results[name] = fut.result(timeout=max(0.0, start + spec["timeout"] - time.monotonic()))
+            if isinstance(results[name], dict) and results[name].get("error"):
+                raise RuntimeError(results[name]["error"])
+            if name == "sentiment":
+                results[name], stale = _news_rows(results[name])
+                if stale:
+                    degraded.append(stale)
+        except Exception as e:
+            if spec["fallback"] is None:
+                for f in futures.values():
+                    f.cancel()
+                if isinstance(e, StageTimeout):
+                    raise TimeoutError(f"שלב {name} חרג מ-{spec['timeout']} שניות")
+                raise
+            reason = "timeout" if isinstance(e, StageTimeout) else "error"
+            degraded.append({"stage": name, "reason": reason,
+                             **({"detail": str(e)} if reason == "error" else {})})
+            results[name] = spec["fallback"](symbol)
+    return results, degraded
+
+
+# ── Component memoization ─────────────────────────────────────────────────────
+# Each fusion component is cached per symbol under a fingerprint of its own
+# inputs; a refresh recomputes only the components whose inputs changed.
+MEMO_MAX_SYMBOLS = 512
+_memo: OrderedDict = OrderedDict()     # symbol → {component: (fingerprint, value)}
+_memo_lock = threading.Lock()
+
+
+def fingerprint(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        if isinstance(p, pd.DataFrame):
+            h.update(pd.util.hash_pandas_object(p, index=True).to_numpy().tobytes())
+            h.update(",".join(map(str, p.columns)).encode())
+        else:
+            h.update(json.dumps(p, sort_keys=True, default=str).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class Components:
+    """Memoized component evaluation for one generate_signal run."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.reused = []
+
+    def get(self, name: str, inputs: tuple, compute):
+        fp = fingerprint(*inputs)
+        with _memo_lock:
+            entry = _memo.get(self.symbol, {}).get(name)
+        if entry and entry[0] == fp:
+            self.reused.append(name)
+            return entry[1]
+        value = compute()
+        with _memo_lock:
+            _memo.setdefault(self.symbol, {})[name] = (fp, value)
+            _memo.move_to_end(self.symbol)
+            while len(_memo) > MEMO_MAX_SYMBOLS:
+                _memo.popitem(last=False)
+        return value
+
 
 def _ta_score(features: dict) -> float:
     """Rule-based TA score from -1 to +1."""
@@ -99,14 +247,35 @@ def _fundamental_score(fundamentals: dict) -> float:
     return max(-1.0, min(1.0, score))
 
 
+def _fuse(ml_result: dict, sent_score: float, ta_score: float, fund_score: float) -> tuple:
+    """Weighted fusion score and combined confidence."""
+    ml_decision = ml_result['decision']           # -1, 0, 1
+    ml_conf     = ml_result['confidence']
+    ml_score    = ml_decision * ml_conf            # weighted
+
+    fused_score = (
+        WEIGHTS['ml']          * ml_score    +
+        WEIGHTS['sentiment']   * sent_score  +
+        WEIGHTS['technical']   * ta_score    +
+        WEIGHTS['fundamental'] * fund_score
+    )
+    combined_confidence = (
+        ml_conf * 0.5 +
+        min(abs(sent_score) + 0.3, 1.0) * 0.3 +
+        min(abs(ta_score) + 0.3, 1.0) * 0.2
+    )
+    return fused_score, combined_confidence
+
+
 def _to_hebrew_decision(score: float, confidence: float) -> dict:
     """Convert numeric score to Hebrew decision label."""
-    if score > 0.15 and confidence > 0.50:
-        label, color, emoji = "קנייה",  "green",  "📈"
-    elif score < -0.15 and confidence > 0.50:
-        label, color, emoji = "מכירה", "red",    "📉"
+    if score > DECISION_SCORE and confidence > DECISION_CONFIDENCE:
+        label = "קנייה"
+    elif score < -DECISION_SCORE and confidence > DECISION_CONFIDENCE:
+        label = "מכירה"
     else:
-        label, color, emoji = "החזק",  "yellow", "⏸️"
+        label = "החזק"
+    color, emoji = DECISION_STYLES[label]
     return {"label": label, "color": color, "emoji": emoji, "score": round(score, 4)}
 
 
@@ -204,12 +373,21 @@ def _generate_hebrew_reasoning(
     return "\n".join(reasons)
 
 
-def generate_signal(symbol: str) -> dict:
+def generate_signal(symbol: str, fields: frozenset | None = None) -> dict:
     """
     Main entry point — generates full Alpha signal for a symbol.
     Returns comprehensive dict with decision, reasoning, sources, risk levels.
+    `fields` (see parse_fields) limits the response to those keys; reasoning,
+    sources and features are only built when requested.
     """
-    result = {
+    with span("signal.total") as sp:
+        result = _generate_signal(symbol, fields)
+        sp.ok  = not result.get("error")
+    return project(result, fields)
+
+
+def _empty_result(symbol: str) -> dict:
+    return {
         "symbol":       symbol.upper(),
         "decision":     "החזק",
         "emoji":        "⏸️",
@@ -224,102 +402,140 @@ def generate_signal(symbol: str) -> dict:
         "sentiment":    {},
         "risk":         {},
         "ta_signals":   [],
+        "degraded_stages": [],
+        "reused_components": [],
         "error":        None,
     }
 
+
+def _finalize(
+    result:       dict,
+    features:     dict,
+    fundamentals: dict,
+    sentiment:    dict,
+    ml_result:    dict,
+    ta_signals:   list,
+    fused_score:  float,
+    confidence:   float,
+    decision:     dict,
+    memo:         Components,
+    fields:       frozenset | None = None,
+) -> dict:
+    """
+    Risk levels, reasoning and sources for a scored signal (steps 9–11).
+    Reasoning, sources and features are skipped when `fields` leaves them out.
+    """
+    def wanted(name):
+        return fields is None or name in fields
+    symbol     = result["symbol"]
+    price      = features['price']
+    atr_14     = features.get('atr_14', price * 0.02)
+    volatility = features.get('volatility_20', 0.25)
+
+    # ── Step 9: Risk Levels ───────────────────────────────────
+    direction = "BUY" if decision['label'] == "קנייה" else \
+                "SELL" if decision['label'] == "מכירה" else "BUY"
+    def _risk():
+        with span("signal.risk"):
+            return risk_manager.full_risk_assessment(
+                price          = price,
+                atr_14         = atr_14,
+                volatility_20d = volatility,
+                win_probability= confidence,
+                direction      = direction,
+            )
+    risk = memo.get("risk", (price, atr_14, volatility, confidence, direction,
+                             vars(risk_manager)), _risk)
+
+    # ── Step 10: Hebrew Reasoning ─────────────────────────────
+    def _reasoning():
+        with span("signal.reasoning"):
+            return _generate_hebrew_reasoning(
+                symbol, decision, features, ml_result,
+                sentiment, ta_signals, fundamentals, risk,
+            )
+    reasoning = memo.get("reasoning", (decision, features, ml_result, sentiment,
+                                       ta_signals, fundamentals, risk), _reasoning) \
+                if wanted("reasoning_he") else None
+
+    # ── Step 11: Sources ──────────────────────────────────────
+    sources = [
+        {
+            "headline":  a['headline'],
+            "url":       a['url'],
+            "source":    a['source'],
+            "sentiment": a['sentiment'],
+            "score":     a['score'],
+            "datetime":  a['datetime'],
+        }
+        for a in sentiment.get('scored_articles', [])[:5]
+    ] if wanted("sources") else None
+
+    result.update({
+        "decision":          decision['label'],
+        "emoji":             decision['emoji'],
+        "color":             decision['color'],
+        "fused_score":       round(fused_score, 4),
+        "confidence":        round(confidence, 4),
+        "entry_price":       round(price, 4),
+        "stop_loss":         risk.get('stop_loss'),
+        "take_profit":       risk.get('take_profit'),
+        "risk_reward":       risk.get('risk_reward'),
+        "recommended_shares":risk.get('recommended_shares'),
+        "reasoning_he":      reasoning,
+        "sources":           sources,
+        "ml_result":         ml_result,
+        "sentiment":         sentiment,
+        "risk":              risk,
+        "ta_signals":        ta_signals,
+        "features":          {k: v for k, v in features.items()
+                              if k not in ('resistance_20','support_20','vwap')}
+                             if wanted("features") else None,
+        "reused_components": memo.reused,
+    })
+    return result
+
+
+def _generate_signal(symbol: str, fields: frozenset | None = None) -> dict:
+    result = _empty_result(symbol)
+    memo   = Components(symbol)
+
     try:
-        # ── Step 1: Feature Engineering ──────────────────────────
-        features     = feature_engineer.get_latest_features(symbol)
-        fundamentals = yf_service.get_fundamentals(symbol)
-        price        = features['price']
-        atr_14       = features.get('atr_14', price * 0.02)
-        volatility   = features.get('volatility_20', 0.25)
+        # ── Step 1: Prices + Fundamentals + News (concurrent) ────
+        stages, degraded = _run_stages(symbol)
+        result["degraded_stages"] = degraded
+        fundamentals = stages["fundamentals"]
+        features     = memo.get("features", (stages["features"], FEATURE_SET_VERSION),
+                                lambda: feature_engineer.latest_features(
+                                    feature_engineer.compute_all_features(stages["features"])))
+        news      = stages["sentiment"]
+        sentiment = dict(NEUTRAL_SENTIMENT) if news is None else \
+                    memo.get("sentiment", (news,), lambda: sentiment_engine.aggregate(news))
 
         # ── Step 2: ML Ensemble (rule-based fallback, no heavy training) ────
-        ml_result = ml_ensemble.predict(features)
+        model = model_for(symbol)
+        def _ml():
+            with span("signal.ml"):
+                return model.predict(features)
+        ml_result = memo.get("ml", (features, model.version), _ml)
 
         # ── Step 3: TA Score ──────────────────────────────────────
-        ta_score_val, ta_signals = _ta_score(features)
+        ta_score_val, ta_signals = memo.get("ta", (features,), lambda: _ta_score(features))
 
         # ── Step 4: Sentiment ─────────────────────────────────────
-        sentiment = sentiment_engine.get_symbol_sentiment(symbol, days=7)
         sent_score = sentiment.get('aggregate_score', 0.0)
 
         # ── Step 5: Fundamental Score ─────────────────────────────
-        fund_score = _fundamental_score(fundamentals)
-
-        # ── Step 6: ML Score conversion (-1 to +1) ───────────────
-        ml_decision = ml_result['decision']           # -1, 0, 1
-        ml_conf     = ml_result['confidence']
-        ml_score    = ml_decision * ml_conf            # weighted
-
-        # ── Step 7: Fusion ────────────────────────────────────────
-        fused_score = (
-            WEIGHTS['ml']          * ml_score    +
-            WEIGHTS['sentiment']   * sent_score  +
-            WEIGHTS['technical']   * ta_score_val+
-            WEIGHTS['fundamental'] * fund_score
-        )
+        fund_score = memo.get("fundamental", (fundamentals,), lambda: _fundamental_score(fundamentals))
 
-        combined_confidence = (
-            ml_conf * 0.5 +
-            min(abs(sent_score) + 0.3, 1.0) * 0.3 +
-            min(abs(ta_score_val) + 0.3, 1.0) * 0.2
-        )
+        # ── Step 6–7: Fusion + confidence ────────────────────────
+        fused_score, combined_confidence = _fuse(ml_result, sent_score, ta_score_val, fund_score)
 
         # ── Step 8: Decision ──────────────────────────────────────
         decision = _to_hebrew_decision(fused_score, combined_confidence)
 
-        # ── Step 9: Risk Levels ───────────────────────────────────
-        direction = "BUY" if decision['label'] == "קנייה" else \
-                    "SELL" if decision['label'] == "מכירה" else "BUY"
-        risk = risk_manager.full_risk_assessment(
-            price          = price,
-            atr_14         = atr_14,
-            volatility_20d = volatility,
-            win_probability= combined_confidence,
-            direction      = direction,
-        )
-
-        # ── Step 10: Hebrew Reasoning ─────────────────────────────
-        reasoning = _generate_hebrew_reasoning(
-            symbol, decision, features, ml_result,
-            sentiment, ta_signals, fundamentals, risk,
-        )
-
-        # ── Step 11: Sources ──────────────────────────────────────
-        sources = [
-            {
-                "headline":  a['headline'],
-                "url":       a['url'],
-                "source":    a['source'],
-                "sentiment": a['sentiment'],
-                "score":     a['score'],
-                "datetime":  a['datetime'],
-            }
-            for a in sentiment.get('scored_articles', [])[:5]
-        ]
-
-        result.update({
-            "decision":          decision['label'],
-            "emoji":             decision['emoji'],
-            "color":             decision['color'],
-            "fused_score":       round(fused_score, 4),
-            "confidence":        round(combined_confidence, 4),
-            "entry_price":       round(price, 4),
-            "stop_loss":         risk.get('stop_loss'),
-            "take_profit":       risk.get('take_profit'),
-            "risk_reward":       risk.get('risk_reward'),
-            "recommended_shares":risk.get('recommended_shares'),
-            "reasoning_he":      reasoning,
-            "sources":           sources,
-            "ml_result":         ml_result,
-            "sentiment":         sentiment,
-            "risk":              risk,
-            "ta_signals":        ta_signals,
-            "features":          {k: v for k, v in features.items()
-                                  if k not in ('resistance_20','support_20','vwap')},
-        })
+        _finalize(result, features, fundamentals, sentiment, ml_result, ta_signals,
+                  fused_score, combined_confidence, decision, memo, fields)
 
     except Exception as e:
         result['error']        = str(e)
@@ -0,0 +1,132 @@
+# backend/app/engine/strategies.py
+"""
+Rule-based backtest strategies with tunable parameters.
+Indicators are computed once per (indicator, params) key and signals are
+derived from plain numpy arrays, so sweeps can share them across processes.
+"""
+import numpy as np
+import pandas as pd
+import pandas_ta as ta
+
+# id → default params + default sweep grid
+STRATEGIES = {
+    "rsi": {
+        "defaults": {"length": 14, "lower": 30, "upper": 70},
+        "grid":     {"length": [7, 14, 21], "lower": [20, 25, 30, 35], "upper": [65, 70, 75, 80]},
+    },
+    "macd": {
+        "defaults": {"fast": 12, "slow": 26, "signal": 9},
+        "grid":     {"fast": [8, 12, 16], "slow": [21, 26, 34], "signal": [5, 9, 12]},
+    },
+    "sma": {
+        "defaults": {"fast": 20, "slow": 50},
+        "grid":     {"fast": [5, 10, 20, 30], "slow": [50, 100, 150, 200]},
+    },
+}
+
+# Indicator keys that already exist as feature-matrix columns
+_FEATURE_COLUMNS = {
+    "rsi_14": "rsi_14", "sma_20": "sma_20", "sma_50": "sma_50", "sma_200": "sma_200",
+    "macd_12_26_9": "macd", "macds_12_26_9": "macd_signal",
+}
+
+
+def resolve_params(strategy: str, params: dict | None = None) -> dict:
+    """Defaults overlaid with `params`; raises ValueError on unknown/invalid keys."""
+    spec = STRATEGIES.get(strategy)
+    if spec is None:
+        raise ValueError(f"אסטרטגיה לא מוכרת: {strategy}")
+    out = dict(spec["defaults"])
+    for k, v in (params or {}).items():
+        if k not in out:
+            raise ValueError(f"פרמטר לא מוכר '{k}' עבור {strategy}")
+        out[k] = int(v)
+    if not is_valid(strategy, out):
+        raise ValueError(f"פרמטרים לא תקינים עבור {strategy}: {out}")
+    return out
+
+
+def is_valid(strategy: str, p: dict) -> bool:
+    if strategy == "rsi":
+        return 1 < p["length"] and 0 <= p["lower"] < p["upper"] <= 100
+    if strategy in ("macd", "sma"):
+        return 1 <= p["fast"] < p["slow"]
+    return True
+
+
+def indicator_keys(strategy: str, p: dict) -> list:
+    if strategy == "rsi":
+        return [f"rsi_{p['length']}"]
+    if strategy == "sma":
+        return [f"sma_{p['fast']}", f"sma_{p['slow']}"]
+    if strategy == "macd":
+        tag = f"{p['fast']}_{p['slow']}_{p['signal']}"
+        return [f"macd_{tag}", f"macds_{tag}"]
+    return []
+
+
+def _clean(s: pd.Series | None, index) -> np.ndarray:
+    # Same cleanup as FeatureEngineer.compute_all_features
+    if s is None:
+        return np.full(len(index), np.nan)
+    return s.replace([np.inf, -np.inf], np.nan).ffill().bfill().to_numpy(dtype=np.float64)
+
+
+def compute_indicators(df: pd.DataFrame, keys) -> dict:
+    """key → float64 array. Reuses feature-matrix columns where they exist."""
+    close, out, macd_cache = df['close'], {}, {}
+    for key in keys:
+        col = _FEATURE_COLUMNS.get(key)
+        if col and col in df.columns:
+            out[key] = df[col].to_numpy(dtype=np.float64)
+            continue
+        kind, *nums = key.split("_")
+        nums = [int(x) for x in nums]
+        if kind == "rsi":
+            out[key] = _clean(ta.rsi(close, length=nums[0]), df.index)
+        elif kind == "sma":
+            out[key] = _clean(ta.sma(close, length=nums[0]), df.index)
+        elif kind in ("macd", "macds"):
+            tag = tuple(nums)
+            if tag not in macd_cache:
+                macd_cache[tag] = ta.macd(close, fast=nums[0], slow=nums[1], signal=nums[2])
+            m = macd_cache[tag]
+            if m is None or m.empty:
+                out[key] = np.full(len(df), np.nan)
+            else:
+                out[key] = _clean(m.iloc[:, 0] if kind == "macd" else m.iloc[:, 2], df.index)
+        else:
+            raise ValueError(f"Unknown indicator key: {key}")
+    return out
+
+
+def _crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """+1 where a crosses above b, -1 where it crosses below (works on 1-D or time × symbol)."""
+    a_prev = np.empty_like(a); a_prev[0] = np.nan; a_prev[1:] = a[:-1]
+    b_prev = np.empty_like(b); b_prev[0] = np.nan; b_prev[1:] = b[:-1]
+    sig = np.zeros(a.shape, dtype=np.int8)
+    sig[(a > b) & (a_prev <= b_prev)] = 1
+    sig[(a < b) & (a_prev >= b_prev)] = -1
+    return sig
+
+
+def signals_from_indicators(strategy: str, p: dict, ind: dict) -> np.ndarray:
+    """int8 signal array (+1 / 0 / -1) for one parameter set."""
+    if strategy == "rsi":
+        rsi = ind[f"rsi_{p['length']}"]
+        sig = np.zeros(rsi.shape, dtype=np.int8)
+        sig[rsi < p["lower"]] = 1
+        sig[rsi > p["upper"]] = -1
+        return sig
+    if strategy == "sma":
+        return _crossover(ind[f"sma_{p['fast']}"], ind[f"sma_{p['slow']}"])
+    if strategy == "macd":
+        tag = f"{p['fast']}_{p['slow']}_{p['signal']}"
+        return _crossover(ind[f"macd_{tag}"], ind[f"macds_{tag}"])
+    raise ValueError(f"אסטרטגיה לא מוכרת: {strategy}")
+
+
+def strategy_signals(df: pd.DataFrame, strategy: str, params: dict | None = None) -> pd.Series:
+    p   = resolve_params(strategy, params)
+    ind = compute_indicators(df, indicator_keys(strategy, p))
+    return pd.Series(signals_from_indicators(strategy, p, ind), index=df.index)
@@ -0,0 +1,174 @@
+# backend/app/engine/walk_forward.py
+"""
+Walk-Forward Optimization — fit on a train window, trade the next unseen window.
+
+  anchored: train = [0, test_start)            (expanding)
+  rolling:  train = last ROLLING_TRAIN_BLOCKS blocks before test_start
+
+Rule-based strategies pick the best parameter set on the train window
+(sweep over the strategy grid); `ml` retrains the ensemble on the train
+window. Folds run in the process pool on shared price/indicator/feature
+arrays and the out-of-sample test windows are stitched into one equity curve.
+"""
+import numpy as np
+import pandas as pd
+
+from .strategies import STRATEGIES, indicator_keys, compute_indicators, signals_from_indicators
+from .parallel import SharedArrays, attach, run_tasks
+
+MODES                = ("anchored", "rolling")
+ROLLING_TRAIN_BLOCKS = 2
+MIN_TEST_BARS        = 20
+
+
+def wf_folds(n: int, n_folds: int = 4, mode: str = "anchored") -> list:
+    """(train_start, train_end, test_start, test_end) per fold, as bar indices."""
+    if mode not in MODES:
+        raise ValueError(f"mode חייב להיות אחד מ-{MODES}")
+    block = n // (n_folds + 1)
+    if block < MIN_TEST_BARS:
+        return []
+    folds = []
+    for k in range(1, n_folds + 1):
+        test_start = k * block
+        test_end   = n if k == n_folds else test_start + block
+        train_start = 0 if mode == "anchored" else max(0, test_start - ROLLING_TRAIN_BLOCKS * block)
+        folds.append((train_start, test_start, test_start, test_end))
+    return folds
+
+
+def _period(index, a: int, b: int) -> str:
+    fmt = lambda t: str(t.date()) if hasattr(t, "date") else str(t)
+    return f"{fmt(index[a])} → {fmt(index[b - 1])}"
+
+
+def _fit_rule_based(close, ind, strategy, combos, tr0, tr1, initial_capital, rank_by):
+    from .optimizer import evaluate_combo
+    train_ind = {k: v[tr0:tr1] for k, v in ind.items()}
+    rows = [evaluate_combo(close[tr0:tr1], train_ind, strategy, p, initial_capital,
+                           robustness=False) for p in combos]
+    best = max(rows, key=lambda r: r[rank_by])
+    return best["params"], {"train_" + rank_by: best[rank_by]}
+
+
+def _fit_ml(X, close, tr0, tr1, te0, te1):
+    from .ml_ensemble import MLEnsemble, FEATURE_COLS
+    model = MLEnsemble()
+    train = pd.DataFrame(X[tr0:tr1], columns=FEATURE_COLS).assign(close=close[tr0:tr1])
+    test  = pd.DataFrame(X[te0:te1], columns=FEATURE_COLS)
+    try:
+        # Labels look LABEL_HORIZON bars ahead — build_dataset drops the last
+        # rows of the train window, so nothing leaks into the test window.
+        metrics = model.train(train, search=False, n_splits=3, parallel=False)
+        info    = {"fitted": True, "cv_f1_macro": metrics["cv_f1_macro"]}
+    except ValueError as e:
+        info    = {"fitted": False, "note": str(e)}
+    return model.predict_batch(test), info
+
+
+def _wf_fold_task(specs: dict, strategy: str, fold_no: int, fold: tuple,
+                  combos: list, initial_capital: float, rank_by: str) -> dict:
+    """Worker: fit/optimize on the train window, evaluate on the test window."""
+    from .backtester import _simulate, _summarize, _trade
+    tr0, tr1, te0, te1 = fold
+    with attach(specs) as arr:
+        close = arr.pop("close")
+        if strategy in STRATEGIES:
+            params, info = _fit_rule_based(close, arr, strategy, combos, tr0, tr1,
+                                           initial_capital, rank_by)
+            sig  = signals_from_indicators(strategy, params, arr)[te0:te1]
+            info = {"params": params, **info}
+        else:
+            sig, info = _fit_ml(arr["X"], close, tr0, tr1, te0, te1)
+
+        test_close = np.array(close[te0:te1])
+        del close   # the shared mapping is closed on exit
+
+    equity, trades, open_trade = _simulate(test_close, sig, initial_capital)
+    if open_trade:
+        trades.append(_trade(open_trade["entry"], float(test_close[-1]), open_trade["shares"]))
+    m = _summarize(equity, trades, initial_capital, curve=False)
+    return {
+        "fold":        fold_no,
+        "train_bars":  tr1 - tr0,
+        "test_bars":   te1 - te0,
+        "return":      m["total_return_pct"],
+        "sharpe":      m["sharpe_ratio"],
+        "win_rate":    m["win_rate_pct"],
+        "max_dd":      m["max_drawdown_pct"],
+        "trades":      m["total_trades"],
+        **info,
+        "_equity":     equity,
+        "_trades":     trades,
+    }
+
+
+def run_walk_forward(
+    df:              pd.DataFrame,
+    strategy:        str   = "ml",
+    mode:            str   = "anchored",
+    n_folds:         int   = 4,
+    initial_capital: float = 10_000.0,
+    space:           dict | None = None,
+    rank_by:         str   = "sharpe_ratio",
+    parallel:        bool  = True,
+    on_fold=None,
+) -> dict:
+    """
+    Genuine out-of-sample walk-forward on a feature matrix.
+    `on_fold(fold_result)` is called as each fold finishes (in completion order).
+    """
+    from .backtester import _summarize
+    folds = wf_folds(len(df), n_folds, mode)
+    if not folds:
+        return {"mode": mode, "folds": [], "error": "לא מספיק נתונים ל-Walk-Forward"}
+
+    close  = df['close'].to_numpy(dtype=np.float64)
+    combos = []
+    if strategy in STRATEGIES:
+        from .optimizer import expand_space
+        combos = expand_space(strategy, space)
+        keys   = sorted({k for p in combos for k in indicator_keys(strategy, p)})
+        arrays = {"close": close, **compute_indicators(df, keys)}
+    else:
+        from .ml_ensemble import FEATURE_COLS
+        X = np.column_stack([
+            df[c].to_numpy(dtype=np.float64) if c in df.columns else np.full(len(df), np.nan)
+            for c in FEATURE_COLS
+        ])
+        arrays = {"close": close, "X": X}
+
+    index = df.index
+    def _label(r):
+        tr0, tr1, te0, te1 = folds[r["fold"] - 1]
+        r["train_period"] = _period(index, tr0, tr1)
+        r["test_period"]  = _period(index, te0, te1)
+        return r
+
+    def _done(i, r):
+        if on_fold:
+            on_fold({k: v for k, v in _label(r).items() if not k.startswith("_")})
+
+    with SharedArrays(arrays) as shared:
+        tasks = [(shared.specs, strategy, i + 1, f, combos, initial_capital, rank_by)
+                 for i, f in enumerate(folds)]
+        results = run_tasks(_wf_fold_task, tasks, parallel=parallel, on_result=_done)
+
+    # ── Stitch out-of-sample windows: each fold starts from the previous fold's end ──
+    stitched, trades, capital = [], [], initial_capital
+    for r in results:
+        eq = r.pop("_equity") / initial_capital * capital
+        stitched.append(eq)
+        capital = float(eq[-1])
+        trades.extend(r.pop("_trades"))
+        _label(r)
+    oos = _summarize(np.concatenate(stitched), trades, initial_capital)
+    oos["period"] = _period(index, folds[0][2], folds[-1][3])
+
+    return {
+        "mode":       mode,
+        "n_folds":    len(folds),
+        "folds":      results,
+        "avg_return": round(sum(r["return"] for r in results) / len(results), 2),
+        "oos":        oos,
+    }
@@ -3,8 +3,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 from .database import create_tables, SessionLocal, PaperTrade
-from .routers import market, trading, signals, news, screener, backtest
+from .routers import market, trading, signals, news, screener, backtest, metrics
 from .services.yfinance_service import yf_service
+from .engine.order_matching import match_limit, match_exit
+from .tasks.signal_scheduler import signal_scheduler
+from .tasks.news_ingester import news_ingester
+from .config import get_settings
 
 
 def _fetch_price(symbol: str) -> float:
@@ -29,6 +33,8 @@ async def check_limit_orders():
         try:
             db = SessionLocal()
 
+            # Same matching rules as the intraday backtester (engine/order_matching),
+            # the live price acting as a one-tick bar.
             # ── 1. Trigger pending LIMIT orders ──────────────────────────────
             pending = db.query(PaperTrade).filter_by(
                 order_type="LIMIT", is_triggered=False, is_open=False
@@ -38,12 +44,9 @@ async def check_limit_orders():
                     current = _fetch_price(trade.symbol)
                     if not current:
                         continue
-                    triggered = (
-                        (trade.direction == "BUY"  and current <= trade.limit_price) or
-                        (trade.direction == "SELL" and current >= trade.limit_price)
-                    )
-                    if triggered:
-                        trade.entry_price  = current
+                    fill = match_limit(trade.direction, trade.limit_price, current)
+                    if fill is not None:
+                        trade.entry_price  = fill
                         trade.is_triggered = True
                         trade.is_open      = True
                         direction_he = "קנייה" if trade.direction == "BUY" else "מכירה"
@@ -59,17 +62,10 @@ async def check_limit_orders():
                     current = _fetch_price(trade.symbol)
                     if not current:
                         continue
-                    sl_hit = tp_hit = False
-                    if trade.direction == "BUY":
-                        sl_hit = trade.stop_loss   and current <= trade.stop_loss
-                        tp_hit = trade.take_profit and current >= trade.take_profit
-                    else:  # SELL
-                        sl_hit = trade.stop_loss   and current >= trade.stop_loss
-                        tp_hit = trade.take_profit and current <= trade.take_profit
-
-                    if sl_hit or tp_hit:
-                        reason = "סטופ לוס 🛑" if sl_hit else "טייק פרופיט 🎯"
-                        close_price = trade.stop_loss if sl_hit else trade.take_profit
+                    close_price, hit = match_exit(trade.direction, trade.stop_loss,
+                                                  trade.take_profit, current)
+                    if hit:
+                        reason = "סטופ לוס 🛑" if hit == "stop_loss" else "טייק פרופיט 🎯"
                         pnl = (close_price - trade.entry_price) * trade.quantity
                         if trade.direction == "SELL":
                             pnl = -pnl
@@ -95,8 +91,16 @@ async def lifespan(app: FastAPI):
     print("✅ Database tables created")
     task = asyncio.create_task(check_limit_orders())
     print("✅ Limit order checker started")
+    tasks = [task]
+    if get_settings().signal_scheduler_enabled:
+        tasks.append(asyncio.create_task(signal_scheduler.run()))
+        print("✅ Signal precompute scheduler started")
+    if get_settings().news_ingester_enabled:
+        tasks.append(asyncio.create_task(news_ingester.run()))
+        print("✅ News ingester started")
     yield
-    task.cancel()
+    for t in tasks:
+        t.cancel()
     print("🛑 Shutting down")
 
 
@@ -120,6 +124,7 @@ app.include_router(signals.router,  prefix="/api/signals",  tags=["אותות"])
 app.include_router(news.router,     prefix="/api/news",     tags=["חדשות"])
 app.include_router(screener.router, prefix="/api/screener", tags=["סורק"])
 app.include_router(backtest.router, prefix="/api/backtest", tags=["בקטסט"])
+app.include_router(metrics.router,  prefix="/api/metrics",  tags=["מדדים"])
 
 @app.get("/api/health")
 async def health():
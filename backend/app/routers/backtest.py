@@ -1,8 +1,128 @@
 # backend/app/routers/backtest.py
-from fastapi import APIRouter, Query
-from ..engine.backtester import run_backtest
+from fastapi import APIRouter, Query, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse, Response
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import io
+import json
+import re
+import numpy as np
+from ..engine.backtester import load_result
+from ..engine.intraday import run_intraday_backtest
+from ..engine.monte_carlo import run_monte_carlo, METHODS as MC_METHODS
+from ..engine.optimizer  import run_sweep
+from ..engine.walk_forward import run_walk_forward
+from ..engine.feature_engineering import feature_engineer
+from ..engine.portfolio import run_portfolio_backtest, ALLOCATIONS
+from ..database import get_db, WatchlistItem
+from ..services.backtest_cache import backtest_cache
+from ..tasks.backtest_jobs import backtest_jobs, QueueFull
+from .screener import SMALL_CAP_UNIVERSE, CRYPTO_UNIVERSE
 
 router = APIRouter()
+_executor = ThreadPoolExecutor(max_workers=2)
+
+class BacktestJobRequest(BaseModel):
+    symbol:          str
+    period:          str             = "2y"
+    strategy:        str             = "ml"
+    initial_capital: float           = 10000.0
+    params:          Optional[dict]  = None
+    wf_mode:         str             = "anchored" # anchored | rolling
+    points:          Optional[int]   = 2000       # equity-curve points (None = full)
+    curve_method:    str             = "lttb"     # lttb | minmax
+    debug:           bool            = False      # attach timing spans
+
+class MonteCarloRequest(BaseModel):
+    result_id:       Optional[str]   = None       # from /run — or run the backtest below
+    symbol:          Optional[str]   = None
+    period:          str             = "2y"
+    strategy:        str             = "ml"
+    params:          Optional[dict]  = None
+    initial_capital: float           = 10000.0
+    wf_mode:         str             = "anchored"
+    n_sims:          int             = 10000
+    methods:         list[str]       = list(MC_METHODS)   # trades | bootstrap
+    block:           int             = 20
+    seed:            Optional[int]   = 42
+
+class IntradayRequest(BaseModel):
+    symbol:           str
+    interval:         str             = "5m"       # 1m 5m 15m 30m 1h
+    period:           Optional[str]   = None       # default: longest yfinance allows
+    strategy:         str             = "rsi"
+    params:           Optional[dict]  = None
+    order_type:       str             = "limit"    # market | limit
+    limit_offset_pct: float           = 0.1
+    stop_loss_pct:    float           = 1.0
+    take_profit_pct:  float           = 2.0
+    ttl_bars:         int             = 12
+    initial_capital:  float           = 10000.0
+    points:           Optional[int]   = 2000
+
+class SweepRequest(BaseModel):
+    symbol:          str
+    period:          str             = "2y"
+    strategy:        str             = "rsi"
+    search:          str             = "grid"     # grid | random
+    space:           Optional[dict]  = None       # param → [values] or {"low", "high"}
+    n_iter:          int             = 50
+    initial_capital: float           = 10000.0
+    rank_by:         str             = "sharpe_ratio"
+    top:             int             = 25
+
+class WalkForwardRequest(BaseModel):
+    symbol:          str
+    period:          str             = "5y"
+    strategy:        str             = "ml"
+    mode:            str             = "anchored" # anchored | rolling
+    n_folds:         int             = 5
+    space:           Optional[dict]  = None       # rule-based strategies only
+    initial_capital: float           = 10000.0
+    rank_by:         str             = "sharpe_ratio"
+
+class PortfolioRequest(BaseModel):
+    symbols:         Optional[list[str]] = None
+    universe:        Optional[str]   = None       # small_cap | crypto | watchlist
+    period:          str             = "2y"
+    strategy:        str             = "sma"
+    params:          Optional[dict]  = None
+    allocation:      str             = "active_equal"
+    initial_capital: float           = 100000.0
+    gross:           float           = 0.95
+    max_weight:      float           = 0.25
+    cost_bps:        float           = 5.0
+
+def _parse_params(params: Optional[str]) -> Optional[dict]:
+    if not params:
+        return None
+    try:
+        return json.loads(params)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="params חייב להיות JSON תקין")
+
+def _submit(params: dict):
+    try:
+        return backtest_jobs.submit(params)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+async def _job_result(job) -> dict:
+    """Wait for a pool job → its result, or an error dict (failed or cancelled)."""
+    await asyncio.wait([asyncio.wrap_future(job.future)])   # no raise if cancelled
+    symbol = job.params["symbol"]
+    if job.future.cancelled() or job.status == "cancelled":
+        return {"error": "הבקטסט בוטל", "status": "cancelled", "job_id": job.id, "symbol": symbol}
+    return job.result if job.result is not None else {"error": job.error, "symbol": symbol}
+
+def _get_job(job_id: str):
+    job = backtest_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="עבודה לא נמצאה")
+    return job
 
 @router.post("/run")
 async def run_backtest_endpoint(
@@ -10,15 +130,259 @@ async def run_backtest_endpoint(
     period:          str   = Query("2y",    description="1y 2y 5y"),
     strategy:        str   = Query("ml",    description="ml rsi macd sma"),
     initial_capital: float = Query(10000.0, description="הון התחלתי"),
+    params:          Optional[str] = Query(None, description='JSON, e.g. {"lower": 25, "upper": 75}'),
+    wf_mode:         str   = Query("anchored", description="anchored rolling"),
+    points:          int   = Query(2000, ge=0, description="נקודות בעקומת ההון (0 = מלא)"),
+    curve_method:    str   = Query("lttb", description="lttb minmax"),
+    debug:           bool  = Query(False, description="צרף מדידות זמן לכל שלב"),
+):
+    """
+    Run a full backtest and return performance metrics + equity curve.
+    Runs on the backtest job pool; the request waits for the result.
+    """
+    job = _submit({
+        "symbol":          symbol.upper(),
+        "period":          period,
+        "initial_capital": initial_capital,
+        "strategy":        strategy,
+        "params":          _parse_params(params),
+        "wf_mode":         wf_mode,
+        "points":          points or None,
+        "curve_method":    curve_method,
+        "debug":           debug,
+    })
+    return await _job_result(job)
+
+@router.get("/results/{result_id}/equity")
+async def get_equity_curve(
+    result_id: str,
+    offset:    int = Query(0, ge=0),
+    limit:     int = Query(10_000, ge=1, le=100_000),
+    format:    str = Query("json", description="json npy"),
 ):
-    """Run a full backtest and return performance metrics + equity curve."""
-    result = run_backtest(
-        symbol          = symbol.upper(),
-        period          = period,
-        initial_capital = initial_capital,
-        strategy        = strategy,
-    )
-    return result
+    """
+    Full-resolution equity curve of a cached backtest (`result_id` from /run).
+    json → one page of values; npy → the whole float64 array as a .npy file.
+    """
+    if not re.fullmatch(r"[0-9a-f]{32}", result_id):
+        raise HTTPException(status_code=400, detail="result_id לא תקין")
+    equity = backtest_cache.equity(result_id)
+    if equity is None:
+        raise HTTPException(status_code=404, detail="התוצאה לא נמצאה (ייתכן שפג תוקפה) — הרץ את הבקטסט מחדש")
+    if format == "npy":
+        buf = io.BytesIO()
+        np.save(buf, equity.astype(np.float64), allow_pickle=False)
+        return Response(content=buf.getvalue(), media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{result_id}.npy"'})
+    page = equity[offset:offset + limit]
+    return {
+        "result_id": result_id,
+        "total":     len(equity),
+        "offset":    offset,
+        "limit":     limit,
+        "next":      offset + limit if offset + limit < len(equity) else None,
+        "values":    [round(v, 2) for v in page.tolist()],
+    }
+
+def _monte_carlo_job(req: MonteCarloRequest, result_id: str) -> dict:
+    run = load_result(result_id) if re.fullmatch(r"[0-9a-f]{32}", result_id) else None
+    if run is None:
+        raise LookupError("התוצאה לא נמצאה (ייתכן שפג תוקפה) — הרץ את הבקטסט מחדש")
+    res = run["result"]
+    mc  = run_monte_carlo(run["equity"], run["trades"], n_sims=req.n_sims,
+                          methods=tuple(req.methods), block=req.block, seed=req.seed,
+                          observed={k: res[k] for k in ("total_return_pct", "max_drawdown_pct", "sharpe_ratio")})
+    return {"result_id": result_id, "symbol": res.get("symbol"), "strategy": res.get("strategy"), **mc}
+
+@router.post("/monte-carlo")
+async def run_monte_carlo_endpoint(req: MonteCarloRequest):
+    """
+    Monte Carlo robustness of a backtest: trade-return resampling and
+    block bootstrap of daily returns → percentile bands for return,
+    max drawdown and Sharpe, plus where the actual result ranks.
+    Without a result_id the backtest runs on the backtest job pool first.
+    """
+    result_id = req.result_id
+    if result_id is None:
+        if not req.symbol:
+            raise HTTPException(status_code=400, detail="יש לציין result_id או symbol")
+        bt = await _job_result(_submit({
+            "symbol": req.symbol.upper(), "period": req.period, "strategy": req.strategy,
+            "params": req.params, "initial_capital": req.initial_capital,
+            "wf_mode": req.wf_mode, "points": 1,
+        }))
+        if "error" in bt:
+            raise HTTPException(status_code=400, detail=bt["error"])
+        result_id = bt["result_id"]
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, _monte_carlo_job, req, result_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ── Backtest jobs ────────────────────────────────────────────────────────────
+@router.post("/jobs", status_code=202)
+async def submit_backtest_job(req: BacktestJobRequest):
+    """Queue a backtest; returns a job id immediately (429 when the queue is full)."""
+    params = req.model_dump()
+    params["symbol"] = req.symbol.upper()
+    job = _submit(params)
+    return {"job_id": job.id, "status": job.status, "position": backtest_jobs.position(job)}
+
+@router.get("/jobs")
+async def list_backtest_jobs():
+    return {"jobs": backtest_jobs.list(), **backtest_jobs.stats()}
+
+@router.get("/jobs/{job_id}")
+async def get_backtest_job(job_id: str):
+    job = _get_job(job_id)
+    return {**job.snapshot(), "position": backtest_jobs.position(job)}
+
+@router.delete("/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str):
+    """
+    Cancel a queued job, or stop a running one at its next checkpoint
+    (between backtest stages and after every walk-forward fold).
+    """
+    job = backtest_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="עבודה לא נמצאה")
+    return job.snapshot(with_result=False)
+
+@router.get("/jobs/{job_id}/events")
+async def stream_backtest_job(job_id: str, request: Request):
+    """
+    Server-Sent Events: `status`, one `fold` per finished walk-forward fold,
+    and `result` on success. Reconnects resume from Last-Event-ID.
+    """
+    job = _get_job(job_id)
+    try:
+        start = int(request.headers.get("last-event-id", -1)) + 1
+    except ValueError:
+        start = 0
+
+    async def events():
+        n = start
+        while True:
+            for i, (event, data) in job.events_since(n):
+                yield f"id: {i}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+                n = i + 1
+            if job.finished and n >= len(job.events):
+                return
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(0.25)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _walk_forward_job(req: WalkForwardRequest) -> dict:
+    df = feature_engineer.get_feature_matrix(req.symbol.upper(), period=req.period)
+    if df.empty or len(df) < 60:
+        raise ValueError(f"לא מספיק נתונים עבור {req.symbol.upper()}")
+    wf = run_walk_forward(df, req.strategy, mode=req.mode, n_folds=req.n_folds,
+                          initial_capital=req.initial_capital, space=req.space,
+                          rank_by=req.rank_by)
+    return {"symbol": req.symbol.upper(), "strategy": req.strategy,
+            "period": req.period, **wf}
+
+@router.post("/walk-forward")
+async def run_walk_forward_endpoint(req: WalkForwardRequest):
+    """
+    Anchored / rolling walk-forward: each fold is fit (parameter search or ML
+    retraining) on its train window and traded on the next unseen window.
+    Returns per-fold results and the stitched out-of-sample equity curve.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, _walk_forward_job, req)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/portfolio")
+async def run_portfolio_endpoint(req: PortfolioRequest, db: Session = Depends(get_db)):
+    """
+    Portfolio backtest over many symbols with shared capital.
+    Pass `symbols` or a `universe` (small_cap, crypto, watchlist).
+    """
+    symbols = list(req.symbols or [])
+    if req.universe == "small_cap":
+        symbols += SMALL_CAP_UNIVERSE
+    elif req.universe == "crypto":
+        symbols += CRYPTO_UNIVERSE
+    elif req.universe == "watchlist":
+        symbols += [i.symbol for i in db.query(WatchlistItem).all()]
+    elif req.universe:
+        raise HTTPException(status_code=400, detail=f"יקום לא מוכר: {req.universe}")
+    if not symbols:
+        raise HTTPException(status_code=400, detail="יש לציין symbols או universe")
+    if req.allocation not in ALLOCATIONS:
+        raise HTTPException(status_code=400, detail=f"allocation חייב להיות אחד מ-{list(ALLOCATIONS)}")
+
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, lambda: run_portfolio_backtest(
+            symbols         = symbols,
+            period          = req.period,
+            strategy        = req.strategy,
+            params          = req.params,
+            allocation      = req.allocation,
+            initial_capital = req.initial_capital,
+            gross           = req.gross,
+            max_weight      = req.max_weight,
+            cost_bps        = req.cost_bps,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/intraday")
+async def run_intraday_endpoint(req: IntradayRequest):
+    """
+    Intraday backtest with LIMIT entries and SL/TP exits matched against bar
+    high/low — the same order-matching rules as paper trading.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, lambda: run_intraday_backtest(
+            symbol           = req.symbol.upper(),
+            interval         = req.interval,
+            period           = req.period,
+            strategy         = req.strategy,
+            params           = req.params,
+            order_type       = req.order_type,
+            limit_offset_pct = req.limit_offset_pct,
+            stop_loss_pct    = req.stop_loss_pct,
+            take_profit_pct  = req.take_profit_pct,
+            ttl_bars         = req.ttl_bars,
+            initial_capital  = req.initial_capital,
+            points           = req.points,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/sweep")
+async def run_sweep_endpoint(req: SweepRequest):
+    """
+    Parameter sweep (grid or random search) for rsi / macd / sma.
+    Returns a table ranked by `rank_by` with per-fold robustness metrics.
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, lambda: run_sweep(
+            symbol          = req.symbol.upper(),
+            period          = req.period,
+            strategy        = req.strategy,
+            space           = req.space,
+            search          = req.search,
+            n_iter          = req.n_iter,
+            initial_capital = req.initial_capital,
+            rank_by         = req.rank_by,
+            top             = req.top,
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/strategies")
 async def list_strategies():
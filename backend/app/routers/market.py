@@ -4,10 +4,11 @@ from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import yfinance as yf
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from sqlalchemy.orm import Session
 from ..database import get_db, WatchlistItem
 from ..services.yfinance_service import yf_service
+from ..services.http_cache import etag_for, respond
 
 router = APIRouter()
 
@@ -15,28 +16,35 @@ router = APIRouter()
 
 @router.get("/ohlcv/{symbol}")
 async def get_ohlcv(
-    symbol: str,
+    request:  Request,
+    symbol:   str,
     period:   str = Query("3mo", description="1d 5d 1mo 3mo 6mo 1y 2y 5y"),
     interval: str = Query("1d",  description="1m 5m 15m 30m 1h 1d 1wk 1mo"),
 ):
     """
     Returns candlestick data formatted for TradingView Lightweight Charts.
-    Powered exclusively by yfinance.
+    Powered exclusively by yfinance. ETag = first/last bar + bar count
+    (the last bar still moves intraday), so unchanged polls get a 304.
     """
     result = yf_service.get_ohlcv(symbol.upper(), period, interval)
-    if not result["data"]:
+    data   = result["data"]
+    if not data:
         raise HTTPException(status_code=404, detail=f"לא נמצאו נתונים עבור {symbol}")
-    return result
+    etag = etag_for("ohlcv", result["symbol"], period, interval, len(data),
+                    data[0]["time"], tuple(data[-1].values()))
+    return await respond(request, "market.ohlcv", etag, lambda: result, max_age=15)
 
 # ── Real-time-like Quote ──────────────────────────────────────────────────────
 
 @router.get("/quote/{symbol}")
-async def get_quote(symbol: str):
+async def get_quote(request: Request, symbol: str):
     """
     Returns the latest price and key market stats for a symbol.
     """
     try:
-        return yf_service.get_quote(symbol.upper())
+        quote = yf_service.get_quote(symbol.upper())
+        return await respond(request, "market.quote", etag_for("quote", *quote.items()),
+                             lambda: quote, max_age=5)
     except Exception as e:
         # Return partial data instead of crashing (e.g. rate limit from yfinance)
         return {"symbol": symbol.upper(), "error": str(e)}
@@ -0,0 +1,42 @@
+# backend/app/routers/metrics.py
+from fastapi import APIRouter, Query
+from ..services.metrics import metrics
+from ..services.signal_store import cache_stats
+from ..services.http_cache import conditional_stats
+from ..services.news_store import news_store
+from ..services.finnhub_client import finnhub_client
+from ..tasks.news_ingester import news_ingester
+
+router = APIRouter()
+
+@router.get("/latency")
+async def latency(prefix: str | None = Query(None, description="signal. backtest. screener. yf. finnhub.")):
+    """Rolling latency percentiles, histogram and cache-hit rate per span."""
+    return metrics.summary(prefix)
+
+@router.delete("/latency")
+async def reset_latency():
+    metrics.reset()
+    cache_stats.reset()
+    conditional_stats.reset()
+    return {"message": "המדדים אופסו"}
+
+@router.get("/signal-cache")
+async def signal_cache():
+    """CachedSignal hits (full document vs. legacy summary), misses and recomputes avoided."""
+    return cache_stats.as_dict()
+
+@router.get("/http-cache")
+async def http_cache():
+    """Conditional GETs per endpoint: responses sent vs. answered 304 Not Modified."""
+    return conditional_stats.as_dict()
+
+@router.get("/news-store")
+async def news_store_stats():
+    """Finnhub polls made vs. skipped, new articles scored, stored scores redone, ingester cycles."""
+    return {**news_store.stats(), "ingester": news_ingester.status()}
+
+@router.get("/finnhub")
+async def finnhub_stats():
+    """Shared Finnhub client: bucket tokens, queued callers per lane, dedups, retries, 429s."""
+    return finnhub_client.stats()
@@ -1,65 +1,85 @@
 # backend/app/routers/news.py
-from fastapi import APIRouter, HTTPException, Query
-from datetime import date, timedelta
-import finnhub
-from ..config import get_settings
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from ..services.news_store import news_store, MARKET_CATEGORIES
+from ..services.http_cache import etag_for, respond
+from ..services.metrics import in_context
 
-router   = APIRouter()
-settings = get_settings()
+router = APIRouter()
 
-# Finnhub client (synchronous SDK — fast enough for our needs)
-fh_client = finnhub.Client(api_key=settings.finnhub_api_key)
+# News is served from the local store (services/news_store), kept fresh by
+# the background ingester — a page load doesn't wait on Finnhub unless the
+# feed has never been fetched. Responses carry an ETag of the feed window's
+# version, so an unchanged poll is a 304 without reading the articles.
 
-def _safe_news(items: list) -> list:
-    """Clean and normalize Finnhub news items."""
-    clean = []
-    for item in items:
-        clean.append({
-            "id":       item.get("id"),
-            "headline": item.get("headline", ""),
-            "summary":  item.get("summary",  ""),
-            "source":   item.get("source",   ""),
-            "url":      item.get("url",       ""),
-            "image":    item.get("image",     ""),
-            "datetime": item.get("datetime",  0),   # unix timestamp
-            "category": item.get("category",  ""),
-        })
-    # Sort newest first
-    return sorted(clean, key=lambda x: x["datetime"], reverse=True)
+NEWS_MAX_AGE = 30
+
+
+def _open(open_feed, days: int) -> tuple:
+    feed = open_feed()
+    return feed, news_store.feed_version(feed, days)
+
+
+async def _feed_response(request: Request, name: str, open_feed, days: int, limit: int, head: dict):
+    loop = asyncio.get_event_loop()
+    feed, version = await loop.run_in_executor(None, in_context(_open), open_feed, days)
+    count, newest = version[0], version[1]
+
+    async def build():   # only when the client's copy is out of date
+        count, news = await loop.run_in_executor(None, in_context(news_store.feed_articles), feed, days, limit)
+        return {**head, "count": count, "news": news}
+
+    return await respond(request, name, etag_for("news", feed, days, limit, version), build,
+                         max_age=NEWS_MAX_AGE,
+                         last_modified=datetime.utcfromtimestamp(newest) if count and newest else None)
+
+@router.get("/search")
+async def search_news(
+    q:      str = Query(..., min_length=2, description="Words to search in headlines and summaries"),
+    symbol: str | None = Query(None, description="Only articles from this symbol's feed"),
+    days:   int | None = Query(None, ge=1, le=365),
+    limit:  int = Query(20, ge=1, le=100),
+):
+    """Full-text search over stored news, best match first."""
+    if not q.split():
+        raise HTTPException(status_code=400, detail="שאילתת חיפוש ריקה")
+    loop = asyncio.get_event_loop()
+    try:
+        results = await loop.run_in_executor(None, in_context(news_store.search), q, symbol, days, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"שגיאה בחיפוש חדשות: {str(e)}")
+    return {"query": q, "count": len(results), "results": results}
 
 @router.get("/{symbol}")
 async def get_company_news(
-    symbol: str,
-    days:   int = Query(7, ge=1, le=30, description="How many days back to fetch"),
+    request: Request,
+    symbol:  str,
+    days:    int = Query(7, ge=1, le=30, description="How many days back to fetch"),
 ):
     """
-    Fetch company-specific news from Finnhub for a given symbol.
+    Company-specific news for a given symbol, newest first.
     """
     try:
-        today    = date.today().strftime("%Y-%m-%d")
-        from_dt  = (date.today() - timedelta(days=days)).strftime("%Y-%m-%d")
-        news     = fh_client.company_news(symbol.upper(), _from=from_dt, to=today)
-        return {
-            "symbol": symbol.upper(),
-            "count":  len(news),
-            "news":   _safe_news(news)[:25],  # cap at 25 articles
-        }
+        return await _feed_response(request, "news.company",
+                                    lambda: news_store.open_company_feed(symbol, days), days,
+                                    25, {"symbol": symbol.upper()})   # cap at 25 articles
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"שגיאה בטעינת חדשות: {str(e)}")
 
 @router.get("/market/general")
 async def get_general_news(
+    request:  Request,
     category: str = Query("general", description="general forex crypto merger"),
 ):
     """
-    Fetch general market news (not symbol-specific).
+    General market news (not symbol-specific).
     """
+    if category not in MARKET_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"קטגוריה חייבת להיות אחת מ-{MARKET_CATEGORIES}")
     try:
-        news = fh_client.general_news(category, min_id=0)
-        return {
-            "category": category,
-            "count":    len(news),
-            "news":     _safe_news(news)[:20],
-        }
+        return await _feed_response(request, "news.market",
+                                    lambda: news_store.open_market_feed(category), 7,
+                                    20, {"category": category})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"שגיאה בטעינת חדשות: {str(e)}")
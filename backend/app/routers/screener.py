@@ -1,10 +1,15 @@
 # backend/app/routers/screener.py
-from fastapi import APIRouter, Query
-from ..engine.signal_fusion import generate_signal
-import yfinance as yf
+from fastapi import APIRouter, HTTPException, Query
+from ..engine.signal_fusion import generate_signal, parse_fields
+from ..engine.sentiment import sentiment_engine
+from ..engine.screener_scan import scan
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from ..services.metrics import metrics, span, in_context
 
 router = APIRouter()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="screener")
 
 # ── Predefined small-cap / penny stock watchlist ──────────────────────────────
 SMALL_CAP_UNIVERSE = [
@@ -23,79 +28,52 @@ CRYPTO_UNIVERSE = [
     "XRP-USD",  "AVAX-USD","LINK-USD","DOT-USD", "MATIC-USD",
 ]
 
-def _quick_screener_score(symbol: str) -> dict | None:
-    """Fast screening using only technical features (no ML/sentiment for speed)."""
-    try:
-        ticker = yf.Ticker(symbol)
-        df     = ticker.history(period="1mo", interval="1d")
-        if df.empty or len(df) < 10:
-            return None
-
-        close   = df['Close']
-        volume  = df['Volume']
-        returns = close.pct_change()
-
-        rsi_val = _calc_rsi(close, 14)
-        vol_ratio = float(volume.iloc[-1] / volume.mean()) if volume.mean() > 0 else 1
-        mom_5d    = float((close.iloc[-1] / close.iloc[-5] - 1) * 100) if len(close) >= 5 else 0
-        mom_20d   = float((close.iloc[-1] / close.iloc[-20] - 1) * 100) if len(close) >= 20 else 0
-
-        current_price = float(close.iloc[-1])
-        sma_20        = float(close.rolling(20).mean().iloc[-1])
-        near_breakout = current_price > sma_20 * 0.99
-
-        # Breakout score
-        score = 0
-        if rsi_val < 40:      score += 2
-        if rsi_val > 60:      score += 1
-        if vol_ratio > 1.5:   score += 2
-        if mom_5d  > 5:       score += 2
-        if mom_20d > 10:      score += 1
-        if near_breakout:     score += 2
-
-        if score < 4:
-            return None
-
+UNIVERSES = {
+    "small-cap": SMALL_CAP_UNIVERSE,
+    "crypto":    CRYPTO_UNIVERSE,
+}
+
+# deep_scan reads only these — skips sources / features / nested dicts
+DEEP_SCAN_FIELDS = parse_fields(["decision", "confidence", "reasoning_he", "stop_loss", "take_profit"])
+
+class _ScanClock:
+    """
+    Wall time of a screener request vs. time its handler held the event loop
+    (everything not spent awaiting the pool) — reported with each scan.
+    """
+
+    def __init__(self):
+        self.start   = time.perf_counter()
+        self.awaited = 0.0
+
+    async def off_loop(self, *calls) -> list:
+        """Run (fn, *args) calls concurrently on the screener pool."""
+        loop = asyncio.get_event_loop()
+        t0   = time.perf_counter()
+        try:
+            return await asyncio.gather(
+                *(loop.run_in_executor(_executor, in_context(fn), *args) for fn, *args in calls),
+                return_exceptions=True)
+        finally:
+            self.awaited += time.perf_counter() - t0
+
+    def report(self, scan_result: dict) -> dict:
+        total   = (time.perf_counter() - self.start) * 1000
+        blocked = max(total - self.awaited * 1000, 0.0)
+        metrics.record("screener.loop_blocked", blocked)
         return {
-            "symbol":        symbol,
-            "price":         round(current_price, 4),
-            "rsi":           round(rsi_val, 1),
-            "volume_ratio":  round(vol_ratio, 2),
-            "momentum_5d":   round(mom_5d, 2),
-            "momentum_20d":  round(mom_20d, 2),
-            "score":         score,
-            "alert_he":      _generate_alert(symbol, score, rsi_val, vol_ratio, mom_5d, mom_20d),
+            "scan_ms":         round(total, 1),
+            "download_ms":     scan_result["download_ms"],
+            "score_ms":        scan_result["score_ms"],
+            "loop_blocked_ms": round(blocked, 1),
         }
-    except:
-        return None
-
-
-def _calc_rsi(series, period=14):
-    delta = series.diff()
-    gain  = delta.where(delta > 0, 0).rolling(period).mean()
-    loss  = (-delta.where(delta < 0, 0)).rolling(period).mean()
-    rs    = gain / (loss + 1e-9)
-    return float(100 - (100 / (1 + rs.iloc[-1])))
-
 
-def _generate_alert(symbol, score, rsi, vol_ratio, mom_5d, mom_20d) -> str:
-    """Generate a Hebrew alert string."""
-    parts = []
-    if rsi < 35:
-        parts.append(f"RSI ({rsi:.0f}) מצביע על מכירת יתר — הזדמנות קנייה")
-    if vol_ratio > 2:
-        parts.append(f"נפח מסחר גבוה פי {vol_ratio:.1f} מהממוצע — סימן לפריצה")
-    if mom_5d > 8:
-        parts.append(f"מומנטום של +{mom_5d:.1f}% ב-5 ימים אחרונים")
-    if mom_20d > 15:
-        parts.append(f"עלייה של +{mom_20d:.1f}% בחודש — טרנד חזק")
 
-    confidence_txt = "גבוהה מאוד" if score >= 7 else "גבוהה" if score >= 5 else "בינונית"
-
-    return (
-        f"⚡ לפי האלגוריתם, {symbol} מציג הזדמנות מסחר ברמת ביטחון {confidence_txt}. "
-        + " | ".join(parts) + "."
-    )
+async def _scan(clock: _ScanClock, symbols: list) -> dict:
+    (result,) = await clock.off_loop((scan, symbols))
+    if isinstance(result, Exception):
+        raise HTTPException(500, f"שגיאה בסריקה: {result}")
+    return result
 
 
 @router.get("/small-cap")
@@ -104,46 +82,40 @@ async def screen_small_caps(
     deep_scan:  bool = Query(False, description="הרץ ניתוח ML מלא על המועמדים הטובים"),
 ):
     """Screen small-cap universe for breakout opportunities."""
-    results = []
-    for sym in SMALL_CAP_UNIVERSE:
-        r = _quick_screener_score(sym)
-        if r:
-            results.append(r)
-
-    results.sort(key=lambda x: x['score'], reverse=True)
-    results = results[:limit]
+    clock = _ScanClock()
+    with span("screener.small_cap"):
+        found = await _scan(clock, SMALL_CAP_UNIVERSE)
+    results = found["results"][:limit]
 
     if deep_scan and results:
         top3 = results[:3]
-        for item in top3:
-            try:
-                full = generate_signal(item['symbol'])
-                item['full_signal']   = full.get('decision', 'החזק')
-                item['confidence']    = full.get('confidence', 0)
-                item['reasoning_he']  = full.get('reasoning_he', '')
-                item['stop_loss']     = full.get('stop_loss')
-                item['take_profit']   = full.get('take_profit')
-                item['alert_he']      = full.get('reasoning_he', item['alert_he'])
-            except:
-                pass
+        fulls = await clock.off_loop(*((generate_signal, item['symbol'], DEEP_SCAN_FIELDS) for item in top3))
+        for item, full in zip(top3, fulls):
+            if isinstance(full, Exception):
+                continue
+            item['full_signal']   = full.get('decision', 'החזק')
+            item['confidence']    = full.get('confidence', 0)
+            item['reasoning_he']  = full.get('reasoning_he', '')
+            item['stop_loss']     = full.get('stop_loss')
+            item['take_profit']   = full.get('take_profit')
+            item['alert_he']      = full.get('reasoning_he', item['alert_he'])
 
     return {
         "count":   len(results),
         "results": results,
         "universe_size": len(SMALL_CAP_UNIVERSE),
+        "timing":  clock.report(found),
     }
 
 
 @router.get("/crypto")
 async def screen_crypto(limit: int = Query(8, ge=1, le=20)):
     """Screen crypto universe."""
-    results = []
-    for sym in CRYPTO_UNIVERSE:
-        r = _quick_screener_score(sym)
-        if r:
-            results.append(r)
-    results.sort(key=lambda x: x['score'], reverse=True)
-    return {"count": len(results), "results": results[:limit]}
+    clock = _ScanClock()
+    with span("screener.crypto"):
+        found = await _scan(clock, CRYPTO_UNIVERSE)
+    results = found["results"]
+    return {"count": len(results), "results": results[:limit], "timing": clock.report(found)}
 
 
 @router.get("/custom")
@@ -152,18 +124,44 @@ async def screen_custom(
     deep:    bool = Query(False),
 ):
     """Screen a custom list of symbols."""
-    sym_list = [s.strip().upper() for s in symbols.split(",") if s.strip()][:20]
-    results  = []
+    sym_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))[:20]
+    clock = _ScanClock()
+    with span("screener.custom"):
+        found = await _scan(clock, sym_list)
+    scored  = {r["symbol"]: r for r in found["results"]}
+    results = []
     for sym in sym_list:
-        r = _quick_screener_score(sym)
+        r = scored.get(sym)
         if r is None:
-            try:
-                import yfinance as yf
-                t = yf.Ticker(sym)
-                p = t.fast_info.last_price
-                r = {"symbol": sym, "price": p, "score": 0, "alert_he": "אין אות ברור"}
-            except:
+            if sym not in found["prices"]:
                 continue
+            r = {"symbol": sym, "price": found["prices"][sym], "score": 0, "alert_he": "אין אות ברור"}
         results.append(r)
     results.sort(key=lambda x: x.get('score', 0), reverse=True)
-    return {"count": len(results), "results": results}
+    return {"count": len(results), "results": results, "timing": clock.report(found)}
+
+
+@router.get("/sentiment")
+async def sentiment_leaderboard(
+    universe: str = Query("all", description="small-cap | crypto | all"),
+    days:     int = Query(7, ge=1, le=30),
+    sort_by:  str = Query("aggregate_score"),
+    limit:    int = Query(50, ge=1, le=200),
+):
+    """Screener universes ranked by news sentiment, aggregated in one batch pass."""
+    if universe == "all":
+        symbols = [s for u in UNIVERSES.values() for s in u]
+    elif universe in UNIVERSES:
+        symbols = UNIVERSES[universe]
+    else:
+        raise HTTPException(400, f"universe חייב להיות אחד מ-{('all', *UNIVERSES)}")
+    loop = asyncio.get_event_loop()
+    with span("screener.sentiment"):
+        try:
+            board = await loop.run_in_executor(None, in_context(sentiment_engine.leaderboard),
+                                               symbols, days, sort_by)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+    board["leaderboard"] = board["leaderboard"][:limit]
+    board["universe"]    = universe
+    return board
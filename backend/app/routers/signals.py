@@ -1,61 +1,147 @@
 # backend/app/routers/signals.py
-from fastapi import APIRouter, BackgroundTasks
-from ..engine.signal_fusion  import generate_signal
-from ..database import get_db, CachedSignal
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from ..engine.signal_fusion  import generate_signal, parse_fields, project
+from ..engine.batch_signals  import generate_signals_batch, normalize_symbols, leaderboard
+from ..database import get_db, SessionLocal
+from ..services.signal_store import (get_cached, cached_response, cached_etag, signal_etag,
+                                     store_signal, cache_stats)
+from ..services.http_cache import respond
+from ..tasks.signal_scheduler import signal_scheduler
+from ..services.metrics import trace, in_context
 from sqlalchemy.orm import Session
 from fastapi import Depends
 import json
+import time
 import asyncio
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
 
 router = APIRouter()
 _executor = ThreadPoolExecutor(max_workers=3)
 
-def _get_cached(symbol: str, db: Session) -> CachedSignal | None:
-    """Return cached signal if less than 15 minutes old."""
-    cached = db.query(CachedSignal).filter_by(symbol=symbol.upper()).first()
-    if cached:
-        age = datetime.utcnow() - cached.generated_at
-        if age < timedelta(minutes=15):
-            return cached
-    return None
+def _json_default(o):
+    return o.item() if hasattr(o, "item") else str(o)
+
+class BatchSignalRequest(BaseModel):
+    symbols:       list[str]
+    force_refresh: bool = False
+    fields:        list[str] | None = None
+
+@router.post("/batch")
+def signals_batch(req: BatchSignalRequest):
+    """
+    Signals for up to MAX_BATCH symbols, streamed as NDJSON — one line per
+    symbol as soon as it is ready (cached ones first), then a summary line.
+    Prices are downloaded once for the batch; fundamentals/news share one
+    bounded pool; TA, fundamental scoring and fusion run vectorized.
+    """
+    try:
+        syms   = normalize_symbols(req.symbols)
+        fields = parse_fields(req.fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    def lines():
+        start, counts = time.monotonic(), {"cached": 0, "fresh": 0, "errors": 0, "degraded": 0}
+        db = SessionLocal()
+        try:
+            todo = []
+            for sym in syms:
+                signal_scheduler.record_request(sym)
+                cached = None if req.force_refresh else get_cached(sym, db)
+                if cached:
+                    counts["cached"] += 1
+                    yield json.dumps(project(cached_response(cached), fields), ensure_ascii=False) + "\n"
+                else:
+                    todo.append(sym)
+            if todo:
+                # misses are built whole and cached, then projected — later projections hit the cache
+                for signal in generate_signals_batch(todo):
+                    if signal.get("error"):
+                        counts["errors"] += 1
+                    else:
+                        counts["fresh"] += 1
+                        counts["degraded"] += bool(signal.get("degraded_stages"))
+                    store_signal(db, signal["symbol"], signal)
+                    yield json.dumps(project(signal, fields), ensure_ascii=False, default=_json_default) + "\n"
+        finally:
+            db.close()
+        yield json.dumps({"summary": {"requested": len(syms), **counts,
+                                      "elapsed_ms": round((time.monotonic() - start) * 1000)}}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def _leaderboard_job(symbols: str | None, sort_by: str) -> dict:
+    if symbols:
+        return leaderboard(symbols.split(","), sort_by)
+    db = SessionLocal()
+    try:
+        syms = signal_scheduler.targets(db)
+    finally:
+        db.close()
+    return leaderboard(syms, sort_by)
+
+@router.get("/leaderboard")
+async def signals_leaderboard(
+    symbols: str | None = Query(None, description="Comma-separated; default = watchlist + open positions"),
+    sort_by: str = "fused_score",
+):
+    """Universe ranked by the fusion model, scored as one cross-sectional matrix."""
+    loop = asyncio.get_event_loop()
+    try:
+        return await loop.run_in_executor(_executor, in_context(_leaderboard_job), symbols, sort_by)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+@router.get("/scheduler/status")
+async def scheduler_status():
+    """Background precompute queue: due time, request rate and pause state per symbol."""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(_executor, signal_scheduler.status)
 
 @router.get("/{symbol}")
 async def get_signal(
+    request: Request,
     symbol: str,
     force_refresh: bool = False,
+    debug: bool = False,
+    fields: str | None = Query(None, description="CSV, e.g. decision,confidence — reasoning/sources/features are built only when listed"),
     db: Session = Depends(get_db)
 ):
     """
     Get full Alpha Engine signal for a symbol.
     Cached for 15 minutes. Use force_refresh=true to bypass.
+    debug=true attaches per-stage timing spans under `timings`.
+    Stored signals carry a weak ETag of their generated_at, so a client
+    polling with If-None-Match gets a 304 until the signal is regenerated.
     """
     sym = symbol.upper()
+    try:
+        wanted = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    signal_scheduler.record_request(sym)
 
     if not force_refresh:
-        cached = _get_cached(sym, db)
+        cached = get_cached(sym, db)
         if cached:
-            return {
-                "symbol":       sym,
-                "decision":     cached.decision,
-                "confidence":   cached.confidence,
-                "entry_price":  cached.entry_price,
-                "stop_loss":    cached.stop_loss,
-                "take_profit":  cached.take_profit,
-                "reasoning_he": cached.reasoning_he,
-                "sources":      [],
-                "cached":       True,
-                "generated_at": cached.generated_at.isoformat(),
-            }
+            response = await respond(request, "signals.symbol", cached_etag(cached, wanted),
+                                     lambda: project(cached_response(cached), wanted),
+                                     max_age=0, last_modified=cached.generated_at)
+            if response.status_code == 304:
+                cache_stats.count("not_modified")
+            return response
 
     # Generate fresh signal in thread pool (blocking I/O — don't block event loop)
     loop = asyncio.get_event_loop()
     try:
-        signal = await asyncio.wait_for(
-            loop.run_in_executor(_executor, generate_signal, sym),
-            timeout=45.0
-        )
+        with trace() as timings:
+            signal = await asyncio.wait_for(
+                loop.run_in_executor(_executor, in_context(generate_signal), sym),
+                timeout=45.0
+            )
     except asyncio.TimeoutError:
         return {
             "symbol":       sym,
@@ -67,38 +153,35 @@ async def get_signal(
             "reasoning_he": "חישוב האות ארך יותר מדי זמן. נסה שוב.",
         }
 
-    # Cache in DB only on success (don't cache errors)
-    if not signal.get("error"):
-        try:
-            existing = db.query(CachedSignal).filter_by(symbol=sym).first()
-            payload  = {
-                "decision":     signal.get("decision", "החזק"),
-                "confidence":   signal.get("confidence", 0.5),
-                "entry_price":  signal.get("entry_price"),
-                "stop_loss":    signal.get("stop_loss"),
-                "take_profit":  signal.get("take_profit"),
-                "reasoning_he": signal.get("reasoning_he", ""),
-                "generated_at": datetime.utcnow(),
-            }
-            if existing:
-                for k, v in payload.items():
-                    setattr(existing, k, v)
-            else:
-                db.add(CachedSignal(symbol=sym, **payload))
-            db.commit()
-        except:
-            pass
+    # the full document is cached whatever `fields` asked for, then projected
+    generated_at = datetime.utcnow()
+    stored = store_signal(db, sym, signal, generated_at)
+    if stored:   # same metadata as the cached copies (cached_response)
+        signal = {**signal, "cached": False, "generated_at": generated_at.isoformat()}
+    signal = project(signal, wanted)
 
+    if debug:
+        return {**signal, "timings": timings}
+    if stored:
+        return await respond(request, "signals.symbol", signal_etag(sym, generated_at, True, wanted),
+                             lambda: signal, max_age=0, last_modified=generated_at)
     return signal
 
+def _train_job(symbol: str, search: bool) -> dict:
+    from ..engine.feature_engineering import feature_engineer
+    from ..engine.ml_ensemble         import train_symbol
+    df = feature_engineer.get_feature_matrix(symbol, period="2y")
+    return train_symbol(symbol, df, search=search)
+
 @router.post("/train/{symbol}")
-async def train_model(symbol: str):
-    """Manually trigger ML model training for a symbol."""
+async def train_model(symbol: str, search: bool = True):
+    """
+    Manually trigger ML model training for a symbol.
+    Runs purged time-series CV (+ hyperparameter search) and returns per-fold metrics.
+    """
     try:
-        from ..engine.feature_engineering import feature_engineer
-        from ..engine.ml_ensemble         import ml_ensemble
-        df      = feature_engineer.get_feature_matrix(symbol.upper(), period="2y")
-        metrics = ml_ensemble.train(df)
+        loop    = asyncio.get_event_loop()
+        metrics = await loop.run_in_executor(_executor, _train_job, symbol.upper(), search)
         return {"message": f"מודל אומן בהצלחה עבור {symbol}", "metrics": metrics}
     except Exception as e:
         return {"error": str(e)}
@@ -0,0 +1,137 @@
+# backend/app/services/backtest_cache.py
+"""
+Content-addressed on-disk cache for backtest results.
+
+Key = sha256 of the inputs (symbol, period, strategy + params, capital,
+walk-forward mode, engine/feature-set versions) plus the price fingerprint
+(bar count + last bar timestamp). Each entry is one compressed .npz holding
+the full-resolution equity curve and a JSON blob (result, trades, end state).
+A per-lineage pointer (same inputs, any fingerprint) lets a newer bar set
+extend the latest entry instead of recomputing it.
+Oldest-accessed entries are evicted once the directory exceeds its size cap,
+together with the lineage pointers that named them.
+"""
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+from ..config import get_settings
+
+settings  = get_settings()
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'backtest_cache')
+
+
+def _digest(obj) -> str:
+    blob = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+class BacktestCache:
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int | None = None):
+        self.dir       = os.path.abspath(directory)
+        self.max_bytes = max_bytes or settings.backtest_cache_mb * 1024 * 1024
+        self._lock     = threading.Lock()
+        os.makedirs(self.dir, exist_ok=True)
+
+    # ── Keys ─────────────────────────────────────────────────────────────────
+    def lineage_key(self, inputs: dict) -> str:
+        return _digest(inputs)
+
+    def key(self, inputs: dict, fingerprint: dict) -> str:
+        return _digest({"inputs": inputs, "fingerprint": fingerprint})
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.npz")
+
+    def _pointer(self, lineage: str) -> str:
+        return os.path.join(self.dir, f"lineage-{lineage}.txt")
+
+    # ── Read / write ─────────────────────────────────────────────────────────
+    def get(self, key: str) -> dict | None:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                record = json.loads(str(z["meta"]))
+                record["equity"] = z["equity"]
+            os.utime(path)   # LRU by access time
+            return record
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def equity(self, key: str) -> np.ndarray | None:
+        """Full-resolution equity curve only (skips the JSON record)."""
+        try:
+            with np.load(self._path(key), allow_pickle=False) as z:
+                return z["equity"]
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            return None
+
+    def latest(self, lineage: str) -> dict | None:
+        """Most recent entry for these inputs, whatever its price fingerprint."""
+        try:
+            with open(self._pointer(lineage)) as f:
+                return self.get(f.read().strip())
+        except OSError:
+            return None
+
+    def put(self, key: str, lineage: str, record: dict, equity: np.ndarray):
+        meta = json.dumps(record, separators=(",", ":"), default=str)
+        tmp  = self._path(key) + ".tmp"
+        with self._lock:
+            with open(tmp, "wb") as f:
+                np.savez_compressed(f, equity=np.asarray(equity, dtype=np.float64),
+                                    meta=np.array(meta))
+            os.replace(tmp, self._path(key))
+            with open(self._pointer(lineage), "w") as f:
+                f.write(key)
+            self._evict()
+
+    def _evict(self):
+        entries, total = [], 0
+        for name in os.listdir(self.dir):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        evicted = set()
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted.add(os.path.basename(path)[:-len(".npz")])
+            except OSError:
+                pass
+        if evicted:
+            self._drop_pointers(evicted)
+
+    def _drop_pointers(self, keys: set):
+        """Remove lineage pointers to evicted entries."""
+        for name in os.listdir(self.dir):
+            if not (name.startswith("lineage-") and name.endswith(".txt")):
+                continue
+            path = os.path.join(self.dir, name)
+            try:
+                with open(path) as f:
+                    target = f.read().strip()
+                if target in keys:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        names = os.listdir(self.dir)
+        files = [f for f in names if f.endswith(".npz")]
+        size  = sum(os.path.getsize(os.path.join(self.dir, f)) for f in files)
+        return {"entries": len(files), "lineages": sum(f.startswith("lineage-") for f in names),
+                "bytes": size, "max_bytes": self.max_bytes}
+
+
+backtest_cache = BacktestCache()
@@ -0,0 +1,215 @@
+# backend/app/services/finnhub_client.py
+"""
+One pooled async client for every Finnhub REST call.
+
+  • pooling   — a single httpx.AsyncClient (keep-alive) living on its own
+                event loop thread, so routers (`await finnhub_client.get`)
+                and pool threads (`finnhub_client.get_sync`) share it
+  • quota     — a global token bucket refilled at `finnhub_calls_per_minute`;
+                INTERACTIVE requests go first, BACKGROUND ones also leave
+                BACKGROUND_RESERVE tokens in the bucket for them
+  • retries   — 429 / 5xx / transport errors are retried MAX_RETRIES times
+                with full-jitter exponential backoff (Retry-After honoured);
+                a 429 also empties the bucket so every caller slows down
+  • dedup     — identical requests already in flight share one upstream call
+
+The lane defaults to INTERACTIVE; background work (the signal scheduler)
+wraps its calls in `with finnhub_client.lane(BACKGROUND):` — the lane is a
+ContextVar, so it follows work handed to pools through `in_context`.
+"""
+import time
+import random
+import asyncio
+import threading
+import contextvars
+import concurrent.futures
+from contextlib import contextmanager
+
+import httpx
+
+from ..config import get_settings
+from .metrics import span
+
+settings = get_settings()
+
+BASE_URL           = "https://finnhub.io/api/v1"
+INTERACTIVE        = 0
+BACKGROUND         = 1
+BURST              = 10          # bucket capacity
+BACKGROUND_RESERVE = 2           # tokens background requests never take
+MAX_RETRIES        = 3
+BACKOFF_BASE       = 0.5         # seconds, doubled per attempt
+BACKOFF_CAP        = 8.0
+REQUEST_TIMEOUT    = 8.0
+RETRY_STATUSES     = {429, 500, 502, 503, 504}
+# get_sync gives up once every attempt could have timed out and backed off at the cap
+SYNC_TIMEOUT       = (MAX_RETRIES + 1) * REQUEST_TIMEOUT + MAX_RETRIES * BACKOFF_CAP
+
+_lane: contextvars.ContextVar = contextvars.ContextVar("finnhub_lane", default=INTERACTIVE)
+
+
+class FinnhubError(Exception):
+    def __init__(self, status: int | None, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _span_name(path: str) -> str:
+    return "finnhub." + path.strip("/").replace("/", ".")
+
+
+class TokenBucket:
+    """Refills `rate` tokens/second up to `capacity`; used only on the client loop."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate     = rate
+        self.capacity = capacity
+        self.tokens   = capacity
+        self.updated  = time.monotonic()
+        self.waiting  = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, lane: int):
+        self.waiting[lane] += 1
+        try:
+            while True:
+                self._refill()
+                need = 1.0 if lane == INTERACTIVE else 1.0 + BACKGROUND_RESERVE
+                if self.tokens >= need and (lane == INTERACTIVE or not self.waiting[INTERACTIVE]):
+                    self.tokens -= 1.0
+                    return
+                await asyncio.sleep(max((need - self.tokens) / self.rate, 0.02))
+        finally:
+            self.waiting[lane] -= 1
+
+    def drain(self):
+        self._refill()
+        self.tokens = 0.0
+
+
+class FinnhubClient:
+    def __init__(self, calls_per_minute: int):
+        self.bucket     = TokenBucket(calls_per_minute / 60.0, BURST)
+        self._loop      = None
+        self._client    = None
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._start_lock = threading.Lock()
+        self.requests   = 0
+        self.deduped    = 0
+        self.retries    = 0
+        self.rate_limited = 0
+        self.failures   = 0
+
+    # ── Loop thread ──────────────────────────────────────────────────────────
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop  = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._client = httpx.AsyncClient(
+                        base_url=BASE_URL, timeout=REQUEST_TIMEOUT,
+                        limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+                    )
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                threading.Thread(target=run, name="finnhub-client", daemon=True).start()
+                ready.wait()
+                self._loop = loop
+            return self._loop
+
+    @contextmanager
+    def lane(self, lane: int):
+        token = _lane.set(lane)
+        try:
+            yield
+        finally:
+            _lane.reset(token)
+
+    # ── Public API ───────────────────────────────────────────────────────────
+    def _submit(self, path: str, params: dict):
+        return asyncio.run_coroutine_threadsafe(self._get(path, params, _lane.get()), self._ensure_loop())
+
+    async def get(self, path: str, **params):
+        """GET `path` (e.g. "/company-news") → decoded JSON; raises FinnhubError."""
+        with span(_span_name(path)):
+            return await asyncio.wrap_future(self._submit(path, params))
+
+    def get_sync(self, path: str, **params):
+        """
+        Blocking get() for pool threads (never call it from an event loop).
+        Raises FinnhubError after SYNC_TIMEOUT; a call other callers share
+        keeps running for them.
+        """
+        with span(_span_name(path)):
+            future = self._submit(path, params)
+            try:
+                return future.result(timeout=SYNC_TIMEOUT)
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                raise FinnhubError(None, f"Finnhub {path}: no response within {SYNC_TIMEOUT:.0f}s")
+
+    def stats(self) -> dict:
+        return {
+            "calls_per_minute": round(self.bucket.rate * 60, 1),
+            "tokens":           round(self.bucket.tokens, 2),
+            "waiting":          {"interactive": self.bucket.waiting[INTERACTIVE],
+                                 "background":  self.bucket.waiting[BACKGROUND]},
+            "in_flight":        len(self._inflight),
+            "requests":         self.requests,
+            "deduped":          self.deduped,
+            "retries":          self.retries,
+            "rate_limited":     self.rate_limited,
+            "failures":         self.failures,
+        }
+
+    # ── Client loop side ─────────────────────────────────────────────────────
+    async def _get(self, path: str, params: dict, lane: int):
+        key = (path, tuple(sorted((k, str(v)) for k, v in params.items())))
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.deduped += 1
+        else:
+            fut = self._inflight[key] = asyncio.ensure_future(self._fetch(path, params, lane))
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller giving up doesn't cancel the call the others share
+        return await asyncio.shield(fut)
+
+    async def _fetch(self, path: str, params: dict, lane: int):
+        for attempt in range(MAX_RETRIES + 1):
+            await self.bucket.acquire(lane)
+            self.requests += 1
+            retry_after = None
+            try:
+                resp = await self._client.get(path, params={**params, "token": settings.finnhub_api_key})
+            except httpx.TransportError as e:
+                error = FinnhubError(None, f"Finnhub {path}: {e!r}")
+            else:
+                if resp.status_code == 200:
+                    return resp.json()
+                error = FinnhubError(resp.status_code, f"Finnhub {path}: HTTP {resp.status_code}")
+                if resp.status_code not in RETRY_STATUSES:
+                    break
+                if resp.status_code == 429:
+                    self.rate_limited += 1
+                    self.bucket.drain()
+                try:
+                    retry_after = float(resp.headers.get("Retry-After", ""))
+                except ValueError:
+                    pass
+            if attempt < MAX_RETRIES:
+                self.retries += 1
+                backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+                await asyncio.sleep(max(backoff, retry_after or 0.0))
+        self.failures += 1
+        raise error
+
+
+finnhub_client = FinnhubClient(settings.finnhub_calls_per_minute)
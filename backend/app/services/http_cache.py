@@ -0,0 +1,104 @@
+# backend/app/services/http_cache.py
+"""
+HTTP conditional responses for polled endpoints.
+
+The ETag is derived from a cheap version of the underlying cache entry
+(last bar, quote fields, feed head, signal generated_at) — never from the
+serialized body — so a matching If-None-Match (or, without one, a
+not-newer If-Modified-Since) is answered with 304 before the body is built
+or serialized.
+
+    etag = etag_for("ohlcv", symbol, period, interval, last_bar)
+    return await respond(request, "market.ohlcv", etag, lambda: result, max_age=15)
+"""
+import hashlib
+import inspect
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+
+def etag_for(*parts) -> str:
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # weak comparison (RFC 9110 §13.1.2): W/ prefixes are ignored
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def is_fresh(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Does the client's copy still match (If-None-Match first, else If-Modified-Since)?"""
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        return _etag_matches(inm, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # naive datetimes in this app are UTC (datetime.utcnow)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def cache_headers(etag: str, max_age: int, last_modified: datetime | None = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}, must-revalidate"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+class ConditionalStats:
+    """Per-endpoint conditional request counters since startup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: dict[str, list] = {}     # name → [responses, not modified]
+
+    def count(self, name: str, not_modified: bool):
+        with self._lock:
+            c = self._counts.setdefault(name, [0, 0])
+            c[0] += 1
+            c[1] += int(not_modified)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {name: {"responses": n, "not_modified": nm,
+                           "not_modified_rate": round(nm / n, 3) if n else None}
+                    for name, (n, nm) in sorted(self._counts.items())}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+conditional_stats = ConditionalStats()
+
+
+async def respond(request: Request, name: str, etag: str, build, max_age: int,
+                  last_modified: datetime | None = None) -> Response:
+    """304 if the client's copy matches `etag`, else the JSON of build() (sync or async)."""
+    headers = cache_headers(etag, max_age, last_modified)
+    if is_fresh(request, etag, last_modified):
+        conditional_stats.count(name, True)
+        return Response(status_code=304, headers=headers)
+    body = build()
+    if inspect.isawaitable(body):
+        body = await body
+    conditional_stats.count(name, False)
+    return JSONResponse(jsonable_encoder(body), headers=headers)
@@ -0,0 +1,129 @@
+# backend/app/services/metrics.py
+"""
+Lightweight timing spans + rolling latency histograms.
+
+    with span("signal.features") as sp:
+        ...
+        sp.cache_hit = True
+
+Every finished span is recorded in a per-name rolling window (last
+WINDOW_SECONDS, at most MAX_SAMPLES) that /api/metrics/latency summarizes
+as percentiles, a bucketed histogram and the cache-hit rate.
+
+Inside `with trace() as spans:` the finished spans are also collected into
+`spans` (via a ContextVar — use `in_context` when handing work to a
+thread pool), so a request can attach its own timings to the response.
+"""
+import time
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+WINDOW_SECONDS = 15 * 60
+MAX_SAMPLES    = 4096
+BUCKETS_MS     = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_trace: contextvars.ContextVar = contextvars.ContextVar("trace", default=None)
+
+
+class Span:
+    __slots__ = ("name", "start", "ms", "cache_hit", "ok")
+
+    def __init__(self, name: str):
+        self.name      = name
+        self.start     = time.perf_counter()
+        self.ms        = 0.0
+        self.cache_hit = None
+        self.ok        = True
+
+    def as_dict(self, origin: float) -> dict:
+        out = {"name": self.name, "start_ms": round((self.start - origin) * 1000, 1),
+               "ms": round(self.ms, 1), "ok": self.ok}
+        if self.cache_hit is not None:
+            out["cache_hit"] = self.cache_hit
+        return out
+
+
+class Metrics:
+    def __init__(self):
+        self._series: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float, cache_hit: bool | None = None, ok: bool = True):
+        with self._lock:
+            q = self._series.get(name)
+            if q is None:
+                q = self._series[name] = deque(maxlen=MAX_SAMPLES)
+            q.append((time.time(), ms, cache_hit, ok))
+
+    def summary(self, prefix: str | None = None) -> dict:
+        cutoff = time.time() - WINDOW_SECONDS
+        with self._lock:
+            series = {k: list(q) for k, q in self._series.items()
+                      if not prefix or k.startswith(prefix)}
+        out = {}
+        for name, samples in sorted(series.items()):
+            samples = [s for s in samples if s[0] >= cutoff]
+            if not samples:
+                continue
+            ms   = np.array([s[1] for s in samples])
+            hits = [s[2] for s in samples if s[2] is not None]
+            p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+            counts = np.bincount(np.searchsorted(BUCKETS_MS, ms), minlength=len(BUCKETS_MS) + 1)
+            out[name] = {
+                "count":     len(samples),
+                "errors":    sum(1 for s in samples if not s[3]),
+                "p50_ms":    round(float(p50), 1),
+                "p90_ms":    round(float(p90), 1),
+                "p99_ms":    round(float(p99), 1),
+                "max_ms":    round(float(ms.max()), 1),
+                "cache_hit_rate": round(sum(hits) / len(hits), 3) if hits else None,
+                "histogram": {f"<={b}": int(c) for b, c in zip(BUCKETS_MS, counts)}
+                             | {f">{BUCKETS_MS[-1]}": int(counts[-1])},
+            }
+        return {"window_seconds": WINDOW_SECONDS, "spans": out}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name: str):
+    sp = Span(name)
+    try:
+        yield sp
+    except BaseException:
+        sp.ok = False
+        raise
+    finally:
+        sp.ms = (time.perf_counter() - sp.start) * 1000
+        metrics.record(name, sp.ms, sp.cache_hit, sp.ok)
+        collected = _trace.get()
+        if collected is not None:
+            collected.append(sp)
+
+
+@contextmanager
+def trace():
+    """Collect the spans finished in this context; the yielded list is filled on exit."""
+    spans, out = [], []
+    token  = _trace.set(spans)
+    origin = time.perf_counter()
+    try:
+        yield out
+    finally:
+        _trace.reset(token)
+        out.extend(sorted((s.as_dict(origin) for s in spans), key=lambda d: d["start_ms"]))
+
+
+def in_context(fn):
+    """Bind fn to the caller's context (spans from pool threads join the trace)."""
+    ctx = contextvars.copy_context()
+    return lambda *a, **kw: ctx.run(fn, *a, **kw)
@@ -0,0 +1,390 @@
+# backend/app/services/news_store.py
+"""
+Persistent Finnhub article store with cached per-article sentiment.
+
+Articles are keyed by Finnhub id; each row keeps its lexicon score, so a
+symbol's sentiment is an aggregate over stored scores. Articles are linked
+to the feeds they came from — a symbol's company news, or the market feed
+"market:<category>" — and read back with indexed (feed, published) range
+queries; news_fts (SQLite FTS5) indexes headline + summary for search.
+
+Polling is incremental: at most once per POLL_INTERVAL per feed, asking
+only for what is newer than the cursor (company news: the days since the
+newest stored article; market news: ids above the last one) and
+inserting/scoring only ids not seen before. Without fresh news a signal
+or a news page costs no upstream call and no scoring work.
+
+prune() (run by the news ingester) drops feed links older than
+RETENTION_DAYS and then the articles no feed links to any more; the
+news_fts_ad trigger removes them from the search index.
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, text
+
+from ..database import SessionLocal, NewsArticle, NewsSymbol, NewsCursor, FTS_ENABLED
+from .finnhub_client import finnhub_client
+from .metrics import in_context
+
+POLL_INTERVAL     = 120.0        # seconds between upstream polls per feed
+POLL_WORKERS      = 8
+BACKFILL_DAYS     = 30           # history fetched on a feed's first poll
+RETENTION_DAYS    = 30           # longest read window (/api/news, screener: days ≤ 30)
+MARKET_CATEGORIES = ("general", "forex", "crypto", "merger")
+
+_poll_pool = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix="news-poll")
+
+
+def market_feed(category: str) -> str:
+    return f"market:{category}"
+
+
+def _row(a: NewsArticle) -> dict:
+    return {
+        "headline":   (a.headline or "")[:120],
+        "url":        a.url or "",
+        "source":     a.source or "",
+        "datetime":   a.published or 0,
+        "sentiment":  a.label,
+        "score":      a.score,
+        "confidence": a.confidence,
+    }
+
+
+def _article(a: NewsArticle) -> dict:
+    """The /api/news item shape."""
+    return {
+        "id":        a.id,
+        "headline":  a.headline or "",
+        "summary":   a.summary or "",
+        "source":    a.source or "",
+        "url":       a.url or "",
+        "image":     a.image or "",
+        "datetime":  a.published or 0,
+        "category":  a.category or "",
+        "sentiment": a.label,
+        "score":     a.score,
+    }
+
+
+def _insert_new(db, model, rows: list) -> int:
+    """
+    INSERT … ON CONFLICT DO NOTHING → rows actually inserted. Feeds are
+    polled concurrently and may share an article, so the "not stored yet"
+    check before the insert can be stale by the time it runs.
+    """
+    if not rows:
+        return 0
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    result = db.connection().execute(insert(model.__table__).on_conflict_do_nothing(), rows)
+    return result.rowcount if result.rowcount >= 0 else len(rows)
+
+
+def _match_query(query: str) -> str:
+    """User text → FTS5 query: every word must match (quoted, so no syntax errors)."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in query.split())
+
+
+class NewsStore:
+    def __init__(self):
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self.polls  = 0
+        self.skipped_polls = 0
+        self.new_articles  = 0
+        self.rescored      = 0
+        self.background_refreshes = 0
+        self.searches      = 0
+        self.stale_reads   = 0
+        self.pruned_links    = 0
+        self.pruned_articles = 0
+
+    def _lock(self, feed: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(feed, threading.Lock())
+
+    # ── Ingest ───────────────────────────────────────────────────────────────
+    def poll(self, symbol: str, days: int = 7, force: bool = False) -> int:
+        """Fetch and store company news newer than the cursor → number of new articles."""
+        from ..engine.sentiment import sentiment_engine
+        sym = symbol.upper()
+
+        def fetch(cursor):
+            if cursor is None or not cursor.last_published:
+                from_date = date.today() - timedelta(days=max(days, BACKFILL_DAYS))
+            else:
+                from_date = max(date.today() - timedelta(days=days),
+                                datetime.utcfromtimestamp(cursor.last_published).date())
+            return sentiment_engine.fetch_news(sym, from_date=from_date)
+        return self._poll(sym, fetch, force)
+
+    def poll_market(self, category: str = "general", force: bool = False) -> int:
+        """Fetch and store market news with ids above the cursor → number of new articles."""
+        def fetch(cursor):
+            return finnhub_client.get_sync("/news", category=category,
+                                           minId=cursor.last_id if cursor and cursor.last_id else 0)
+        return self._poll(market_feed(category), fetch, force)
+
+    def _poll(self, feed: str, fetch, force: bool) -> int:
+        from ..engine.sentiment import sentiment_engine, SCORER_VERSION
+        with self._lock(feed):
+            db = SessionLocal()
+            try:
+                cursor = db.get(NewsCursor, feed)
+                now    = datetime.utcnow()
+                if not force and cursor and cursor.polled_at and \
+                        (now - cursor.polled_at).total_seconds() < POLL_INTERVAL:
+                    self.skipped_polls += 1
+                    return 0
+
+                items = fetch(cursor)
+                self.polls += 1
+
+                by_id = {int(i["id"]): i for i in items if i.get("id")}
+                known = {r[0] for r in db.query(NewsSymbol.article_id)
+                         .filter(NewsSymbol.symbol == feed, NewsSymbol.article_id.in_(list(by_id)))}
+                fresh = [i for aid, i in by_id.items() if aid not in known]
+                if fresh:
+                    stored = {r[0] for r in db.query(NewsArticle.id)
+                              .filter(NewsArticle.id.in_([int(i["id"]) for i in fresh]))}
+                    to_score = [i for i in fresh if int(i["id"]) not in stored]
+                    added = _insert_new(db, NewsArticle, [dict(
+                        id=int(item["id"]), published=int(item.get("datetime") or 0),
+                        headline=item.get("headline", ""), summary=item.get("summary", ""),
+                        source=item.get("source", ""), url=item.get("url", ""),
+                        image=item.get("image", ""), category=item.get("category", ""),
+                        score=s["score"], label=s["sentiment"], confidence=s["confidence"],
+                        scorer_version=SCORER_VERSION, fetched_at=now,
+                    ) for item, s in zip(to_score, sentiment_engine.score_articles(to_score))])
+                    _insert_new(db, NewsSymbol, [dict(symbol=feed, article_id=int(item["id"]),
+                                                      published=int(item.get("datetime") or 0))
+                                                 for item in fresh])
+                    self.new_articles += added
+
+                if cursor is None:
+                    cursor = NewsCursor(symbol=feed, last_id=0, last_published=0)
+                    db.add(cursor)
+                if by_id:
+                    cursor.last_id        = max(cursor.last_id or 0, max(by_id))
+                    cursor.last_published = max(cursor.last_published or 0,
+                                                max(int(i.get("datetime") or 0) for i in by_id.values()))
+                cursor.polled_at = now
+                db.commit()
+                return len(fresh)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def poll_many(self, symbols: list, days: int = 7) -> dict:
+        """Poll every symbol (concurrently, paced by the Finnhub client) → {symbol: error}."""
+        def run(sym):
+            try:
+                self.poll(sym, days)
+                return None
+            except Exception as e:
+                return str(e)
+        futures = {s: _poll_pool.submit(in_context(run), s) for s in symbols}   # one context per call
+        return {s: f.result() for s, f in futures.items() if f.result()}
+
+    # ── Read ─────────────────────────────────────────────────────────────────
+    def recent(self, symbol: str, days: int = 7, poll: bool = True) -> list:
+        """Scored articles for the symbol from the last `days` days, newest first."""
+        return self.recent_status(symbol, days, poll)[0]
+
+    def recent_status(self, symbol: str, days: int = 7, poll: bool = True) -> tuple:
+        """
+        (articles, poll error or None). A failed poll still serves what is
+        stored, reported as stale; it raises only when there is nothing to serve.
+        """
+        sym, error = symbol.upper(), None
+        if poll:
+            try:
+                self.poll(sym, days)
+            except Exception as e:
+                error = str(e)
+        rows = self.recent_many([sym], days)[sym]
+        if error is not None:
+            if not rows:
+                raise RuntimeError(error)
+            self.stale_reads += 1
+        return rows, error
+
+    def recent_many(self, symbols: list, days: int = 7) -> dict:
+        """{symbol: stored articles} from one query (no polling); stale scores redone in one batch."""
+        from ..engine.sentiment import sentiment_engine, SCORER_VERSION, article_text
+        syms = [s.upper() for s in symbols]
+        since = int(time.time()) - days * 86400
+        db = SessionLocal()
+        try:
+            links = (db.query(NewsSymbol.symbol, NewsArticle)
+                     .join(NewsArticle, NewsSymbol.article_id == NewsArticle.id)
+                     .filter(NewsSymbol.symbol.in_(syms), NewsSymbol.published >= since)
+                     .order_by(NewsSymbol.published.desc(), NewsArticle.id.desc())
+                     .all())
+            articles = {a.id: a for _, a in links}
+            stale = [a for a in articles.values() if a.scorer_version != SCORER_VERSION]
+            if stale:
+                results = sentiment_engine.score_batch(
+                    [article_text({"headline": a.headline, "summary": a.summary}) for a in stale])
+                for a, r in zip(stale, results):
+                    a.score, a.label, a.confidence = r["score"], r["label"], r["confidence"]
+                    a.scorer_version = SCORER_VERSION
+                db.commit()
+                self.rescored += len(stale)
+            rows = {aid: _row(a) for aid, a in articles.items()}
+            out  = {s: [] for s in syms}
+            for sym, a in links:
+                out[sym].append(rows[a.id])
+            return out
+        finally:
+            db.close()
+
+    def open_company_feed(self, symbol: str, days: int = 7) -> str:
+        sym = symbol.upper()
+        self._refresh(sym, lambda: self.poll(sym, days))
+        return sym
+
+    def open_market_feed(self, category: str = "general") -> str:
+        feed = market_feed(category)
+        self._refresh(feed, lambda: self.poll_market(category))
+        return feed
+
+    def _refresh(self, feed: str, poll):
+        """
+        A feed never polled is fetched now; a stale one is served as stored
+        while a background poll refreshes it.
+        """
+        db = SessionLocal()
+        try:
+            cursor = db.get(NewsCursor, feed)
+            polled = cursor.polled_at if cursor else None
+        finally:
+            db.close()
+        if polled is None:
+            poll()
+        elif (datetime.utcnow() - polled).total_seconds() >= POLL_INTERVAL:
+            self.background_refreshes += 1
+            _poll_pool.submit(in_context(self._quiet), poll)
+
+    def _window(self, db, feed: str, days: int):
+        since = int(time.time()) - days * 86400
+        return db.query(NewsSymbol).filter(NewsSymbol.symbol == feed, NewsSymbol.published >= since)
+
+    def feed_version(self, feed: str, days: int = 7) -> tuple:
+        """Cheap version of the feed's window (count, newest, max id, scorer) — changes whenever its articles do."""
+        from ..engine.sentiment import SCORER_VERSION
+        db = SessionLocal()
+        try:
+            count, newest, top = self._window(db, feed, days).with_entities(
+                func.count(), func.max(NewsSymbol.published), func.max(NewsSymbol.article_id)).one()
+            return count, newest, top, SCORER_VERSION
+        finally:
+            db.close()
+
+    def feed_articles(self, feed: str, days: int = 7, limit: int = 25) -> tuple:
+        """(article count in the window, newest `limit` articles) from the store."""
+        since = int(time.time()) - days * 86400
+        db = SessionLocal()
+        try:
+            articles = (db.query(NewsArticle)
+                        .join(NewsSymbol, NewsSymbol.article_id == NewsArticle.id)
+                        .filter(NewsSymbol.symbol == feed, NewsSymbol.published >= since)
+                        .order_by(NewsSymbol.published.desc(), NewsArticle.id.desc())
+                        .limit(limit).all())
+            return self._window(db, feed, days).count(), [_article(a) for a in articles]
+        finally:
+            db.close()
+
+    @staticmethod
+    def _quiet(poll):
+        try:
+            poll()
+        except Exception as e:
+            print(f"⚠️ רענון חדשות ברקע נכשל: {e}")
+
+    def search(self, query: str, symbol: str | None = None, days: int | None = None,
+               limit: int = 20) -> list:
+        """Full-text search over stored headlines/summaries, best match first."""
+        self.searches += 1
+        params = {"limit": limit}
+        where  = []
+        if symbol:
+            where.append("a.id IN (SELECT article_id FROM news_symbols WHERE symbol = :symbol)")
+            params["symbol"] = symbol.upper()
+        if days:
+            where.append("a.published >= :since")
+            params["since"] = int(time.time()) - days * 86400
+        db = SessionLocal()
+        try:
+            if FTS_ENABLED:
+                params["q"] = _match_query(query)
+                sql = ("SELECT a.id, snippet(news_fts, -1, '<b>', '</b>', '…', 16) AS snippet, "
+                       "bm25(news_fts) AS rank FROM news_fts JOIN news_articles a ON a.id = news_fts.rowid "
+                       "WHERE news_fts MATCH :q" + "".join(f" AND {w}" for w in where) +
+                       " ORDER BY rank, a.published DESC LIMIT :limit")
+            else:
+                # No FTS5 (non-SQLite database or a build without it): every word as a substring, newest first
+                words = query.split()
+                for i, w in enumerate(words):
+                    where.append(f"(a.headline LIKE :w{i} OR a.summary LIKE :w{i})")
+                    params[f"w{i}"] = f"%{w}%"
+                sql = ("SELECT a.id, NULL AS snippet, NULL AS rank FROM news_articles a"
+                       + (" WHERE " + " AND ".join(where) if where else "") +
+                       " ORDER BY a.published DESC LIMIT :limit")
+            hits     = db.execute(text(sql), params).all()
+            articles = {a.id: a for a in db.query(NewsArticle).filter(NewsArticle.id.in_([h.id for h in hits]))}
+            return [{**_article(articles[h.id]), "snippet": h.snippet,
+                     "rank": round(-h.rank, 4) if h.rank is not None else None}
+                    for h in hits if h.id in articles]
+        finally:
+            db.close()
+
+    # ── Retention ────────────────────────────────────────────────────────────
+    def prune(self, days: int = RETENTION_DAYS) -> tuple:
+        """Delete links older than `days`, then articles left without links → (links, articles)."""
+        cutoff = int(time.time()) - days * 86400
+        db = SessionLocal()
+        try:
+            links = db.query(NewsSymbol).filter(NewsSymbol.published < cutoff) \
+                      .delete(synchronize_session=False)
+            # An article's links all carry its publish time, so only old articles can be orphaned
+            articles = db.query(NewsArticle).filter(
+                NewsArticle.published < cutoff,
+                NewsArticle.id.notin_(db.query(NewsSymbol.article_id)),
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        self.pruned_links    += links
+        self.pruned_articles += articles
+        return links, articles
+
+    def stats(self) -> dict:
+        return {
+            "polls":          self.polls,
+            "skipped_polls":  self.skipped_polls,
+            "new_articles":   self.new_articles,
+            "rescored":       self.rescored,
+            "background_refreshes": self.background_refreshes,
+            "searches":       self.searches,
+            "stale_reads":    self.stale_reads,
+            "pruned_links":    self.pruned_links,
+            "pruned_articles": self.pruned_articles,
+            "retention_days": RETENTION_DAYS,
+            "poll_interval_s": POLL_INTERVAL,
+        }
+
+
+news_store = NewsStore()
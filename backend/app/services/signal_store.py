@@ -0,0 +1,175 @@
+# backend/app/services/signal_store.py
+"""
+CachedSignal read/write helpers shared by the signals router and the
+background precompute scheduler.
+
+The full signal document is stored as zlib-compressed JSON together with
+PAYLOAD_VERSION, so a cache hit returns the same shape as a fresh
+generate_signal. Rows written by an older schema (or before the payload
+column existed) fall back to the summary columns.
+"""
+import json
+import time
+import zlib
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+
+from ..database import CachedSignal
+from ..engine.signal_fusion import STAGES
+from .metrics import metrics
+from .http_cache import etag_for
+
+SIGNAL_TTL      = timedelta(minutes=15)
+DEGRADED_TTL    = timedelta(minutes=5)    # a stage fell back (e.g. Finnhub down) — retry sooner
+PAYLOAD_VERSION = 1
+# Per-request fields that never go into the cached document
+TRANSIENT_FIELDS = ("cached", "generated_at", "timings", "reused_components")
+
+
+def _json_default(o):
+    return o.item() if hasattr(o, "item") else str(o)
+
+
+def _dump(signal: dict) -> bytes:
+    doc = {k: v for k, v in signal.items() if k not in TRANSIENT_FIELDS}
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode()
+
+
+def decode_payload(blob: bytes) -> dict:
+    return json.loads(zlib.decompress(blob))
+
+
+class CacheStats:
+    """Hit/miss counters since startup — full hits are recomputes avoided."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.full_hits   = 0    # complete document served
+            self.legacy_hits = 0    # summary-only row (old schema)
+            self.not_modified = 0   # client's copy still current (304) — nothing decoded
+            self.misses      = 0
+            self.stored      = 0
+            self.raw_bytes   = 0
+            self.stored_bytes = 0
+
+    def count(self, field: str, n: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def as_dict(self) -> dict:
+        lookups = self.full_hits + self.legacy_hits + self.not_modified + self.misses
+        return {
+            "lookups":             lookups,
+            "full_hits":           self.full_hits,
+            "legacy_hits":         self.legacy_hits,
+            "not_modified":        self.not_modified,
+            "misses":              self.misses,
+            "recomputes_avoided":  self.full_hits + self.not_modified,
+            "full_hit_rate":       round(self.full_hits / lookups, 3) if lookups else None,
+            "stored":              self.stored,
+            "compression_ratio":   round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else None,
+            "payload_version":     PAYLOAD_VERSION,
+        }
+
+
+cache_stats = CacheStats()
+
+
+def expires(cached: CachedSignal) -> datetime:
+    return cached.expires_at or cached.generated_at + SIGNAL_TTL
+
+
+def get_cached(symbol: str, db: Session) -> CachedSignal | None:
+    """Return cached signal if it hasn't expired (SIGNAL_TTL, or DEGRADED_TTL if degraded)."""
+    cached = db.query(CachedSignal).filter_by(symbol=symbol.upper()).first()
+    if cached and datetime.utcnow() < expires(cached):
+        return cached
+    cache_stats.count("misses")
+    metrics.record("signal.cache", 0.0, cache_hit=False)
+    return None
+
+
+def signal_etag(symbol: str, generated_at: datetime, full: bool, fields: frozenset | None) -> str:
+    """
+    ETag of a stored signal (per projection) — no payload decoding needed.
+    Weak: the fresh response and its cached copies carry the same signal
+    but differ in per-response metadata (`cached`).
+    """
+    return "W/" + etag_for("signal", symbol, generated_at.isoformat(), PAYLOAD_VERSION if full else 0,
+                    sorted(fields) if fields is not None else None)
+
+
+def cached_etag(cached: CachedSignal, fields: frozenset | None) -> str:
+    full = bool(cached.payload) and cached.payload_version == PAYLOAD_VERSION
+    return signal_etag(cached.symbol, cached.generated_at, full, fields)
+
+
+def cached_response(cached: CachedSignal) -> dict:
+    start = time.perf_counter()
+    meta  = {"cached": True, "generated_at": cached.generated_at.isoformat()}
+    if cached.payload and cached.payload_version == PAYLOAD_VERSION:
+        try:
+            signal = {**decode_payload(cached.payload), **meta}
+            cache_stats.count("full_hits")
+            metrics.record("signal.cache", (time.perf_counter() - start) * 1000, cache_hit=True)
+            return signal
+        except (zlib.error, ValueError):
+            pass
+    cache_stats.count("legacy_hits")
+    metrics.record("signal.cache", (time.perf_counter() - start) * 1000, cache_hit=True)
+    return {
+        "symbol":       cached.symbol,
+        "decision":     cached.decision,
+        "confidence":   cached.confidence,
+        "entry_price":  cached.entry_price,
+        "stop_loss":    cached.stop_loss,
+        "take_profit":  cached.take_profit,
+        "reasoning_he": cached.reasoning_he,
+        "sources":      [],
+        **meta,
+    }
+
+
+def store_signal(db: Session, sym: str, signal: dict, generated_at: datetime | None = None) -> bool:
+    """
+    Cache in DB unless the signal failed. Degraded signals are cached for
+    DEGRADED_TTL only, and only if every degraded stage has a fallback.
+    """
+    degraded = signal.get("degraded_stages") or []
+    if signal.get("error") or any(STAGES.get(d["stage"], {}).get("fallback") is None for d in degraded):
+        return False
+    try:
+        generated_at = generated_at or datetime.utcnow()
+        raw      = _dump(signal)
+        blob     = zlib.compress(raw, 6)
+        existing = db.query(CachedSignal).filter_by(symbol=sym).first()
+        payload  = {
+            "decision":     signal.get("decision", "החזק"),
+            "confidence":   signal.get("confidence", 0.5),
+            "entry_price":  signal.get("entry_price"),
+            "stop_loss":    signal.get("stop_loss"),
+            "take_profit":  signal.get("take_profit"),
+            "reasoning_he": signal.get("reasoning_he", ""),
+            "payload":      blob,
+            "payload_version": PAYLOAD_VERSION,
+            "generated_at": generated_at,
+            "expires_at":   generated_at + (DEGRADED_TTL if degraded else SIGNAL_TTL),
+        }
+        if existing:
+            for k, v in payload.items():
+                setattr(existing, k, v)
+        else:
+            db.add(CachedSignal(symbol=sym, **payload))
+        db.commit()
+        cache_stats.count("stored")
+        cache_stats.count("raw_bytes", len(raw))
+        cache_stats.count("stored_bytes", len(blob))
+        return True
+    except Exception:
+        db.rollback()
+        return False
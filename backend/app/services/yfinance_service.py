@@ -4,6 +4,7 @@ import pandas as pd
 from datetime import datetime, date, timedelta
 from typing import Optional
 import time
+from .metrics import span
 
 # ── Simple in-memory TTL cache ────────────────────────────────────────────────
 _cache: dict = {}
@@ -122,11 +123,15 @@ class YFinanceService:
         cache_key = f"fundamentals:{symbol}"
         cached = _cache_get(cache_key)
         if cached:
+            with span("yf.info") as sp:
+                sp.cache_hit = True
             return cached
 
         try:
-            ticker = yf.Ticker(symbol)
-            info   = ticker.info
+            with span("yf.info") as sp:
+                sp.cache_hit = False
+                ticker = yf.Ticker(symbol)
+                info   = ticker.info
         except Exception:
             return {"symbol": symbol.upper()}
 
@@ -0,0 +1,252 @@
+# backend/app/tasks/backtest_jobs.py
+"""
+Background backtest jobs.
+
+Each job runs in its own worker process (a spawn-based pool of
+`backtest_workers` processes), so features, signals and the simulation
+never hold the API process's GIL; a light coordinator thread per running
+job relays its events. Admission is bounded: at most `backtest_workers`
+running plus `backtest_queue_size` waiting; beyond that submit() raises
+QueueFull.
+
+Each job keeps an append-only event log (status / fold / result) that the
+SSE endpoint streams. Fold events and the cancel flag cross the process
+boundary through a multiprocessing manager; cancellation is cooperative —
+run_backtest polls the flag between stages and after every fold.
+"""
+import time
+import uuid
+import queue
+import atexit
+import threading
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+from ..config import get_settings
+from ..engine.backtester import run_backtest, BacktestCancelled
+from ..services.metrics import trace
+
+settings = get_settings()
+
+MAX_FINISHED_JOBS = 200
+FINAL_STATES      = ("done", "error", "cancelled")
+EVENT_POLL        = 0.2     # seconds between cancel-flag forwards while waiting on events
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _job_process(params: dict, events, cancel) -> tuple:
+    """
+    Worker-process entry point → (result, timings). Fold events go to
+    `events` (.put); `cancel` (.is_set) is polled by run_backtest.
+    """
+    with trace() as timings:
+        try:
+            result = run_backtest(**params, on_fold=lambda fold: events.put(("fold", fold)),
+                                  cancelled=cancel.is_set)
+        except BacktestCancelled:
+            result = {"error": "cancelled"}
+    return result, timings
+
+
+class _LocalEvents:
+    """In-process stand-in for the manager queue (process pool unavailable)."""
+
+    def __init__(self, on_event):
+        self.put = lambda item: on_event(*item)
+
+
+class BacktestJob:
+    def __init__(self, params: dict):
+        self.id         = uuid.uuid4().hex[:12]
+        self.params     = params
+        self.status     = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result     = None
+        self.error      = None
+        self.folds_done = 0
+        self.events     = []     # [(event, data)] — index is the SSE event id
+        self.future: Future | None = None
+        self._cancel    = threading.Event()
+        self._lock      = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINAL_STATES
+
+    def emit(self, event: str, data: dict):
+        with self._lock:
+            self.events.append((event, data))
+
+    def events_since(self, n: int) -> list:
+        with self._lock:
+            return list(enumerate(self.events))[n:]
+
+    def snapshot(self, with_result: bool = True) -> dict:
+        out = {
+            "job_id":      self.id,
+            "status":      self.status,
+            "params":      self.params,
+            "folds_done":  self.folds_done,
+            "created_at":  self.created_at,
+            "started_at":  self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error:
+            out["error"] = self.error
+        if with_result and self.result is not None:
+            out["result"] = self.result
+        return out
+
+
+class BacktestJobManager:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers    = workers
+        self.queue_size = queue_size
+        self._pool      = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backtest")
+        self._procs     = None      # ProcessPoolExecutor, started with the first job
+        self._manager   = None
+        self._jobs: dict[str, BacktestJob] = {}
+        self._lock      = threading.Lock()
+
+    def _processes(self) -> tuple:
+        with self._lock:
+            if self._procs is None:
+                ctx = mp.get_context("spawn")
+                self._manager = ctx.Manager()
+                self._procs   = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+            return self._procs, self._manager
+
+    def shutdown(self):
+        with self._lock:
+            if self._procs is not None:
+                self._procs.shutdown(wait=False, cancel_futures=True)
+                self._manager.shutdown()
+            self._procs = self._manager = None
+
+    # ── Admission ────────────────────────────────────────────────────────────
+    def _active(self) -> int:
+        return sum(1 for j in self._jobs.values() if not j.finished)
+
+    def submit(self, params: dict) -> BacktestJob:
+        with self._lock:
+            if self._active() >= self.workers + self.queue_size:
+                raise QueueFull("תור הבקטסטים מלא, נסה שוב בעוד מספר שניות")
+            job = BacktestJob(params)
+            self._jobs[job.id] = job
+            self._prune()
+        job.emit("status", {"status": "queued"})
+        job.future = self._pool.submit(self._run, job)
+        return job
+
+    def _prune(self):
+        finished = sorted((j for j in self._jobs.values() if j.finished),
+                          key=lambda j: j.finished_at)
+        for j in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[j.id]
+
+    # ── Execution ────────────────────────────────────────────────────────────
+    def _finish(self, job: BacktestJob, status: str):
+        # Emit before the final status: readers stop once `finished` and caught up
+        payload = {"status": status}
+        if job.error:
+            payload["error"] = job.error
+        job.emit("status", payload)
+        job.finished_at = time.time()
+        job.status      = status
+
+    def _on_event(self, job: BacktestJob, event: str, data: dict):
+        if event == "fold":
+            job.folds_done += 1
+        job.emit(event, data)
+
+    def _execute(self, job: BacktestJob, params: dict) -> tuple:
+        """Run the job in a worker process, relaying its events → (result, timings)."""
+        procs, manager = self._processes()
+        events, cancel = manager.Queue(), manager.Event()
+        future = procs.submit(_job_process, params, events, cancel)
+        while True:
+            try:
+                self._on_event(job, *events.get(timeout=EVENT_POLL))
+                continue
+            except queue.Empty:
+                pass
+            if job._cancel.is_set():
+                cancel.set()
+            if future.done():
+                break
+        while not events.empty():   # emitted just before the worker returned
+            self._on_event(job, *events.get())
+        return future.result()
+
+    def _run(self, job: BacktestJob):
+        if job._cancel.is_set():
+            return self._finish(job, "cancelled")
+        job.status     = "running"
+        job.started_at = time.time()
+        job.emit("status", {"status": "running"})
+
+        params = {k: v for k, v in job.params.items() if k != "debug"}
+        try:
+            try:
+                result, timings = self._execute(job, params)
+            except (BrokenProcessPool, OSError) as e:
+                print(f"⚠️ Backtest process pool unavailable, running in-process: {e}")
+                self.shutdown()
+                result, timings = _job_process(
+                    params, _LocalEvents(lambda event, data: self._on_event(job, event, data)), job._cancel)
+        except Exception as e:
+            result, timings = {"error": str(e)}, []
+        if job.params.get("debug") and "error" not in result:
+            result = {**result, "timings": timings}
+
+        if job._cancel.is_set():
+            return self._finish(job, "cancelled")
+        if "error" in result:
+            job.error = result["error"]
+            return self._finish(job, "error")
+        job.result = result
+        job.emit("result", result)
+        self._finish(job, "done")
+
+    # ── Queries / control ────────────────────────────────────────────────────
+    def get(self, job_id: str) -> BacktestJob | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> BacktestJob | None:
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():   # never started
+            self._finish(job, "cancelled")
+        return job
+
+    def position(self, job: BacktestJob) -> int:
+        """Jobs queued ahead of `job` (0 once running)."""
+        if job.status != "queued":
+            return 0
+        return sum(1 for j in list(self._jobs.values())
+                   if j.status == "queued" and j.created_at < job.created_at)
+
+    def list(self) -> list:
+        return [j.snapshot(with_result=False)
+                for j in sorted(self._jobs.values(), key=lambda j: j.created_at, reverse=True)]
+
+    def stats(self) -> dict:
+        jobs = list(self._jobs.values())
+        return {
+            "workers":    self.workers,
+            "queue_size": self.queue_size,
+            "running":    sum(j.status == "running" for j in jobs),
+            "queued":     sum(j.status == "queued" for j in jobs),
+        }
+
+
+backtest_jobs = BacktestJobManager(settings.backtest_workers, settings.backtest_queue_size)
+atexit.register(backtest_jobs.shutdown)
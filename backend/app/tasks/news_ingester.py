@@ -0,0 +1,89 @@
+# backend/app/tasks/news_ingester.py
+"""
+Background incremental news ingestion into the local news store.
+
+Every INGEST_INTERVAL the market feeds (MARKET_CATEGORIES) and the company
+news of every watchlist symbol and open position are polled through
+news_store — incremental and deduplicated by Finnhub id — on the Finnhub
+client's BACKGROUND lane, so interactive requests keep their quota.
+/api/news then reads from the store without waiting on upstream.
+At most once per PRUNE_INTERVAL a cycle also prunes news older than
+RETENTION_DAYS from the store.
+"""
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from ..database import SessionLocal
+from ..services.news_store import news_store, MARKET_CATEGORIES, POLL_INTERVAL
+from ..services.finnhub_client import finnhub_client, BACKGROUND
+from ..services.metrics import span
+from .signal_scheduler import signal_scheduler
+
+INGEST_INTERVAL = POLL_INTERVAL
+PRUNE_INTERVAL  = 3600.0
+
+
+class NewsIngester:
+    def __init__(self, interval: float):
+        self.interval  = interval
+        self._pool     = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-ingest")
+        self.cycles    = 0
+        self.new_articles = 0
+        self.last_cycle  = None
+        self.last_errors = {}
+        self.last_prune  = 0.0
+
+    def symbols(self) -> list:
+        db = SessionLocal()
+        try:
+            return signal_scheduler.targets(db)
+        finally:
+            db.close()
+
+    def cycle(self) -> int:
+        """One ingestion pass over every feed → number of new articles."""
+        before = news_store.new_articles
+        with span("news.ingest"), finnhub_client.lane(BACKGROUND):
+            errors = {}
+            for category in MARKET_CATEGORIES:
+                try:
+                    news_store.poll_market(category)
+                except Exception as e:
+                    errors[f"market:{category}"] = str(e)
+            errors.update(news_store.poll_many(self.symbols()))
+            if time.time() - self.last_prune >= PRUNE_INTERVAL:
+                try:
+                    with span("news.prune"):
+                        news_store.prune()
+                    self.last_prune = time.time()
+                except Exception as e:
+                    errors["prune"] = str(e)
+        added = news_store.new_articles - before
+        self.cycles      += 1
+        self.new_articles += added
+        self.last_cycle   = time.time()
+        self.last_errors  = errors
+        return added
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                await loop.run_in_executor(self._pool, self.cycle)
+            except Exception as e:
+                print(f"⚠️ שגיאה באיסוף חדשות: {e}")
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> dict:
+        return {
+            "interval_s":   self.interval,
+            "cycles":       self.cycles,
+            "new_articles": self.new_articles,
+            "last_cycle":   self.last_cycle,
+            "last_errors":  self.last_errors,
+            "last_prune":   self.last_prune or None,
+        }
+
+
+news_ingester = NewsIngester(INGEST_INTERVAL)
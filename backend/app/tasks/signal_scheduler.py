@@ -0,0 +1,172 @@
+# backend/app/tasks/signal_scheduler.py
+"""
+Background signal precomputation for watchlist symbols and open positions.
+
+Every cached signal is refreshed REFRESH_LEAD before it expires, so the
+dashboard reads hit CachedSignal instead of waiting for a pipeline run.
+
+  • staggered  — one refresh at a time, `signal_refresh_spacing` seconds
+                 apart, on its own thread (Finnhub/yfinance rate limits);
+                 its Finnhub calls use the client's BACKGROUND lane
+  • priority   — soonest expiry first; each recent request (decayed with
+                 REQUEST_HALF_LIFE) moves a symbol FREQUENCY_BOOST earlier
+  • market hrs — equities are paused outside NYSE regular hours (weekends
+                 included, holidays not modelled); crypto / FX never pause
+  • failures   — errored runs aren't cached; the symbol backs off for
+                 FAILURE_BACKOFF before the next attempt. Degraded runs are
+                 cached with the shorter DEGRADED_TTL, so they come due sooner
+"""
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as dtime, timedelta
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from ..database import SessionLocal, WatchlistItem, PaperTrade, CachedSignal
+from ..engine.signal_fusion import generate_signal
+from ..services.signal_store import SIGNAL_TTL, store_signal, expires
+from ..services.metrics import span
+from ..services.finnhub_client import finnhub_client, BACKGROUND
+
+settings = get_settings()
+
+REFRESH_LEAD      = timedelta(minutes=3)
+REQUEST_HALF_LIFE = 3600.0
+FREQUENCY_BOOST   = 30.0        # seconds earlier per (decayed) recent request
+MAX_BOOST         = 300.0
+FAILURE_BACKOFF   = 300.0
+IDLE_SLEEP        = 15.0
+
+MARKET_TZ    = ZoneInfo("America/New_York")
+MARKET_OPEN  = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+
+def is_equity(symbol: str) -> bool:
+    return not (symbol.endswith("-USD") or symbol.endswith("=X"))
+
+
+def market_open(now: datetime | None = None) -> bool:
+    now = (now or datetime.now(MARKET_TZ)).astimezone(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+class SignalScheduler:
+    def __init__(self, spacing: float):
+        self.spacing    = spacing
+        self._requests: dict[str, tuple] = {}     # symbol → (decayed count, updated at)
+        self._backoff:  dict[str, float] = {}     # symbol → retry not before
+        self._lock      = threading.Lock()
+        self._pool      = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signal-precompute")
+        self.current    = None
+        self.refreshed  = 0
+        self.failed     = 0
+        self.last_refresh = None
+
+    # ── Request frequency ────────────────────────────────────────────────────
+    def record_request(self, symbol: str):
+        now = time.time()
+        with self._lock:
+            count, at = self._requests.get(symbol.upper(), (0.0, now))
+            self._requests[symbol.upper()] = (count * 0.5 ** ((now - at) / REQUEST_HALF_LIFE) + 1, now)
+
+    def request_rate(self, symbol: str, now: float | None = None) -> float:
+        now = now or time.time()
+        count, at = self._requests.get(symbol, (0.0, now))
+        return count * 0.5 ** ((now - at) / REQUEST_HALF_LIFE)
+
+    # ── Queue ────────────────────────────────────────────────────────────────
+    def targets(self, db) -> list:
+        watch = [w.symbol for w in db.query(WatchlistItem).all()]
+        held  = [t.symbol for t in db.query(PaperTrade).filter_by(is_open=True).all()]
+        return list(dict.fromkeys(s.upper() for s in watch + held))
+
+    def queue(self, db) -> list:
+        """Targets by priority (most urgent first) with their due / paused state."""
+        syms   = self.targets(db)
+        if not syms:
+            return []
+        cached = {c.symbol: expires(c) for c in
+                  db.query(CachedSignal).filter(CachedSignal.symbol.in_(syms)).all()}
+        now, utcnow, is_open = time.time(), datetime.utcnow(), market_open()
+        out = []
+        for sym in syms:
+            expiry = cached.get(sym)
+            due_in = ((expiry - REFRESH_LEAD - utcnow).total_seconds()
+                      if expiry else -SIGNAL_TTL.total_seconds())
+            rate   = self.request_rate(sym, now)
+            out.append({
+                "symbol":   sym,
+                "due_in_s": round(due_in, 1),
+                "requests": round(rate, 2),
+                "priority": round(due_in - min(rate * FREQUENCY_BOOST, MAX_BOOST), 1),
+                "paused":   is_equity(sym) and not is_open,
+                "backoff":  self._backoff.get(sym, 0) > now,
+            })
+        return sorted(out, key=lambda e: e["priority"])
+
+    def _next(self) -> str | None:
+        db = SessionLocal()
+        try:
+            for entry in self.queue(db):
+                if entry["priority"] <= 0 and not entry["paused"] and not entry["backoff"]:
+                    return entry["symbol"]
+            return None
+        finally:
+            db.close()
+
+    # ── Refresh ──────────────────────────────────────────────────────────────
+    def _refresh(self, symbol: str) -> bool:
+        self.current = symbol
+        try:
+            with span("scheduler.refresh") as sp, finnhub_client.lane(BACKGROUND):
+                signal = generate_signal(symbol)
+                db = SessionLocal()
+                try:
+                    sp.ok = store_signal(db, symbol, signal)
+                finally:
+                    db.close()
+        finally:
+            self.current = None
+        self.last_refresh = time.time()
+        if sp.ok:
+            self.refreshed += 1
+            self._backoff.pop(symbol, None)
+        else:
+            self.failed += 1
+            self._backoff[symbol] = time.time() + FAILURE_BACKOFF
+        return sp.ok
+
+    async def run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            delay = IDLE_SLEEP
+            try:
+                symbol = await loop.run_in_executor(self._pool, self._next)
+                if symbol:
+                    await loop.run_in_executor(self._pool, self._refresh, symbol)
+                    delay = self.spacing
+            except Exception as e:
+                print(f"⚠️ שגיאה בחישוב מוקדם של אותות: {e}")
+            await asyncio.sleep(delay)
+
+    def status(self) -> dict:
+        db = SessionLocal()
+        try:
+            queue = self.queue(db)
+        finally:
+            db.close()
+        return {
+            "spacing_s":    self.spacing,
+            "market_open":  market_open(),
+            "current":      self.current,
+            "refreshed":    self.refreshed,
+            "failed":       self.failed,
+            "last_refresh": self.last_refresh,
+            "queue":        queue,
+        }
+
+
+signal_scheduler = SignalScheduler(settings.signal_refresh_spacing)
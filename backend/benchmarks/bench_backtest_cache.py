@@ -0,0 +1,106 @@
+# backend/benchmarks/bench_backtest_cache.py
+"""
+Backtest cache extension vs. a full recompute on synthetic daily bars.
+
+  appended — the cached bar set plus new bars: the cached run is extended
+             over the new bars only; its equity curve and metrics must equal
+             a from-scratch run on the longer history.
+  anchored — the period window has rolled forward, but the lineage is younger
+             than ANCHOR_MAX_DAYS, so prices are fetched from the cached first
+             bar: the bars only append and the run is extended.
+  revised  — same bar count and last bar, one close revised (a late print or
+             a new split/dividend adjustment): must NOT be a cache hit.
+  rolling  — the same window shifted forward (bars dropped at the front, as
+             a relative period like "2y" does once the anchor expired): must
+             NOT be extended, since a fresh run starts from a different first bar.
+
+Run from backend/:  python -m benchmarks.bench_backtest_cache
+"""
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+from app.engine import backtester
+from app.engine.feature_engineering import feature_engineer
+from app.services.backtest_cache import BacktestCache
+import app.services.backtest_cache as backtest_cache_module
+
+BARS     = 1_500
+APPENDED = [1, 5, 20]
+METRICS  = ("total_return_pct", "max_drawdown_pct", "sharpe_ratio", "total_trades",
+            "win_rate_pct", "final_capital")
+
+
+def _synthetic(n: int, seed: int = 5) -> pd.DataFrame:
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n)))
+    return pd.DataFrame({"open": close, "high": close * 1.01, "low": close * 0.99, "close": close,
+                         "volume": rng.integers(100_000, 1_000_000, n).astype(float)},
+                        index=pd.date_range("2015-01-01", periods=n, freq="B"))
+
+
+def _run(bars: pd.DataFrame, use_cache: bool = True, full: pd.DataFrame | None = None) -> tuple:
+    """`bars` answers period downloads; start= downloads slice `full` (default: `bars`)."""
+    def get_raw_data(symbol, period="2y", interval="1d", start=None):
+        if start is None:
+            return bars
+        src = bars if full is None else full
+        return src[(src.index >= start) & (src.index <= bars.index[-1])]
+    feature_engineer.get_raw_data = get_raw_data
+    t0 = time.perf_counter()
+    out = backtester.run_backtest("SYN", strategy="rsi", use_cache=use_cache)
+    return out, time.perf_counter() - t0
+
+
+def _mismatches(a: dict, b: dict) -> int:
+    bad = sum(a[k] != b[k] for k in METRICS)
+    return bad + int(a["equity_curve"] != b["equity_curve"])
+
+
+def _cold(bars: pd.DataFrame):
+    """Empty cache holding one run over `bars`."""
+    backtest_cache_module.backtest_cache = BacktestCache(tempfile.mkdtemp(prefix="bench-bt-cache-"))
+    _run(bars)
+
+
+def main():
+    history     = _synthetic(BARS + max(APPENDED))
+    anchor_days = backtester.ANCHOR_MAX_DAYS
+
+    print(f"{'case':>10} | {'new bars':>8} | {'extended':>8} | {'full s':>7} | {'cached s':>8} | mismatches")
+    for k in APPENDED:
+        _cold(history.iloc[:BARS])
+        fresh, t_full = _run(history.iloc[:BARS + k], use_cache=False)
+        ext, t_ext    = _run(history.iloc[:BARS + k])
+        print(f"{'appended':>10} | {k:>8} | {ext['cache']['extended_bars']:>8} | "
+              f"{t_full:7.3f} | {t_ext:8.3f} | {_mismatches(fresh, ext)}")
+
+    for k in APPENDED:
+        _cold(history.iloc[:BARS])
+        anchored, t_anc = _run(history.iloc[k:BARS + k], full=history)
+        fresh, t_full   = _run(history.iloc[:BARS + k], use_cache=False)
+        print(f"{'anchored':>10} | {k:>8} | {anchored['cache']['extended_bars']:>8} | "
+              f"{t_full:7.3f} | {t_anc:8.3f} | {_mismatches(fresh, anchored)}")
+
+    for k in APPENDED:
+        _cold(history.iloc[:BARS])
+        revised = history.iloc[:BARS].copy()
+        revised.iloc[-k:, revised.columns.get_loc("close")] *= 1.01
+        rev, t_rev    = _run(revised)
+        fresh, t_full = _run(revised, use_cache=False)
+        print(f"{'revised':>10} | {k:>8} | {'hit' if rev['cache']['hit'] else '-':>8} | "
+              f"{t_full:7.3f} | {t_rev:8.3f} | {_mismatches(fresh, rev)}")
+
+    for k in APPENDED:
+        _cold(history.iloc[:BARS])
+        backtester.ANCHOR_MAX_DAYS = 0     # anchor expired: the period is fetched afresh
+        rolled, t_roll = _run(history.iloc[k:BARS + k])
+        fresh, t_full  = _run(history.iloc[k:BARS + k], use_cache=False)
+        print(f"{'rolling':>10} | {k:>8} | {rolled['cache']['extended_bars']:>8} | "
+              f"{t_full:7.3f} | {t_roll:8.3f} | {_mismatches(fresh, rolled)}")
+        backtester.ANCHOR_MAX_DAYS = anchor_days
+
+
+if __name__ == "__main__":
+    main()
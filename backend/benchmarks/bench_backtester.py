@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_backtester.py
+"""
+Vectorized vs bar-by-bar backtest engine on synthetic bars.
+Run from backend/:  python -m benchmarks.bench_backtester [--full]
+
+The reference loop is only timed up to --max-reference-bars (it takes minutes
+at 1M bars); larger sizes report a linear extrapolation marked with '~'.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from app.engine.backtester import _pandas_backtest, _reference_backtest
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _synthetic(n: int, seed: int = 7):
+    rng    = np.random.default_rng(seed)
+    close  = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    sig    = rng.choice([-1, 0, 1], size=n, p=[0.03, 0.94, 0.03])
+    return pd.DataFrame({"close": close}), pd.Series(sig)
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-reference-bars", type=int, default=100_000)
+    ap.add_argument("--full", action="store_true", help="time the reference loop at every size")
+    args = ap.parse_args()
+
+    print(f"{'bars':>10} | {'loop (s)':>10} | {'vectorized (s)':>14} | {'speedup':>8} | match")
+    per_bar = None
+    for n in SIZES:
+        df, sig = _synthetic(n)
+        fast, t_fast = _timed(_pandas_backtest, df, sig)
+
+        if args.full or n <= args.max_reference_bars:
+            ref, t_ref = _timed(_reference_backtest, df, sig)
+            per_bar = t_ref / n
+            match   = "yes" if ref == fast else "NO"
+            loop_s  = f"{t_ref:10.3f}"
+        else:
+            t_ref  = per_bar * n
+            match  = "-"
+            loop_s = f"~{t_ref:9.1f}"
+
+        print(f"{n:>10,} | {loop_s} | {t_fast:14.3f} | {t_ref / t_fast:7.1f}x | {match}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# backend/benchmarks/bench_cross_section.py
+"""
+Cross-sectional fusion scoring vs. the per-symbol scalar path, on random
+feature / fundamental / ML / sentiment inputs. Also checks the two agree
+exactly for every symbol.
+Run from backend/:  python -m benchmarks.bench_cross_section
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from app.engine.signal_fusion import _ta_score, _fundamental_score, _fuse, _to_hebrew_decision
+from app.engine.cross_section import score_matrix, FUNDAMENTAL_FIELDS
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def _synthetic(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    flags = lambda p=0.3: (rng.random(n) < p).astype(int)
+    features = pd.DataFrame({
+        "rsi_os": flags(), "rsi_ob": flags(), "macd_cross": flags(), "sma_cross_20_50": flags(),
+        "volume_surge": flags(), "near_support": flags(), "near_resistance": flags(), "hammer": flags(0.1),
+        "price_vs_sma20": rng.normal(0, 0.05, n), "bb_pct": rng.uniform(-0.2, 1.2, n),
+        "price_vs_vwap": rng.normal(0, 0.02, n),
+    })
+    fundamentals = []
+    for _ in range(n):
+        row = {}
+        for f in FUNDAMENTAL_FIELDS:
+            r = rng.random()
+            big = f in ("pe_ratio", "forward_pe", "debt_to_equity")
+            row[f] = None if r < 0.15 else 0 if r < 0.2 else float(rng.uniform(-5, 300) if big else rng.uniform(-0.5, 0.5))
+        fundamentals.append(row)
+    ml = [{"decision": int(d), "confidence": round(float(c), 4)}
+          for d, c in zip(rng.integers(-1, 2, n), rng.uniform(0.3, 0.9, n))]
+    sentiment = np.round(rng.uniform(-1, 1, n), 4)
+    return features, fundamentals, ml, sentiment
+
+
+def _scalar(features, fundamentals, ml, sentiment):
+    out = []
+    for f, fund, m, s in zip(features.to_dict("records"), fundamentals, ml, sentiment.tolist()):
+        ta, _ = _ta_score(f)
+        fused, conf = _fuse(m, s, ta, _fundamental_score(fund))
+        out.append((ta, fused, conf, _to_hebrew_decision(fused, conf)["label"]))
+    return out
+
+
+def main():
+    print(f"{'symbols':>8} | {'scalar s':>9} | {'vector s':>9} | {'speedup':>8} | mismatches")
+    for n in SIZES:
+        inputs = _synthetic(n)
+        t0 = time.perf_counter()
+        scalar = _scalar(*inputs)
+        t1 = time.perf_counter()
+        vec = score_matrix(*inputs)
+        t2 = time.perf_counter()
+        bad = sum(
+            (ta, fused, conf, label) != (v.ta_score, v.fused_score, v.confidence, v.decision)
+            for (ta, fused, conf, label), v in zip(scalar, vec.itertuples())
+        )
+        print(f"{n:>8,} | {t1 - t0:9.3f} | {t2 - t1:9.3f} | {(t1 - t0) / (t2 - t1):7.1f}x | {bad}")
+
+
+if __name__ == "__main__":
+    main()
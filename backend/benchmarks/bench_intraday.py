@@ -0,0 +1,121 @@
+# backend/benchmarks/bench_intraday.py
+"""
+Intraday order replay (LIMIT entries, SL/TP on high/low) on synthetic 1m bars:
+simulate_orders vs. a bar-by-bar reference loop with the same rules.
+Mismatches count differing trades, open-trade state and equity bars.
+Run from backend/:  python -m benchmarks.bench_intraday [--full]
+
+The reference loop is only timed up to --max-reference-bars; larger sizes
+report a linear extrapolation marked with '~'.
+"""
+import argparse
+import time
+import numpy as np
+
+from app.engine.backtester import _trade
+from app.engine.intraday import simulate_orders
+
+SIZES = [100_000, 1_000_000, 5_000_000]
+
+
+def _synthetic(n: int, seed: int = 7):
+    rng   = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high  = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.0005, n)))
+    low   = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.0005, n)))
+    sig   = rng.choice([-1, 0, 1], size=n, p=[0.002, 0.996, 0.002])
+    return open_, high, low, close, sig
+
+
+def _reference(open_, high, low, close, signals, initial_capital=10_000.0, order_type="limit",
+               limit_offset=0.001, stop_loss=0.01, take_profit=0.02, ttl_bars=12) -> tuple:
+    """One bar at a time: working order → fill → SL/TP/exit signal, as simulate_orders documents."""
+    o, h, l, c, sig = (np.asarray(x).tolist() for x in (open_, high, low, close, signals))
+    n = len(c)
+    cash, shares = initial_capital, 0
+    order, pos   = None, None     # (limit, expires), {"entry_bar", "entry", "sl", "tp"}
+    trades, equity = [], [initial_capital] if n else []
+
+    for i in range(1, n):
+        fill = None
+        if pos is None and order is None and sig[i - 1] == 1:
+            if order_type == "market":
+                fill = o[i]
+            else:
+                order = (c[i - 1] * (1 - limit_offset), i + ttl_bars)
+        if order is not None:
+            limit, expires = order
+            if sig[i - 1] == -1:          # exit signal cancels the working order
+                order = None
+            elif l[i] <= limit:
+                fill, order = min(o[i], limit), None
+            elif i + 1 >= expires:
+                order = None
+        if fill is not None:
+            qty = int(cash * 0.95 / fill)
+            if qty:
+                shares, cash = qty, cash - qty * fill
+                pos = {"entry_bar": i, "entry": fill,
+                       "sl": fill * (1 - stop_loss) if stop_loss else np.nan,
+                       "tp": fill * (1 + take_profit) if take_profit else np.nan}
+        if pos is not None:
+            if i > pos["entry_bar"] and sig[i - 1] == -1:
+                exit_p, reason = o[i], "signal"
+            elif l[i] <= pos["sl"]:
+                exit_p, reason = pos["sl"], "stop_loss"
+            elif h[i] >= pos["tp"]:
+                exit_p, reason = pos["tp"], "take_profit"
+            else:
+                exit_p = None
+            if exit_p is not None:
+                trades.append({**_trade(pos["entry"], exit_p, shares),
+                               "entry_bar": pos["entry_bar"], "exit_bar": i, "reason": reason})
+                cash, shares, pos = cash + shares * exit_p, 0, None
+        equity.append(cash + shares * c[i])
+
+    open_trade = None if pos is None else \
+        {"entry_bar": pos["entry_bar"], "entry": pos["entry"], "shares": shares, "cash": cash}
+    return np.asarray(equity), trades, open_trade
+
+
+def _mismatches(ref: tuple, fast: tuple) -> int:
+    (eq_r, tr_r, open_r), (eq_f, tr_f, open_f) = ref, fast
+    bad  = sum(a != b for a, b in zip(tr_r, tr_f)) + abs(len(tr_r) - len(tr_f))
+    bad += int(open_r != open_f)
+    return bad + int(np.count_nonzero(eq_r != eq_f))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-reference-bars", type=int, default=1_000_000)
+    ap.add_argument("--full", action="store_true", help="run the reference loop at every size")
+    args = ap.parse_args()
+
+    print(f"{'bars':>10} | {'trades':>7} | {'loop (s)':>9} | {'seconds':>8} | {'speedup':>8} | "
+          f"{'bars/min':>12} | mismatches")
+    per_bar = None
+    for n in SIZES:
+        bars = _synthetic(n)
+        t0 = time.perf_counter()
+        fast = simulate_orders(*bars)
+        dt = time.perf_counter() - t0
+
+        if args.full or n <= args.max_reference_bars:
+            t0  = time.perf_counter()
+            ref = _reference(*bars)
+            t_ref   = time.perf_counter() - t0
+            per_bar = t_ref / n
+            bad     = str(_mismatches(ref, fast))
+            loop_s  = f"{t_ref:9.2f}"
+        else:
+            t_ref  = per_bar * n
+            bad    = "-"
+            loop_s = f"~{t_ref:8.1f}"
+
+        print(f"{n:>10,} | {len(fast[1]):>7,} | {loop_s} | {dt:8.3f} | {t_ref / dt:7.1f}x | "
+              f"{n / dt * 60:12,.0f} | {bad}")
+
+
+if __name__ == "__main__":
+    main()
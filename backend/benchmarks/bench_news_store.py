@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_news_store.py
+"""
+Concurrent news ingestion into a scratch store: FEEDS company feeds that
+share most of their articles (AAPL and MSFT on the same market story) are
+polled at once, every round with new ids. Reports throughput and poll
+errors — a shared id must neither fail a poll (UNIQUE news_articles.id)
+nor be stored twice; the final counts must match the expected ones.
+Run from backend/:  python -m benchmarks.bench_news_store
+"""
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='bench-news-')}/news.db"
+
+from app.database import create_tables, SessionLocal, NewsArticle, NewsSymbol   # noqa: E402
+from app.engine.sentiment import sentiment_engine                             # noqa: E402
+from app.services.news_store import news_store                                # noqa: E402
+
+FEEDS    = 16
+ROUNDS   = 5
+ARTICLES = 200     # per feed and round; every SHARED_EVERY-th is the feed's own, the rest shared
+SHARED_EVERY = 10
+
+
+def _items(symbol: str, round_no: int) -> list:
+    now, base, out = int(time.time()), round_no * 1_000_000, []
+    for k in range(ARTICLES):
+        own = k % SHARED_EVERY == 0
+        aid = base + (int(symbol[1:]) + 1) * 1000 + k if own else base + k
+        out.append({"id": aid, "datetime": now - k, "headline": f"Shares rally on record growth {aid}",
+                    "summary": "analysts upgrade the stock", "source": "bench", "url": f"u/{aid}",
+                    "related": symbol})
+    return out
+
+
+def _poll_all(symbols: list) -> dict:
+    """force-poll every feed at once (released together) → {symbol: error}."""
+    gate = threading.Barrier(len(symbols))
+
+    def run(sym):
+        gate.wait()
+        try:
+            news_store.poll(sym, force=True)
+            return None
+        except Exception as e:
+            return f"{type(e).__name__}: {str(e).splitlines()[0]}"
+    with ThreadPoolExecutor(len(symbols)) as pool:
+        out = dict(zip(symbols, pool.map(run, symbols)))
+    return {s: e for s, e in out.items() if e}
+
+
+def main():
+    create_tables()
+    symbols, state = [f"S{i}" for i in range(FEEDS)], {"round": 0}
+    sentiment_engine.fetch_news = lambda sym, days=7, from_date=None: _items(sym, state["round"])
+
+    print(f"{'round':>5} | {'feeds':>5} | {'seconds':>8} | {'new':>6} | errors")
+    for r in range(ROUNDS):
+        state["round"] = r
+        before = news_store.new_articles
+        t0 = time.perf_counter()
+        errors = _poll_all(symbols)
+        dt = time.perf_counter() - t0
+        print(f"{r:>5} | {FEEDS:>5} | {dt:8.3f} | {news_store.new_articles - before:>6} | {len(errors)}")
+        for sym, e in list(errors.items())[:3]:
+            print(f"        {sym}: {e}")
+
+    db = SessionLocal()
+    try:
+        articles = db.query(NewsArticle).count()
+        links    = db.query(NewsSymbol).count()
+    finally:
+        db.close()
+    own = ARTICLES // SHARED_EVERY
+    print(f"articles stored {articles:,} (expected {ROUNDS * (ARTICLES - own + own * FEEDS):,}), "
+          f"links {links:,} (expected {ROUNDS * ARTICLES * FEEDS:,})")
+
+
+if __name__ == "__main__":
+    main()
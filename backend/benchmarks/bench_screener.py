@@ -0,0 +1,81 @@
+# backend/benchmarks/bench_screener.py
+"""
+Vectorized screener scoring (screener_scan.score_frames) vs. the previous
+per-symbol pandas loop, on random 1-month bar frames of mixed length
+(10–31 bars, like small caps next to weekend-trading crypto). Also checks
+that scores agree for every symbol and indicators to 1e-6.
+Run from backend/:  python -m benchmarks.bench_screener
+"""
+import time
+import numpy as np
+import pandas as pd
+
+from app.engine.screener_scan import score_frames, MIN_BARS
+
+SIZES = [30, 300, 3_000]
+
+
+def _synthetic(n: int, seed: int = 11) -> dict:
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for i in range(n):
+        bars  = int(rng.integers(MIN_BARS, 32))
+        close = 5 * np.exp(np.cumsum(rng.normal(0.005, 0.05, bars)))
+        vol   = rng.lognormal(13, 0.6, bars)
+        frames[f"S{i}"] = pd.DataFrame({"close": close, "volume": vol})
+    return frames
+
+
+def _calc_rsi(series, period=14):
+    delta = series.diff()
+    gain  = delta.where(delta > 0, 0).rolling(period).mean()
+    loss  = (-delta.where(delta < 0, 0)).rolling(period).mean()
+    rs    = gain / (loss + 1e-9)
+    return float(100 - (100 / (1 + rs.iloc[-1])))
+
+
+def _scalar(frames: dict) -> dict:
+    """The former routers/screener._quick_screener_score, minus the download."""
+    out = {}
+    for sym, df in frames.items():
+        close, volume = df['close'], df['volume']
+        rsi_val   = _calc_rsi(close, 14)
+        vol_ratio = float(volume.iloc[-1] / volume.mean()) if volume.mean() > 0 else 1
+        mom_5d    = float((close.iloc[-1] / close.iloc[-5] - 1) * 100) if len(close) >= 5 else 0
+        mom_20d   = float((close.iloc[-1] / close.iloc[-20] - 1) * 100) if len(close) >= 20 else 0
+        price     = float(close.iloc[-1])
+        sma_20    = float(close.rolling(20).mean().iloc[-1])
+        score = 0
+        if rsi_val < 40:           score += 2
+        if rsi_val > 60:           score += 1
+        if vol_ratio > 1.5:        score += 2
+        if mom_5d  > 5:            score += 2
+        if mom_20d > 10:           score += 1
+        if price > sma_20 * 0.99:  score += 2
+        out[sym] = (price, rsi_val, vol_ratio, mom_5d, mom_20d, score)
+    return out
+
+
+def _close(a: float, b: float) -> bool:
+    return (np.isnan(a) and np.isnan(b)) or abs(a - b) <= 1e-6 * max(1.0, abs(a))
+
+
+def main():
+    print(f"{'symbols':>8} | {'loop s':>8} | {'vector s':>8} | {'speedup':>8} | mismatches")
+    for n in SIZES:
+        frames = _synthetic(n)
+        t0 = time.perf_counter()
+        scalar = _scalar(frames)
+        t1 = time.perf_counter()
+        vec = score_frames(frames)
+        t2 = time.perf_counter()
+        bad = sum(
+            s[5] != v.score or not all(_close(a, b) for a, b in zip(s[:5], (v.price, v.rsi, v.volume_ratio,
+                                                                           v.momentum_5d, v.momentum_20d)))
+            for s, v in zip((scalar[sym] for sym in vec.index), vec.itertuples())
+        )
+        print(f"{n:>8,} | {t1 - t0:8.3f} | {t2 - t1:8.3f} | {(t1 - t0) / (t2 - t1):7.1f}x | {bad}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# backend/benchmarks/bench_sentiment.py
+"""
+Lexicon sentiment throughput: the former set-intersection scorer vs.
+score_text per headline vs. one score_batch pass, on synthetic headlines
+built from the lexicon plus filler words.
+
+The former scorer only saw single words, unweighted, so headlines holding a
+multi-word term ("earnings beat", "guidance cut") are expected to differ;
+every other headline must score identically ("phrase-free" column).
+Run from backend/:  python -m benchmarks.bench_sentiment
+"""
+import re
+import time
+import random
+
+from app.engine.sentiment import sentiment_engine, BULLISH_WORDS, BEARISH_WORDS, MIN_TEXT_LEN
+
+SIZES   = [1_000, 10_000, 100_000]
+FILLER  = ("the stock company shares said today quarter market analysts investors "
+           "after report year new plans ceo update").split()
+PHRASES = sorted(t for t in BULLISH_WORDS | BEARISH_WORDS if " " in t)
+
+
+def _headlines(n: int, seed: int = 7) -> list:
+    rng   = random.Random(seed)
+    vocab = sorted(BULLISH_WORDS | BEARISH_WORDS) + FILLER * 4
+    return [" ".join(rng.choice(vocab) for _ in range(rng.randint(6, 24))).capitalize()
+            for _ in range(n)]
+
+
+def _reference(text: str) -> dict:
+    """The scorer before the compiled lexicon: word set ∩ keyword sets."""
+    if not text or len(text.strip()) < MIN_TEXT_LEN:
+        return {"score": 0.0, "label": "neutral", "confidence": 0.5}
+    words     = set(re.findall(r'\b\w+\b', text.lower()))
+    bull_hits = len(words & BULLISH_WORDS)
+    bear_hits = len(words & BEARISH_WORDS)
+    total     = bull_hits + bear_hits
+    if total == 0:
+        return {"score": 0.0, "label": "neutral", "confidence": 0.5}
+    score = (bull_hits - bear_hits) / total
+    conf  = min(0.5 + total * 0.08, 0.90)
+    if score > 0.1:   label = "positive"
+    elif score < -0.1: label = "negative"
+    else:              label = "neutral"
+    return {"score": round(score, 4), "label": label, "confidence": round(conf, 4)}
+
+
+def main():
+    print(f"{'articles':>9} | {'former/s':>10} | {'per-text/s':>10} | {'batch/s':>10} | "
+          f"{'speedup':>7} | {'mismatches':>10} | phrase-free")
+    for n in SIZES:
+        texts = _headlines(n)
+        t0 = time.perf_counter()
+        ref = [_reference(t) for t in texts]
+        t1 = time.perf_counter()
+        single = [sentiment_engine.score_text(t) for t in texts]
+        t2 = time.perf_counter()
+        batch = sentiment_engine.score_batch(texts)
+        t3 = time.perf_counter()
+        assert single == batch
+
+        differ = [r != b for r, b in zip(ref, batch)]
+        plain  = [not any(p in t.lower() for p in PHRASES) for t in texts]
+        print(f"{n:>9,} | {n / (t1 - t0):10,.0f} | {n / (t2 - t1):10,.0f} | {n / (t3 - t2):10,.0f} | "
+              f"{(t1 - t0) / (t3 - t2):6.1f}x | {sum(differ):>10,} | "
+              f"{sum(d and p for d, p in zip(differ, plain))}")
+
+
+if __name__ == "__main__":
+    main()